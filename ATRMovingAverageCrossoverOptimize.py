@@ -3,12 +3,19 @@ import pandas as pd
 import numpy as np
 
 # Fetching financial market data
-import yfinance as yf
+import bar_cache
 
 # Backtesting library
 from backtesting import Backtest, Strategy
 from backtesting.lib import crossover, TrailingStrategy
 
+# Indicators shared across optimization runs
+from indicator_cache import cached
+
+# Searches the grid in a fraction of the backtests, keeping every run on disk
+from budget_optimizer import model_search
+from result_store import ResultStore
+
 # Visualization
 import matplotlib.pyplot as plt
 import seaborn as sns
@@ -17,6 +24,16 @@ import seaborn as sns
 import warnings
 warnings.filterwarnings("ignore")
 
+@cached
+def SMA(values, n):
+    """Simple moving average, computed once per (data, n) across optimization runs."""
+    return pd.Series(values).rolling(n).mean()
+
+@cached
+def high_low_range(high, low, n):
+    """Highest high minus lowest low over `n` bars, used as the ATR volatility measure."""
+    return pd.Series(high).rolling(n).max() - pd.Series(low).rolling(n).min()
+
 class ATRMovingAverageCrossoverStrategy(TrailingStrategy):
     n1 = 20  # Initial/default value for n1, will be optimized
     n2 = 60  # Initial/default value for n2, will be optimized
@@ -26,13 +43,11 @@ class ATRMovingAverageCrossoverStrategy(TrailingStrategy):
     def init(self):
         super().init()
         # Moving averages
-        self.sma1 = self.I(lambda x: pd.Series(x).rolling(self.n1).mean(), self.data.Close)
-        self.sma2 = self.I(lambda x: pd.Series(x).rolling(self.n2).mean(), self.data.Close)
+        self.sma1 = self.I(SMA, self.data.Close, self.n1)
+        self.sma2 = self.I(SMA, self.data.Close, self.n2)
         
         # ATR for volatility
-        self.atr = self.I(lambda high, low, close: pd.Series(high).rolling(self.atr_period).max()
-                          - pd.Series(low).rolling(self.atr_period).min(), 
-                          self.data.High, self.data.Low, self.data.Close)
+        self.atr = self.I(high_low_range, self.data.High, self.data.Low, self.atr_period)
 
     def next(self):
         if len(self.data.Close) < max(self.n1, self.n2, self.atr_period) + 1:
@@ -59,7 +74,7 @@ if __name__ == "__main__":
     ticker = input("Enter the ticker symbol: ")
     start = input("Enter the start date (YYYY-MM-DD): ")
     end = input("Enter the end date (YYYY-MM-DD): ")
-    data = yf.download(ticker, start, end)
+    data = bar_cache.download(ticker, start, end)
 
     bt = Backtest(data, ATRMovingAverageCrossoverStrategy, cash=10_000, commission=.002)
 
@@ -70,11 +85,15 @@ if __name__ == "__main__":
         'atr_multiplier': [2, 3, 4, 5]  # Multiplier for ATR-based stop-loss
     }
 
-    optimization_results = bt.optimize(**param_grid, maximize='Sharpe Ratio', return_heatmap=False)
+    optimization_results = model_search(data, ATRMovingAverageCrossoverStrategy, param_grid, maximize='Sharpe Ratio',
+                                        budget=.25, random_state=0, store=ResultStore(),
+                                        cash=10_000, commission=.002)
 
-    print("Optimized Parameters:", optimization_results._strategy)
+    print("Optimized Parameters:", optimization_results['_params'])
     print("Optimized Sharpe Ratio:", optimization_results['Sharpe Ratio'])
+    print("Search:", optimization_results['_search'])
 
+    bt.run(**optimization_results['_params'])
     bt.plot()
 
     plt.figure(figsize=(10, 6))
@@ -3,7 +3,7 @@ import pandas as pd
 import numpy as np
 
 # Fetching financial market data
-import yfinance as yf
+import bar_cache
 
 # Backtesting library
 from backtesting import Backtest, Strategy
@@ -56,7 +56,7 @@ if __name__ == "__main__":
     ticker = input("Enter the ticker symbol: ")
     start = input("Enter the start date (YYYY-MM-DD): ")
     end = input("Enter the end date (YYYY-MM-DD): ")
-    data = yf.download(ticker, start, end)
+    data = bar_cache.download(ticker, start, end)
 
     bt = Backtest(data, ATRMovingAverageCrossoverStrategy, cash=10_000, commission=.002)
 
@@ -1,15 +1,20 @@
 import pandas as pd
-import yfinance as yf
+import bar_cache
 from backtesting import Backtest, Strategy
 from backtesting.lib import crossover
+from indicator_cache import cached
 import warnings
 
 # Suppress specific BokehDeprecationWarning
 warnings.filterwarnings("ignore", category=UserWarning, message=".*BokehDeprecationWarning*")
 
 
+@cached
 def SMA(values, n):
-    """Return simple moving average of `values`, at each step taking into account `n` previous values."""
+    """Return simple moving average of `values`, at each step taking into account `n` previous values.
+
+    Memoized, so optimization runs sharing a period reuse the same array.
+    """
     return pd.Series(values).rolling(n).mean()
 
 class SmaCross(Strategy):
@@ -33,7 +38,7 @@ class SmaCross(Strategy):
 
 def fetch_data(ticker):
     """Fetch historical data for the given ticker symbol from yfinance."""
-    return yf.download(ticker)
+    return bar_cache.download(ticker)
 
 def run_backtest(data):
     """Run backtest using the SmaCross strategy with the provided data."""
@@ -1,14 +1,20 @@
-import yfinance as yf
+import bar_cache
 import pandas_ta as pa
 import plotly.graph_objects as go
 import numpy as np
-from tqdm import tqdm
 from backtesting import Strategy, Backtest
 import numpy as np
 import pandas as pd
+from rejection import identify_rejection
+from pivots import identify_pivots
+from level_book import joined_levels
+from nearest_level import close_resistance, close_support
+from signal_generator import generate_signals
+from budget_optimizer import model_search
+from walk_forward import walk_forward
 
 def get_data(symbol: str):
-    data = yf.download(tickers=symbol, period='1000d', interval='1d')
+    data = bar_cache.download(tickers=symbol, period='1000d', interval='1d')
     data.reset_index(inplace=True)
     return data
 # Get the data
@@ -23,20 +29,6 @@ print(data.head())
 print(data.tail())
 
 # Add rejection signal
-def identify_rejection(data):
-    # Create a new column for rejection signal
-    data['rejection'] = data.apply(lambda row: 2 if (
-        ( (min(row['Open'], row['Close']) - row['Low']) > (1.5 * abs(row['Close'] - row['Open']))) and 
-        (row['High'] - max(row['Close'], row['Open'])) < (0.8 * abs(row['Close'] - row['Open'])) and 
-        (abs(row['Open'] - row['Close']) > row['Open'] * 0.001)
-    ) else 1 if (
-        (row['High'] - max(row['Open'], row['Close'])) > (1.5 * abs(row['Open'] - row['Close'])) and 
-        (min(row['Close'], row['Open']) - row['Low']) < (0.8 * abs(row['Open'] - row['Close'])) and 
-        (abs(row['Open'] - row['Close']) > row['Open'] * 0.001)
-    ) else 0, axis=1)
-
-    return data
-
 data = identify_rejection(data)
 print(data)
 
@@ -89,28 +81,10 @@ def resistance(df1, l, n1, n2): #n1 n2 before and after candle l
 
 # Close to resistance and support testing
 def closeResistance(l, levels, lim, df):
-    if len(levels) == 0:
-        return 0
-    c1 = abs(df['High'][l] - min(levels, key=lambda x: abs(x - df['High'][l]))) <= lim
-    c2 = abs(max(df['Open'][l], df['Close'][l]) - min(levels, key=lambda x: abs(x - df['High'][l]))) <= lim
-    c3 = min(df['Open'][l], df['Close'][l]) < min(levels, key=lambda x: abs(x - df['High'][l]))
-    c4 = df['Low'][l] < min(levels, key=lambda x: abs(x - df['High'][l]))
-    if (c1 or c2) and c3 and c4:
-        return min(levels, key=lambda x: abs(x - df['High'][l]))
-    else:
-        return 0
+    return close_resistance(levels, df['High'][l], df['Low'][l], df['Open'][l], df['Close'][l], lim)
 
 def closeSupport(l, levels, lim, df):
-    if len(levels) == 0:
-        return 0
-    c1 = abs(df['Low'][l] - min(levels, key=lambda x: abs(x - df['Low'][l]))) <= lim
-    c2 = abs(min(df['Open'][l], df['Close'][l]) - min(levels, key=lambda x: abs(x - df['Low'][l]))) <= lim
-    c3 = max(df['Open'][l], df['Close'][l]) > min(levels, key=lambda x: abs(x - df['Low'][l]))
-    c4 = df['High'][l] > min(levels, key=lambda x: abs(x - df['Low'][l]))
-    if (c1 or c2) and c3 and c4:
-        return min(levels, key=lambda x: abs(x - df['Low'][l]))
-    else:
-        return 0
+    return close_support(levels, df['High'][l], df['Low'][l], df['Open'][l], df['Close'][l], lim)
 
 def is_below_resistance(l, level_backCandles, level, df):
     return df.loc[l-level_backCandles:l-1, 'High'].max() < level
@@ -119,38 +93,19 @@ def is_above_support(l, level_backCandles, level, df):
     return df.loc[l-level_backCandles:l-1, 'Low'].min() > level
 
 # Generate Entry signals
-def check_candle_signal(l, n1, n2, levelbackCandles, windowbackCandles, df):
-    ss = []
-    rr = []
-    for subrow in range(l-levelbackCandles, l-n2+1):
-        if support(df, subrow, n1, n2):
-            ss.append(df.Low[subrow])
-        if resistance(df, subrow, n1, n2):
-            rr.append(df.High[subrow])
-
-    ss.sort() #keep lowest support when popping a level
-    for i in range(1,len(ss)):
-        if(i>=len(ss)):
-            break
-        if abs(ss[i]-ss[i-1])/ss[i]<=0.001: # merging close distance levels
-            ss.pop(i)
-
-    rr.sort(reverse=True) # keep highest resistance when popping one
-    for i in range(1,len(rr)):
-        if(i>=len(rr)):
-            break
-        if abs(rr[i]-rr[i-1])/rr[i]<=0.001: # merging close distance levels
-            rr.pop(i)
-
-    #----------------------------------------------------------------------
-    # joined levels
-    rrss = rr+ss
-    rrss.sort()
-    for i in range(1,len(rrss)):
-        if(i>=len(rrss)):
-            break
-        if abs(rrss[i]-rrss[i-1])/rrss[i]<=0.001: # merging close distance levels
-            rrss.pop(i)
+def check_candle_signal(l, n1, n2, levelbackCandles, windowbackCandles, df, book=None):
+    if book is not None:
+        # the level book only adds/evicts the pivots entering/leaving the window
+        rrss = book.update(l, df.Low.values, df.High.values)
+    else:
+        # pivot_low/pivot_high are precomputed for the whole series by identify_pivots
+        window = slice(l-levelbackCandles, l-n2+1)
+        ss = df.Low.values[window][df.pivot_low.values[window]].tolist()
+        rr = df.High.values[window][df.pivot_high.values[window]].tolist()
+
+        #----------------------------------------------------------------------
+        # joined levels, merging close distance levels
+        rrss = joined_levels(ss, rr)
     cR = closeResistance(l, rrss, df.Close[l]*0.003, df)
     cS = closeSupport(l, rrss, df.Close[l]*0.003, df)
     #----------------------------------------------------------------------
@@ -171,12 +126,10 @@ n2 = 8
 levelbackCandles = 60
 windowbackCandles = n2
 
-signal = [0 for i in range(len(data))]
+data = identify_pivots(data, n1, n2)  # lets check_candle_signal inspect single bars
 
-for row in tqdm(range(levelbackCandles+n1, len(data)-n2)):
-    signal[row] = check_candle_signal(row, n1, n2, levelbackCandles, windowbackCandles, data)
-
-data["signal"] = signal
+# same column as calling check_candle_signal for every row, computed with array operations
+data["signal"] = generate_signals(data, n1, n2, levelbackCandles, windowbackCandles)
 
 # check this print
 data[data["signal"]!=0]
@@ -194,8 +147,9 @@ print(data)
 data['ATR'] = pa.atr(high=data.High, low=data.Low, close=data.Close, length=14)
 data['RSI'] = pa.rsi(data.Close, length=5)
 
-def SIGNAL():
-    return data.signal
+def SIGNAL(signal):
+    # the strategy's own signal column, so it also works on a slice of the data (walk-forward folds)
+    return signal
 
 #A new strategy needs to extend Strategy class and override its two abstract methods: init() and next().
 #Method init() is invoked before the strategy is run. Within it, one ideally precomputes in efficient, 
@@ -213,7 +167,7 @@ def SIGNAL():
 class MyCandlesStrat(Strategy):  
     def init(self):
         super().init()
-        self.signal1 = self.I(SIGNAL)
+        self.signal1 = self.I(SIGNAL, self.data.signal)
         self.ratio = 2
         self.risk_perc = 0.1
 
@@ -239,7 +193,7 @@ class MyCandlesStrat(Strategy):
     risk_perc = 0.12  
     def init(self):
         super().init()
-        self.signal1 = self.I(SIGNAL)
+        self.signal1 = self.I(SIGNAL, self.data.signal)
         #self.ratio
         #self.risk_perc
 
@@ -282,7 +236,7 @@ class MyCandlesStrat(Strategy):
     ratio_f = 1
     def init(self):
         super().init()
-        self.signal1 = self.I(SIGNAL)
+        self.signal1 = self.I(SIGNAL, self.data.signal)
 
     def next(self):
         super().next() 
@@ -314,7 +268,7 @@ print("Parameters for best result: ", res['_strategy'])
 class MyCandlesStrat(Strategy):
     def init(self):
         super().init()
-        self.signal1 = self.I(SIGNAL)
+        self.signal1 = self.I(SIGNAL, self.data.signal)
 
     def next(self):
         super().next()
@@ -345,7 +299,7 @@ class MyCandlesStrat(Strategy):
     atr_f = 2.0
     def init(self):
         super().init()
-        self.signal1 = self.I(SIGNAL)
+        self.signal1 = self.I(SIGNAL, self.data.signal)
         self.sltr=0
 
     def next(self):
@@ -383,7 +337,7 @@ class MyCandlesStrat(Strategy):
     lotsize = 0.83
     def init(self):
         super().init()
-        self.signal1 = self.I(SIGNAL)
+        self.signal1 = self.I(SIGNAL, self.data.signal)
         self.ratio = 1.
         self.risk_perc = 0.1
 
@@ -407,11 +361,19 @@ print(stat)
 
 # Define a range of values to test for each parameter
 param_grid = {'lotsize': list(np.arange(0.1, 1, 0.01))}
-# Run the optimization
-res = bt.optimize(**param_grid, random_state=5)
+# Run the optimization on a quarter of the 90 backtests an exhaustive bt.optimize needs
+res = model_search(data, MyCandlesStrat, param_grid, maximize='SQN', budget=.25, random_state=5,
+                   cash=100_000, margin=1/1, commission=.05)
 
 # Print the best results and the parameters that lead to these results
 print("Best result: ", res['Return [%]'])
-print("Parameters for best result: ", res['_strategy'])
-
-
+print("Parameters for best result: ", res['_params'])
+print("Search: ", res['_search'])
+
+# Walk-forward: re-fit the lot size on each rolling year, trade it on the following quarter.
+# MyCandlesStrat is defined in this script, which worker processes cannot import
+# (under spawn they would re-run it), so the folds run in this process
+wf = walk_forward(data, MyCandlesStrat, {'lotsize': list(np.arange(0.1, 1, 0.1))}, train=250, test=60,
+                  maximize='SQN', processes=1, cash=100_000, margin=1/1, commission=.05)
+print(wf.folds)
+print("Out-of-sample return [%]: ", (wf.equity.iloc[-1]/100_000-1)*100)
@@ -1,6 +1,6 @@
 import pandas as pd
 import numpy as np
-import yfinance as yf
+import bar_cache
 from backtesting import Backtest, Strategy
 from backtesting.lib import crossover
 import matplotlib.pyplot as plt
@@ -46,7 +46,7 @@ if __name__ == "__main__":
     end_date = input("Enter the end date (YYYY-MM-DD): ")
     end_date = end_date.replace("=", "-")  # Correcting the end date input
 
-    data = yf.download(ticker, start=start_date, end=end_date)
+    data = bar_cache.download(ticker, start=start_date, end=end_date)
 
     param_grid = {
         'n1': range(10, 51, 10),
@@ -1,8 +1,9 @@
 import pandas as pd
 import numpy as np
-import yfinance as yf
+import bar_cache
 from backtesting import Backtest, Strategy
 from backtesting.lib import crossover
+from crossover_grid import optimize_crossover
 
 import matplotlib.pyplot as plt
 import seaborn as sns
@@ -37,7 +38,7 @@ if __name__ == "__main__":
     start_date = input("Enter the start date (YYYY-MM-DD): ")
     end_date = input("Enter the end date (YYYY-MM-DD): ")
     
-    data = yf.download(ticker, start=start_date, end=end_date)
+    data = bar_cache.download(ticker, start=start_date, end=end_date)
 
     bt = Backtest(data, PercentageBasedSLStrategy, cash=10_000, commission=.002)
 
@@ -47,11 +48,14 @@ if __name__ == "__main__":
         'sl_percentage': [0.01, 0.02, 0.03, 0.05]  # Range for stop-loss percentage
     }
 
-    optimization_results = bt.optimize(**param_grid, maximize='Sharpe Ratio', return_heatmap=False)
+    # Long-only crossover with stop-loss and min_periods=1 averages, all combinations simulated together
+    optimization_results = optimize_crossover(data, **param_grid, long_only=True, min_periods=1,
+                                              maximize='Sharpe Ratio', cash=10_000, commission=.002)
 
-    print("Optimized Parameters:", optimization_results._strategy)
+    print("Optimized Parameters:", optimization_results['_params'])
     print("Optimized Sharpe Ratio:", optimization_results['Sharpe Ratio'])
 
+    bt.run(**optimization_results['_params'])
     bt.plot()
 
     plt.figure(figsize=(10, 6))
@@ -2,7 +2,7 @@
 import pandas as pd
 
 # Fetching financial market data
-import yfinance as yf
+import bar_cache
 
 # Backtesting library
 from backtesting import Backtest, Strategy
@@ -45,7 +45,7 @@ if __name__ == "__main__":
     ticker = input("Enter the ticker symbol: ")
     start = input("Enter the start date (YYYY-MM-DD): ")
     end = input("Enter the end date (YYYY-MM-DD): ")
-    data = yf.download(ticker, start, end)
+    data = bar_cache.download(ticker, start, end)
 
     # Initialize the Backtest object
     bt = Backtest(data, MovingAverageCrossoverStrategy, cash=10_000, commission=.002)
@@ -1,12 +1,15 @@
-import yfinance as yf
+import bar_cache
 import pandas_ta as pa
 import plotly.graph_objects as go
 import numpy as np
 import pandas as pd
+from signal_generator import generate_window_signals
+from bar_stream import candles_frame
+from order_gateway import OrderGateway
 
 # Import test data
 def get_data(symbol: str):
-    data = yf.download(tickers=symbol, period='300d', interval='1d')
+    data = bar_cache.download(tickers=symbol, period='300d', interval='1d')
     data.reset_index(inplace=True)
     return data
 # Get the data
@@ -32,20 +35,6 @@ fig.update_yaxes(gridcolor='black')
 fig.show()
 
 # Signals function
-def identify_rejection(data):
-    # Create a new column for rejection signal
-    data['rejection'] = data.apply(lambda row: 2 if (
-        ( (min(row['Open'], row['Close']) - row['Low']) > (1.5 * abs(row['Close'] - row['Open']))) and 
-        (row['High'] - max(row['Close'], row['Open'])) < (0.8 * abs(row['Close'] - row['Open'])) and 
-        (abs(row['Open'] - row['Close']) > row['Open'] * 0.001)
-    ) else 1 if (
-        (row['High'] - max(row['Open'], row['Close'])) > (1.5 * abs(row['Open'] - row['Close'])) and 
-        (min(row['Close'], row['Open']) - row['Low']) < (0.8 * abs(row['Open'] - row['Close'])) and 
-        (abs(row['Open'] - row['Close']) > row['Open'] * 0.001)
-    ) else 0, axis=1)
-
-    return data
-
 def pointpos(x, xsignal):
     if x[xsignal]==1:
         return x['High']+1e-4
@@ -75,118 +64,15 @@ def plot_with_signal(dfpl):
                     name="Signal")
     fig.show()
 
-def support(df1, l, n1, n2): #n1 n2 before and after candle l
-    if ( df1.Low[l-n1:l].min() < df1.Low[l] or
-        df1.Low[l+1:l+n2+1].min() < df1.Low[l] ):
-        return 0
-    return 1
-
-def resistance(df1, l, n1, n2): #n1 n2 before and after candle l
-    if ( df1.High[l-n1:l].max() > df1.High[l] or
-       df1.High[l+1:l+n2+1].max() > df1.High[l] ):
-        return 0
-    return 1
-
-def closeResistance(l, levels, lim, df):
-    if len(levels) == 0:
-        return 0
-    c1 = abs(df['High'][l] - min(levels, key=lambda x: abs(x - df['High'][l]))) <= lim
-    c2 = abs(max(df['Open'][l], df['Close'][l]) - min(levels, key=lambda x: abs(x - df['High'][l]))) <= lim
-    c3 = min(df['Open'][l], df['Close'][l]) < min(levels, key=lambda x: abs(x - df['High'][l]))
-    c4 = df['Low'][l] < min(levels, key=lambda x: abs(x - df['High'][l]))
-    if (c1 or c2) and c3 and c4:
-        return min(levels, key=lambda x: abs(x - df['High'][l]))
-    else:
-        return 0
-
-def closeSupport(l, levels, lim, df):
-    if len(levels) == 0:
-        return 0
-    c1 = abs(df['Low'][l] - min(levels, key=lambda x: abs(x - df['Low'][l]))) <= lim
-    c2 = abs(min(df['Open'][l], df['Close'][l]) - min(levels, key=lambda x: abs(x - df['Low'][l]))) <= lim
-    c3 = max(df['Open'][l], df['Close'][l]) > min(levels, key=lambda x: abs(x - df['Low'][l]))
-    c4 = df['High'][l] > min(levels, key=lambda x: abs(x - df['Low'][l]))
-    if (c1 or c2) and c3 and c4:
-        return min(levels, key=lambda x: abs(x - df['Low'][l]))
-    else:
-        return 0
-
-def is_below_resistance(l, level_backCandles, level, df):
-    return df.loc[l-level_backCandles:l-1, 'High'].max() < level
-
-def is_above_support(l, level_backCandles, level, df):
-    return df.loc[l-level_backCandles:l-1, 'Low'].min() > level
-
-# Defining and testing signal functions
-def check_candle_signal(l, n1, n2, levelbackCandles, windowbackCandles, df):
-    df=identify_rejection(df)
-    ss = []
-    rr = []
-    for subrow in range(l-levelbackCandles, l-n2+1):
-        if support(df, subrow, n1, n2):
-            ss.append(df.Low[subrow])
-        if resistance(df, subrow, n1, n2):
-            rr.append(df.High[subrow])
-
-    ss.sort() #keep lowest support when popping a level
-    for i in range(1,len(ss)):
-        if(i>=len(ss)):
-            break
-        if abs(ss[i]-ss[i-1])/ss[i]<=0.001: # merging close distance levels
-            ss.pop(i)
-
-    rr.sort(reverse=True) # keep highest resistance when popping one
-    for i in range(1,len(rr)):
-        if(i>=len(rr)):
-            break
-        if abs(rr[i]-rr[i-1])/rr[i]<=0.001: # merging close distance levels
-            rr.pop(i)
-
-    #----------------------------------------------------------------------
-    # joined levels
-    rrss = rr+ss
-    rrss.sort()
-    for i in range(1,len(rrss)):
-        if(i>=len(rrss)):
-            break
-        if abs(rrss[i]-rrss[i-1])/rrss[i]<=0.001: # merging close distance levels
-            rrss.pop(i)
-    cR = closeResistance(l, rrss, df.Close[l]*0.003, df)
-    cS = closeSupport(l, rrss, df.Close[l]*0.003, df)
-    #----------------------------------------------------------------------
-
-    # cR = closeResistance(l, rr, 150e-5, df)
-    # cS = closeSupport(l, ss, 150e-5, df)
-    #print(rrss,df.Close*0.002)
-    if (df.rejection[l] == 1 and cR and is_below_resistance(l,windowbackCandles,cR, df)):
-        return 1
-    elif(df.rejection[l] == 2 and cS and is_above_support(l,windowbackCandles,cS, df)):
-        return 2
-    else:
-        return 0
-
-#check_candle_signal(l=len(data)-1, n1=10, n2=10, levelbackCandles=200, windowbackCandles=11, df=data)
-
 n1=5 
 n2=5 
 levelbackCandles=100 
 windowbackCandles=5
 
-signal = [0 for i in range(0, levelbackCandles + n1 + 1)] #fill 0 signals for first rows
-
-for i in range(0, len(data) - 1 - levelbackCandles - n1):
-    df = data[i + n1 + 1:i + levelbackCandles + n1 + 1 + 1].copy()
-    df.reset_index(inplace=True)
-
-    # Validate the return value of check_candle_signal before appending
-    result = check_candle_signal(l=len(df)-1,
-                                    n1=n1,
-                                    n2=n2,
-                                    levelbackCandles=levelbackCandles,
-                                    windowbackCandles=windowbackCandles,
-                                    df=df)
-    signal.append(result)
-data["signal"] = signal
+# The support/resistance rejection signal of every bar: the levels of each bar come
+# from offsets into the full columns and rejection is classified once. Live ticks
+# use trading_loop's StreamingSignal, which only evaluates the new bars
+data["signal"] = generate_window_signals(data, n1, n2, levelbackCandles, windowbackCandles)
 
 # might be a print command 
 data.signal.value_counts()
@@ -195,12 +81,9 @@ data['pointpos'] = data.apply(lambda row: pointpos(row,"signal"), axis=1)
 plot_with_signal(data[:])
 
 # Connect to the market and execute trades
-from apscheduler.schedulers.blocking import BlockingScheduler
-from oandapyV20 import API
-import oandapyV20.endpoints.orders as orders
-from oandapyV20.contrib.requests import MarketOrderRequest
+# OFFLINE = True replays NVDA.csv bar by bar through the same loop, with a mock broker
+OFFLINE = False
 from oanda_candles import Pair, Gran, CandleClient
-from oandapyV20.contrib.requests import TakeProfitDetails, StopLossDetails
 
 # from config import access_token, accountID
 access_token='f5b337d19e6b1ef7bea5a897941e1bfa-b6a2d2ffb8e7061e67d72279c3aecfee'
@@ -212,61 +95,44 @@ def get_candles(n):
     candles = collector.grab(n)
     return candles
 
-candles = get_candles(300)
-# for candle in candles:
-#     print(float(str(candle.bid.o))>1)
-
-
-def trading_job():
+if not OFFLINE:
     candles = get_candles(300)
-    dfstream = pd.DataFrame(columns=['Open','Close','High','Low'])
-    
-    i=0
-    for candle in candles:
-        dfstream.loc[i, ['Open']] = float(str(candle.bid.o))
-        dfstream.loc[i, ['Close']] = float(str(candle.bid.c))
-        dfstream.loc[i, ['High']] = float(str(candle.bid.h))
-        dfstream.loc[i, ['Low']] = float(str(candle.bid.l))
-        i=i+1
-
-    dfstream['Open'] = dfstream['Open'].astype(float)
-    dfstream['Close'] = dfstream['Close'].astype(float)
-    dfstream['High'] = dfstream['High'].astype(float)
-    dfstream['Low'] = dfstream['Low'].astype(float)
-
-    signal = check_candle_signal(l=len(dfstream)-1, n1=6, n2=6, levelbackCandles=200, windowbackCandles=7, df=dfstream)
-    
-    # EXECUTING ORDERS
-    accountID = "10100128766677001" #your account ID here
-    client = API(access_token)
-         
-    SLTPRatio = 2.
-    
-    SLBuy = dfstream['Low'].iloc[-1]
-    SLSell = dfstream['High'].iloc[-1]
-
-    TPBuy = dfstream['Close'].iloc[-1]+(dfstream['Close'].iloc[-1]-SLBuy)*SLTPRatio
-    TPSell = dfstream['Close'].iloc[-1]-(dfstream['Close'].iloc[-1]-SLSell)*SLTPRatio
-    
-    print(dfstream.iloc[:-1,:])
-    print(TPBuy, "  ", SLBuy, "  ", TPSell, "  ", SLSell)
-    #signal = 2
-    #Sell
-    if signal == 1:
-        mo = MarketOrderRequest(instrument="NVDA", units=-1, takeProfitOnFill=TakeProfitDetails(price=TPSell).data, stopLossOnFill=StopLossDetails(price=SLSell).data)
-        r = orders.OrderCreate(accountID, data=mo.data)
-        rv = client.request(r)
-        print(rv)
-    #Buy
-    elif signal == 2:
-        mo = MarketOrderRequest(instrument="NVDA", units=1, takeProfitOnFill=TakeProfitDetails(price=TPBuy).data, stopLossOnFill=StopLossDetails(price=SLBuy).data)
-        r = orders.OrderCreate(accountID, data=mo.data)
-        rv = client.request(r)
-        print(rv)
-
-        # Executing  orders automatically with a schedular
-        #trading_job()
-
-scheduler = BlockingScheduler()
-scheduler.add_job(trading_job, 'cron', hour='23', minute='55', start_date='2023-10-20 23:55:00', timezone='America/Miami')
-scheduler.start()
\ No newline at end of file
+    # for candle in candles:
+    #     print(float(str(candle.bid.o))>1)
+    # float64 OHLC frame of the bid (or ask / mid) prices, converted in one pass
+    dfstream = candles_frame(candles, side='bid')
+    print(dfstream.tail())
+
+
+# One gateway for the session: orders reuse its keep-alive connections instead of
+# a new API client (and TLS handshake) per run; gateway.latency has the timings
+gateway = OrderGateway(access_token, accountID)
+
+# Every instrument on one asyncio loop: each tick syncs its closed candles into a
+# ring buffer, moves its signal forward by the new bars and sends the bracket order
+# (trading_loop.bracket: stop-loss at the signal candle, take-profit at 2x the risk).
+# Candle fetches and orders of several instruments overlap, and one hanging
+# request does not hold up the others
+import asyncio
+from bar_stream import FakeCandleSource
+from trading_loop import Instrument, MockBroker, TradingLoop
+
+if OFFLINE:
+    source = FakeCandleSource(pd.read_csv('NVDA.csv', index_col=0, parse_dates=True), cursor=300)
+    broker = MockBroker()
+    trading_loop = TradingLoop([Instrument("NVDA", source.grab)], broker)
+
+    async def replay():
+        # one tick per closed bar, as the daily schedule would run them
+        while True:
+            await trading_loop.tick()
+            if source.cursor == len(source.data):
+                break
+            source.advance()
+
+    asyncio.run(replay())
+    trading_loop.close()
+    print(len(broker.orders), "orders")
+else:
+    trading_loop = TradingLoop([Instrument("NVDA", get_candles)], gateway)
+    asyncio.run(trading_loop.run(at='23:55', tz='America/New_York'))
\ No newline at end of file
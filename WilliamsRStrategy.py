@@ -1,17 +1,26 @@
-import yfinance as yf
+import bar_cache
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 from backtesting import Backtest, Strategy
 import pandas_ta as ta
 import multiprocessing
+from indicator_cache import cached
 
 # Fetches historical market data
 def fetch_data(symbol, start, end, interval='1d'):
-    data = yf.download(tickers=symbol, start=start, end=end, interval=interval)
+    data = bar_cache.download(tickers=symbol, start=start, end=end, interval=interval)
     data.reset_index(inplace=True)
     return data
 
+# Williams %R over `length` bars, shared by every run (and walk-forward fold) with the same length
+@cached
+def willr(high, low, close, length):
+    hh = pd.Series(high).rolling(window=length).max()
+    ll = pd.Series(low).rolling(window=length).min()
+    will_r = -100 * ((hh - pd.Series(close)) / (hh - ll))
+    return will_r.bfill().values
+
 # Trading strategy based on Williams %R
 class WilliamsRStrategy(Strategy):
     # Define 'length' as a class variable for optimization
@@ -19,13 +28,7 @@ class WilliamsRStrategy(Strategy):
     
     def init(self):
         # Use 'self.length' to access the parameter
-        def willr(high, low, close):
-            hh = pd.Series(high).rolling(window=self.length).max()
-            ll = pd.Series(low).rolling(window=self.length).min()
-            will_r = -100 * ((hh - pd.Series(close)) / (hh - ll))
-            return will_r.bfill().values
-
-        self.williams_r = self.I(willr, self.data.High, self.data.Low, self.data.Close)
+        self.williams_r = self.I(willr, self.data.High, self.data.Low, self.data.Close, self.length)
 
     def next(self):
         if self.williams_r[-1] < -80:
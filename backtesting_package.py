@@ -1,25 +1,22 @@
 import pandas as pd
 from backtesting import Backtest, Strategy
 from backtesting.lib import crossover
-import yfinance as yf
-
-# Simple Moving Average function
-def SMA(values, n):
-    """
-    Return simple moving average of `values`, at
-    each step taking into account `n` previous values.
-    """
-    return pd.Series(values).rolling(n).mean()
+import bar_cache
+from ma_bank import MABank, grid_windows
 
 # SMA Cross Strategy class
 class SmaCross(Strategy):
     n1 = 60
     n2 = 90
+    # All windows of the grid being optimized, so every run reads its
+    # moving averages from the same precomputed MA bank
+    windows = ()
 
     def init(self):
         # Precompute the two moving averages
-        self.sma1 = self.I(SMA, self.data.Close, self.n1)
-        self.sma2 = self.I(SMA, self.data.Close, self.n2)
+        bank = MABank(self.data.Close, self.windows or (self.n1, self.n2))
+        self.sma1 = self.I(bank.sma, self.n1, name=f'SMA({self.n1})')
+        self.sma2 = self.I(bank.sma, self.n2, name=f'SMA({self.n2})')
 
     def next(self):
         # If sma1 crosses above sma2, close any existing
@@ -39,7 +36,7 @@ class SmaCross(Strategy):
 ticker = input("Enter the ticker: ")
 start = input("Enter the start date (YYYY-MM-DD): ")
 end = input("Enter the end date (YYYY-MM-DD): ")
-data = yf.download(ticker, start=start, end=end)
+data = bar_cache.download(ticker, start=start, end=end)
 
 # Code for running the backtest.
 # Assumes the existence of `data` variable containing backtest data.
@@ -54,6 +51,7 @@ bt.plot()
 
 # Define a range of values to test for each parameter
 param_grid = {'n1': range(5, 101, 5), 'n2': range(10, 251, 5)}
+SmaCross.windows = grid_windows(param_grid['n1'], param_grid['n2'])
 # Run the optimization
 res = bt.optimize(**param_grid)
 
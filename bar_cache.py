@@ -0,0 +1,151 @@
+import json
+import os
+
+import pandas as pd
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.bar_cache')
+
+
+def yfinance_downloader(symbol, start, end, interval):
+    """Default downloader: one yf.download call for [start, end)."""
+    import yfinance as yf
+    if start is None:
+        # period='max' runs up to today whatever `end` is: cut it there
+        data = yf.download(tickers=symbol, period='max', interval=interval, progress=False)
+    else:
+        data = yf.download(tickers=symbol, start=start, end=end, interval=interval, progress=False)
+    if isinstance(data.columns, pd.MultiIndex):  # newer yfinance adds a ticker level
+        data.columns = data.columns.get_level_values(0)
+    return _between(data, None, end)
+
+
+def csv_downloader(path):
+    """Downloader serving bars from a local CSV such as NVDA.csv (for offline runs)."""
+    data = pd.read_csv(path, index_col=0, parse_dates=True)
+
+    def download(symbol, start, end, interval):
+        return _between(data, start, end)
+    return download
+
+
+def _as_index_time(ts, index):
+    # align a naive/aware timestamp with the timezone of the cached index
+    if ts is None:
+        return None
+    ts = pd.Timestamp(ts)
+    tz = getattr(index, 'tz', None)
+    if tz is not None and ts.tzinfo is None:
+        return ts.tz_localize(tz)
+    if tz is None and ts.tzinfo is not None:
+        return ts.tz_convert(None)
+    return ts
+
+
+def _between(data, start, end):
+    """Rows with start <= index < end (None means unbounded), like yf.download."""
+    if start is not None:
+        data = data[data.index >= _as_index_time(start, data.index)]
+    if end is not None:
+        data = data[data.index < _as_index_time(end, data.index)]
+    return data
+
+
+def period_start(period):
+    """Start date of a yfinance style period ('1000d', '2wk', '6mo', '1y', 'max')."""
+    if period is None or period == 'max':
+        return None
+    today = pd.Timestamp.now().normalize()
+    for unit, key in (('wk', 'weeks'), ('mo', 'months'), ('d', 'days'), ('y', 'years')):
+        if period.endswith(unit):
+            return today - pd.DateOffset(**{key: int(period[:-len(unit)])})
+    raise ValueError(f"Unsupported period: {period}")
+
+
+class BarCache:
+    """Local OHLCV store in front of a downloader, one Parquet file per (symbol, interval).
+
+    The first request for a symbol downloads the requested range. Later
+    requests only download what the store does not cover yet: the bars after
+    the last cached one (the last bar is fetched again as it may have been
+    incomplete) and, if an earlier start is asked for, the bars before the
+    first one. The downloader is any callable
+    `downloader(symbol, start, end, interval) -> DataFrame`, so the cache can
+    run offline against csv_downloader('NVDA.csv').
+    """
+
+    def __init__(self, root=CACHE_DIR, downloader=yfinance_downloader):
+        self.root = root
+        self.downloader = downloader
+
+    def path(self, symbol, interval):
+        return os.path.join(self.root, f"{symbol}_{interval}.parquet")
+
+    def _meta_path(self, symbol, interval):
+        return os.path.join(self.root, f"{symbol}_{interval}.json")
+
+    def load(self, symbol, interval='1d'):
+        """Cached bars and coverage metadata, or (None, None) if nothing is stored."""
+        path = self.path(symbol, interval)
+        if not os.path.exists(path):
+            return None, None
+        with open(self._meta_path(symbol, interval)) as f:
+            meta = json.load(f)
+        return pd.read_parquet(path), meta
+
+    def _save(self, symbol, interval, data, meta):
+        os.makedirs(self.root, exist_ok=True)
+        path = self.path(symbol, interval)
+        data.to_parquet(path + '.tmp')
+        os.replace(path + '.tmp', path)
+        meta_path = self._meta_path(symbol, interval)
+        with open(meta_path + '.tmp', 'w') as f:
+            json.dump(meta, f)
+        os.replace(meta_path + '.tmp', meta_path)
+
+    def _fetch(self, symbol, start, end, interval):
+        # only [start, end) is stored, whatever range the downloader returned
+        data = self.downloader(symbol, start, end, interval)
+        return _between(data, start, end) if data is not None and len(data) else pd.DataFrame()
+
+    def get(self, symbol, start=None, end=None, period=None, interval='1d'):
+        """Bars of `symbol` with start <= date < end, downloading only what is missing."""
+        if start is None:
+            start = period_start(period)
+        start = None if start is None else pd.Timestamp(start)
+        end = None if end is None else pd.Timestamp(end)
+
+        data, meta = self.load(symbol, interval)
+        changed = data is None
+        if data is None:
+            data = self._fetch(symbol, start, end, interval)
+            meta = {'start': None if start is None else start.isoformat()}
+        else:
+            parts = [data]
+            covered = None if meta['start'] is None else pd.Timestamp(meta['start'])
+            if covered is not None and (start is None or start < covered):
+                # missing head
+                parts.insert(0, self._fetch(symbol, start, covered, interval))
+                meta['start'] = None if start is None else start.isoformat()
+            if len(data) and (end is None or _as_index_time(end, data.index) > data.index[-1]):
+                # missing tail, starting again from the last cached bar
+                parts.append(self._fetch(symbol, data.index[-1], end, interval))
+            parts = [p for p in parts if len(p)]
+            if len(parts) > 1:
+                data = pd.concat(parts)
+                data = data[~data.index.duplicated(keep='last')].sort_index()
+                changed = True
+
+        if changed and len(data):
+            self._save(symbol, interval, data, meta)
+        return _between(data, start, end)
+
+
+_default_cache = None
+
+
+def download(tickers, start=None, end=None, period=None, interval='1d'):
+    """Drop-in for yf.download(tickers, start, end, period=..., interval=...) through the local cache."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = BarCache()
+    return _default_cache.get(tickers, start=start, end=end, period=period, interval=interval)
@@ -0,0 +1,96 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+
+def convert(source, dest=None):
+    """One-time conversion of a CSV (e.g. NVDA.csv) or Parquet bar file to the bar store format.
+
+    The store is an uncompressed Feather (Arrow IPC) file with a 'Date'
+    timestamp column, float64 prices and int64 volume, which can be memory
+    mapped straight into NumPy arrays. Returns the store path.
+    """
+    if dest is None:
+        dest = os.path.splitext(source)[0] + '.arrow'
+    if source.endswith('.parquet'):
+        data = pd.read_parquet(source)
+    else:
+        data = pd.read_csv(source, index_col=0, parse_dates=True)
+    write(data, dest)
+    return dest
+
+
+def write(data, dest):
+    """Writes a Date-indexed OHLCV DataFrame (yf.download layout) to the bar store format."""
+    data = data.sort_index()
+    columns = {'Date': pa.array(data.index.values.astype('datetime64[ns]'))}
+    for name in data.columns:
+        values = data[name].values
+        dtype = np.int64 if np.issubdtype(values.dtype, np.integer) else np.float64
+        columns[str(name)] = pa.array(values.astype(dtype))
+    feather.write_feather(pa.table(columns), dest, compression='uncompressed')
+
+
+class BarStore:
+    """Memory-mapped OHLCV columns of one bar store file.
+
+    store['Close'] is a read-only NumPy view straight onto the mapped file, so
+    only the pages that are actually used get read, and nothing is parsed.
+    between() narrows the rows to a date range with a binary search on the
+    Date column. Since it maps column names to arrays, a store can be passed
+    wherever the signal generators expect a dataframe; frame() wraps the same
+    views in a DataFrame for Backtest and pandas_ta.
+    """
+
+    def __init__(self, path, columns=None):
+        self.path = path
+        table = feather.read_table(path, columns=['Date'] + list(columns) if columns else None, memory_map=True)
+        self._columns = {name: table.column(name).chunk(0).to_numpy(zero_copy_only=True)
+                         if table.column(name).num_chunks == 1
+                         else table.column(name).to_numpy()
+                         for name in table.column_names}
+        self._rows = slice(0, table.num_rows)
+
+    @property
+    def columns(self):
+        return [name for name in self._columns if name != 'Date']
+
+    @property
+    def index(self):
+        return pd.DatetimeIndex(self._columns['Date'][self._rows], name='Date')
+
+    def __len__(self):
+        return self._rows.stop - self._rows.start
+
+    def __getitem__(self, name):
+        return self._columns[name][self._rows]
+
+    def __contains__(self, name):
+        return name in self._columns
+
+    def between(self, start=None, end=None):
+        """View of the rows with start <= Date < end (None means unbounded)."""
+        dates = self._columns['Date']
+        lo, hi = self._rows.start, self._rows.stop
+        if start is not None:
+            lo = max(lo, np.searchsorted(dates, np.datetime64(pd.Timestamp(start), 'ns'), side='left'))
+        if end is not None:
+            hi = min(hi, np.searchsorted(dates, np.datetime64(pd.Timestamp(end), 'ns'), side='left'))
+        view = object.__new__(BarStore)
+        view.path = self.path
+        view._columns = self._columns
+        view._rows = slice(lo, max(lo, hi))
+        return view
+
+    def frame(self, columns=None):
+        """Date-indexed DataFrame over the mapped columns, without copying them."""
+        columns = self.columns if columns is None else columns
+        return pd.DataFrame({name: self[name] for name in columns}, index=self.index, copy=False)
+
+
+def open_store(path, columns=None, start=None, end=None):
+    """Opens a bar store, optionally restricted to some columns and a date range."""
+    return BarStore(path, columns).between(start, end)
@@ -0,0 +1,218 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from level_book import LevelBook
+from nearest_level import close_resistance, close_support
+from rejection import rejection_signal
+
+COLUMNS = ['Open', 'High', 'Low', 'Close']
+
+
+def _as_time(time):
+    # naive UTC datetime64[ns] of a datetime / Timestamp / string
+    time = pd.Timestamp(time)
+    if time.tzinfo is not None:
+        time = time.tz_convert(None)
+    return np.datetime64(time, 'ns')
+
+
+class BarBuffer:
+    """Fixed-capacity ring buffer of float64 OHLC bars and their times.
+
+    Every bar is written twice, at slot k % capacity and capacity slots
+    later, so the last len(buffer) bars are always one contiguous view:
+    buffer['Close'] is a NumPy array (oldest first) without any copying, and
+    appending a bar costs the same whatever the history length. `count` is
+    the number of bars appended so far, i.e. the absolute number of the next
+    bar; `first` is the absolute number of the oldest bar still held.
+    """
+
+    def __init__(self, capacity=512):
+        self.capacity = capacity
+        self.count = 0
+        self._start = 0  # bars before this one were cleared
+        self._prices = np.full((len(COLUMNS), 2*capacity), np.nan)
+        self._times = np.zeros(2*capacity, dtype='datetime64[ns]')
+
+    def __len__(self):
+        return min(self.count-self._start, self.capacity)
+
+    @property
+    def first(self):
+        return self.count-len(self)
+
+    def _window(self):
+        start = self.first % self.capacity
+        return slice(start, start+len(self))
+
+    def __getitem__(self, name):
+        return self._prices[COLUMNS.index(name), self._window()]
+
+    @property
+    def times(self):
+        return self._times[self._window()]
+
+    @property
+    def last_time(self):
+        return self._times[(self.count-1) % self.capacity] if len(self) else None
+
+    def append(self, time, open_, high, low, close):
+        """Adds a closed bar; returns False (and ignores it) if it is not newer than the last one."""
+        time = _as_time(time)
+        if len(self) and time <= self.last_time:
+            return False
+        slot = self.count % self.capacity
+        for slot_ in (slot, slot+self.capacity):
+            self._prices[:, slot_] = open_, high, low, close
+            self._times[slot_] = time
+        self.count += 1
+        return True
+
+    def clear(self):
+        """Drops the held bars; bar numbering goes on from `count`."""
+        self._start = self.count
+
+    def frame(self):
+        """Copy of the held bars as a Date-indexed DataFrame (for printing and plotting)."""
+        return pd.DataFrame({name: self[name].copy() for name in COLUMNS},
+                            index=pd.DatetimeIndex(self.times.copy(), name='Date'))
+
+
+SIDES = ('bid', 'ask', 'mid')
+
+
+def candle_arrays(candles, side='bid'):
+    """Times and (n, 4) float64 OHLC array of oanda_candles Candles, read in one pass.
+
+    `side` picks the bid, ask or mid prices. All prices go through
+    float(str(price)) as before, but straight into one preallocated array
+    (np.fromiter with a known count) instead of DataFrame cells.
+    """
+    if side not in SIDES:
+        raise ValueError(f"side must be one of {SIDES}, not {side!r}")
+    candles = list(candles)
+    prices = np.fromiter((float(str(price)) for candle in candles
+                          for ohlc in (getattr(candle, side),) for price in (ohlc.o, ohlc.h, ohlc.l, ohlc.c)),
+                         dtype=np.float64, count=4*len(candles)).reshape(len(candles), 4)
+    times = pd.DatetimeIndex([candle.time for candle in candles], name='Date')
+    if times.tz is not None:
+        times = times.tz_convert(None)
+    return times.values.astype('datetime64[ns]'), prices
+
+
+def candles_frame(candles, side='bid'):
+    """Date-indexed float64 OHLC DataFrame of oanda_candles Candles, built once from candle_arrays."""
+    times, prices = candle_arrays(candles, side)
+    return pd.DataFrame(prices, columns=COLUMNS, index=pd.DatetimeIndex(times, name='Date'))
+
+
+def sync(bars, grab, refresh=10, side='bid'):
+    """Appends the candles closed since the last call and returns how many there were.
+
+    `grab(n)` returns the last n closed candles (oanda_candles'
+    collector.grab). An empty buffer is filled with `capacity` candles;
+    afterwards only the last `refresh` are requested, unless none of them
+    overlaps the buffer (the job missed more than `refresh` bars), in which
+    case the buffer is refilled. `side` picks the bid, ask or mid prices.
+    """
+    times, prices = candle_arrays(grab(refresh if len(bars) else bars.capacity), side)
+    if len(bars) and len(times) and bars.last_time < times[0]:
+        bars.clear()
+        times, prices = candle_arrays(grab(bars.capacity), side)
+    return sum(bars.append(time, *ohlc) for time, ohlc in zip(times, prices))
+
+
+class _Absolute:
+    # a buffer column indexed by absolute bar number, as LevelBook expects
+    def __init__(self, values, first):
+        self.values = values
+        self.first = first
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self.values[key.start-self.first:key.stop-self.first]
+        return self.values[key-self.first]
+
+
+class StreamingSignal:
+    """check_candle_signal for each new bar of a BarBuffer, in time independent of the history.
+
+    Gives the signal check_candle_signal (CompleteTradingSystem.py) returns
+    for the last row of a frame holding the buffered bars, but the support/resistance
+    levels come from a LevelBook that is moved forward one bar at a time,
+    and only the new candle is classified. update() returns 0 until the
+    buffer holds levelbackCandles+n1+1 bars, the history the levels of a bar
+    depend on.
+    """
+
+    def __init__(self, n1, n2, levelbackCandles, windowbackCandles, tolerance=0.001):
+        self.n1 = n1
+        self.n2 = n2
+        self.levelbackCandles = levelbackCandles
+        self.windowbackCandles = windowbackCandles
+        self.book = LevelBook(n1, n2, levelbackCandles, tolerance)
+        self.next = 0  # absolute number of the next bar to evaluate
+        self.signal = 0
+
+    @property
+    def history(self):
+        return self.levelbackCandles+self.n1+1
+
+    def update(self, bars):
+        """Evaluates the bars appended since the last call; returns the signal of the latest one."""
+        if bars.capacity < self.history:
+            raise ValueError(f'A buffer of {bars.capacity} bars cannot hold the {self.history} bars the signal needs')
+        # after a gap (or at the start) the first bars only warm up the history
+        self.next = max(self.next, bars.first+self.history-1)
+        opens, highs, lows, closes = (bars[name] for name in COLUMNS)
+        low, high = _Absolute(lows, bars.first), _Absolute(highs, bars.first)
+        self.signal = 0
+        for l in range(self.next, bars.count):
+            self.signal = self._signal(l-bars.first, self.book.update(l, low, high), opens, highs, lows, closes)
+        self.next = max(self.next, bars.count)
+        return self.signal
+
+    def _signal(self, i, levels, opens, highs, lows, closes):
+        o, h, lo, c = opens[i], highs[i], lows[i], closes[i]
+        rejection = rejection_signal([o], [h], [lo], [c])[0]
+        if not rejection:
+            return 0
+        prior = slice(max(i-self.windowbackCandles, 0), i)
+        if rejection == 1:
+            level = close_resistance(levels, h, lo, o, c, c*0.003)
+            return 1 if level and highs[prior].max() < level else 0
+        level = close_support(levels, h, lo, o, c, c*0.003)
+        return 2 if level and lows[prior].min() > level else 0
+
+
+_Price = namedtuple('_Price', ['o', 'h', 'l', 'c'])
+_Candle = namedtuple('_Candle', ['time', 'bid', 'ask', 'mid'])
+
+
+class FakeCandleSource:
+    """Replays an OHLC DataFrame (e.g. NVDA.csv) as oanda_candles style candles.
+
+    grab(n) returns the last n of the `cursor` bars closed so far, with the
+    same prices on the bid, ask and mid side, and advance() closes the next
+    bar. Passing source.grab instead of the OANDA collector runs
+    TradingLoop offline.
+    """
+
+    def __init__(self, data, cursor=300):
+        self.data = data
+        self.cursor = cursor
+        self._prices = data[COLUMNS].to_numpy(dtype=np.float64)
+        self._times = data.index.to_pydatetime()
+
+    def grab(self, n):
+        candles = []
+        for i in range(max(self.cursor-n, 0), self.cursor):
+            price = _Price(*self._prices[i])
+            candles.append(_Candle(self._times[i], price, price, price))
+        return candles
+
+    def advance(self, bars=1):
+        self.cursor = min(self.cursor+bars, len(self.data))
+
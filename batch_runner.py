@@ -0,0 +1,119 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+from backtesting import Backtest
+
+import bar_cache
+
+COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# set in every worker by _attach
+_shm = None
+_block = None
+_layout = None
+
+
+def pack(frames):
+    """Copies the OHLCV columns of {symbol: DataFrame} into one shared memory block.
+
+    The block is a (6, total_rows) array of 8-byte words: row 0 holds the
+    dates as int64 nanoseconds, rows 1-5 the float64 OHLCV columns, with the
+    symbols stacked one after the other. Returns the SharedMemory and the
+    layout {symbol: (start, stop)} needed to find each symbol again.
+    """
+    layout = {}
+    total = 0
+    for symbol, data in frames.items():
+        layout[symbol] = (total, total+len(data))
+        total += len(data)
+
+    shm = shared_memory.SharedMemory(create=True, size=max(6*total*8, 8))
+    block = np.ndarray((6, total), dtype=np.float64, buffer=shm.buf)
+    for symbol, data in frames.items():
+        start, stop = layout[symbol]
+        block[0, start:stop].view(np.int64)[:] = data.index.values.astype('datetime64[ns]').view(np.int64)
+        for row, name in enumerate(COLUMNS, start=1):
+            block[row, start:stop] = data[name].values if name in data else np.nan
+    return shm, layout
+
+
+def _attach(name, shape, layout):
+    global _shm, _block, _layout
+    try:
+        _shm = shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 has no track flag: keep the attach out of the resource
+        # tracker, the parent owns the block and unlinks it
+        from multiprocessing import resource_tracker
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            _shm = shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+    _block = np.ndarray(shape, dtype=np.float64, buffer=_shm.buf)
+    _layout = layout
+
+
+def symbol_frame(block, layout, symbol):
+    """Date-indexed OHLCV DataFrame over the symbol's slice of the shared block (no copy)."""
+    start, stop = layout[symbol]
+    index = pd.DatetimeIndex(block[0, start:stop].view('datetime64[ns]'), name='Date')
+    return pd.DataFrame({name: block[row, start:stop] for row, name in enumerate(COLUMNS, start=1)},
+                        index=index, copy=False)
+
+
+def _run_one(symbol, strategy, backtest_kwargs, params):
+    data = symbol_frame(_block, _layout, symbol)
+    stats = Backtest(data, strategy, **backtest_kwargs).run(**params)
+    row = {key: value for key, value in stats.items() if not key.startswith('_')}
+    row['Strategy'] = str(stats['_strategy'])
+    return symbol, row
+
+
+def run_batch(symbols, strategy, loader=None, processes=None, params=None, **backtest_kwargs):
+    """Backtests `strategy` on every symbol in a process pool and returns one stats table.
+
+    `loader(symbol)` returns the symbol's Date-indexed OHLCV DataFrame
+    (bar_cache.download by default). Prices are loaded once in the parent and
+    handed to the workers through shared memory, so only the symbol name and
+    the resulting stats cross the process boundary. `params` are passed to
+    Backtest.run, the remaining keyword arguments to Backtest. The strategy
+    class must be importable by the workers (defined at module level).
+    """
+    loader = loader or bar_cache.download
+    params = params or {}
+    frames = {}
+    for symbol in symbols:
+        data = loader(symbol).dropna(subset=['Open', 'High', 'Low', 'Close'])
+        if len(data):
+            frames[symbol] = data
+
+    shm, layout = pack(frames)
+    try:
+        shape = (6, sum(stop-start for start, stop in layout.values()))
+        with ProcessPoolExecutor(max_workers=processes or os.cpu_count(),
+                                 initializer=_attach, initargs=(shm.name, shape, layout)) as pool:
+            futures = [pool.submit(_run_one, symbol, strategy, backtest_kwargs, params) for symbol in frames]
+            rows = dict(future.result() for future in futures)
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return pd.DataFrame.from_dict(rows, orient='index').reindex(list(frames))
+
+
+if __name__ == "__main__":
+    from WilliamsRStrategy import WilliamsRStrategy
+
+    symbols = input("Enter the ticker symbols (comma separated): ").replace(' ', '').split(',')
+    start = input("Enter the start date (YYYY-MM-DD): ")
+    end = input("Enter the end date (YYYY-MM-DD): ")
+
+    stats = run_batch(symbols, WilliamsRStrategy,
+                      loader=lambda symbol: bar_cache.download(symbol, start, end),
+                      cash=10_000, commission=.002)
+    print(stats[['Return [%]', 'Sharpe Ratio', 'Max. Drawdown [%]', '# Trades']])
@@ -0,0 +1,202 @@
+from itertools import product
+from math import ceil
+
+import numpy as np
+from backtesting import Backtest
+
+
+class Params(dict):
+    """Parameter dict read as p.n1 as well as p['n1'], like bt.optimize's AttrDict."""
+    __getattr__ = dict.__getitem__
+
+
+def grid_points(param_grid, constraint=None):
+    """Admissible parameter dicts of a bt.optimize style grid, in bt.optimize's order."""
+    points = [Params(zip(param_grid, values)) for values in product(*param_grid.values())]
+    points = [p for p in points if constraint is None or constraint(p)]
+    if not points:
+        raise ValueError('No admissible parameter combinations to test')
+    return points
+
+
+def score(stats, maximize):
+    """stats[maximize] (or maximize(stats)) as a float, NaN when the run made no trades, as in bt.optimize."""
+    if not stats['# Trades']:
+        return np.nan
+    return float(maximize(stats) if callable(maximize) else stats[maximize])
+
+
+class _Evaluator:
+    """Backtests of one strategy on prefixes of the data, counted and memoized.
+
+    Runs are scored with score(); on a prefix of the data, trades still open
+    at its end are closed and counted. `bars` adds up the bars simulated, so
+    bars / len(data) is the cost in full-history backtests. With a
+    ResultStore, stats stored by earlier searches are reused instead of
+    rerun (counted in `reused` and `reused_bars`, not in the cost), and
+    every new run is saved as soon as it finishes.
+    """
+
+    def __init__(self, data, strategy, maximize, backtest_kwargs, store=None):
+        self.data = data
+        self.strategy = strategy
+        self.maximize = maximize
+        self.backtest_kwargs = backtest_kwargs
+        self.store = store
+        self.evaluations = 0
+        self.reused = 0
+        self.bars = 0
+        self.reused_bars = 0
+        self._scores = {}
+        self._backtests = {}
+        self._runs = {}
+
+    def score(self, params, length=None):
+        length = len(self.data) if length is None else length
+        key = (tuple(params.items()), length)
+        if key not in self._scores:
+            if length not in self._backtests:
+                kwargs = self.backtest_kwargs
+                if length < len(self.data):
+                    # a position still open at the end of a prefix counts as a trade there
+                    kwargs = dict(kwargs, finalize_trades=True)
+                self._backtests[length] = Backtest(self.data.iloc[:length], self.strategy, **kwargs)
+                if self.store is not None:
+                    self._runs[length] = self.store.run_key(self.strategy, self.data.iloc[:length], kwargs)
+            stats = None if self.store is None else self.store.get(self._runs[length], params)
+            if stats is None:
+                stats = self._backtests[length].run(**params)
+                self.evaluations += 1
+                self.bars += length
+                if self.store is not None:
+                    self.store.put(self._runs[length], params, stats)
+            else:
+                self.reused += 1
+                self.reused_bars += length
+            self._scores[key] = score(stats, self.maximize)
+        return self._scores[key]
+
+    def finish(self, method, best, grid_size):
+        """Full-history stats of `best`, its parameters under '_params' and the search report under '_search'."""
+        backtest = self._backtests.get(len(self.data)) or Backtest(self.data, self.strategy, **self.backtest_kwargs)
+        stats = backtest.run(**best)
+        stats['_params'] = {name: value.item() if isinstance(value, np.generic) else value
+                            for name, value in best.items()}
+        # the search's own savings count what it looked at, whether run or read from the store
+        stats['_search'] = {
+            'method': method,
+            'grid size': grid_size,
+            'evaluations': self.evaluations,
+            'full-history evaluations': self.bars/len(self.data),
+            'reused': self.reused,
+            'full-history evaluations reused': self.reused_bars/len(self.data),
+            'evaluations saved by search': grid_size-(self.bars+self.reused_bars)/len(self.data),
+        }
+        return stats
+
+
+def _best(points, scores):
+    scores = np.asarray(scores, dtype=np.float64)
+    if np.isnan(scores).all():
+        return points[0]
+    return points[int(np.nanargmax(scores))]
+
+
+def grid_search(data, strategy, param_grid, maximize='SQN', constraint=None, store=None, **backtest_kwargs):
+    """bt.optimize over the whole grid, one backtest after the other in this process.
+
+    For callers that already run in parallel at a coarser grain, like the
+    walk-forward folds, where a process pool per search would oversubscribe
+    the CPUs. Same result format as the budgeted searches. Given a
+    result_store.ResultStore as `store`, this search and the budgeted ones
+    skip combinations already backtested with the same strategy code, data
+    and settings, and save new runs as they finish.
+    """
+    points = grid_points(param_grid, constraint)
+    evaluator = _Evaluator(data, strategy, maximize, backtest_kwargs, store)
+    scores = [evaluator.score(p) for p in points]
+    return evaluator.finish('grid search', _best(points, scores), len(points))
+
+
+def successive_halving(data, strategy, param_grid, maximize='SQN', eta=3, rungs=3, min_bars=0,
+                       constraint=None, store=None, **backtest_kwargs):
+    """Budgeted bt.optimize: rank on a data prefix, promote the best 1/eta to a longer one.
+
+    Each rung multiplies the prefix by eta (starting at no fewer than `min_bars`
+    bars) up to the full history; candidates without trades on a prefix are
+    promoted as undecided. Returns the winner's full-history stats like
+    bt.optimize, with a '_search' report.
+    """
+    points = grid_points(param_grid, constraint)
+    evaluator = _Evaluator(data, strategy, maximize, backtest_kwargs, store)
+    n = len(data)
+
+    candidates = points
+    for rung in range(rungs):
+        length = n if rung == rungs-1 else min(n, max(int(n/eta**(rungs-1-rung)), min_bars))
+        scores = np.array([evaluator.score(p, length) for p in candidates])
+        if rung == rungs-1 or len(candidates) == 1:
+            break
+        # no trades yet on this prefix says nothing about the full history: promote those
+        # undecided, and only the best 1/eta of the ones that traded
+        traded = np.flatnonzero(~np.isnan(scores))
+        keep = traded[np.argsort(-scores[traded], kind='stable')[:ceil(len(traded)/eta)]]
+        promoted = np.union1d(keep, np.flatnonzero(np.isnan(scores)))
+        candidates = [candidates[i] for i in promoted]
+    return evaluator.finish('successive halving', _best(candidates, scores), len(points))
+
+
+def model_search(data, strategy, param_grid, maximize='SQN', budget=.25, initial=None, exploration=1.,
+                 random_state=None, constraint=None, store=None, **backtest_kwargs):
+    """Budgeted bt.optimize guided by a surrogate model of the score over the grid.
+
+    `budget` full-history backtests (a fraction of the grid if < 1) go to the
+    combination with the best kernel-averaged score plus a distance bonus that
+    shrinks as the budget runs out, alternating with grid neighbours of the best
+    so far. Returns the best stats found, with a '_search' report.
+    """
+    points = grid_points(param_grid, constraint)
+    evaluator = _Evaluator(data, strategy, maximize, backtest_kwargs, store)
+    rng = np.random.default_rng(random_state)
+    budget = min(len(points), max(1, int(round(budget*len(points))) if budget < 1 else int(budget)))
+    initial = min(budget, initial or max(3, budget//4))
+
+    # every parameter by its position in its range: grid steps, and scaled to [0, 1]
+    steps = np.array([[list(values).index(p[name]) for name, values in param_grid.items()] for p in points])
+    coords = steps/np.maximum(1, [len(values)-1 for values in param_grid.values()])
+    bandwidth = 2/max(2, max(len(values) for values in param_grid.values()))
+
+    scores = np.full(len(points), np.nan)
+    evaluated = np.zeros(len(points), dtype=bool)
+    for i in rng.choice(len(points), size=initial, replace=False):
+        scores[i] = evaluator.score(points[i])
+        evaluated[i] = True
+
+    while evaluated.sum() < budget:
+        known = np.flatnonzero(evaluated)
+        y = scores[known]
+        finite = ~np.isnan(y)
+        if finite.any():
+            low, high = y[finite].min(), y[finite].max()
+            y = np.where(finite, (y-low)/((high-low) or 1), -.5)  # no trades: below the worst
+        else:
+            y = np.zeros(len(y))
+        distance = np.sqrt(((coords[:, None, :]-coords[None, known, :])**2).sum(axis=2))
+        weights = np.exp(-.5*(distance/bandwidth)**2)
+        predicted = (weights*y).sum(axis=1)/np.maximum(weights.sum(axis=1), 1e-12)
+        uncertainty = distance.min(axis=1)/np.sqrt(coords.shape[1])
+        # explore early, refine around the best combinations towards the end of the budget
+        weight = exploration*(budget-evaluated.sum())/(budget-initial)
+        acquisition = np.where(evaluated, -np.inf, predicted+weight*uncertainty)
+        if evaluated.sum() % 2 and finite.any():
+            # every other step: the untried grid neighbours of the best combination so far,
+            # which kernel smoothing undervalues next to a cliff
+            best = known[np.nanargmax(scores[known])]
+            neighbours = (np.abs(steps-steps[best]).sum(axis=1) == 1) & ~evaluated
+            if neighbours.any():
+                acquisition = np.where(neighbours, acquisition, -np.inf)
+        i = int(np.argmax(acquisition))
+        scores[i] = evaluator.score(points[i])
+        evaluated[i] = True
+
+    return evaluator.finish('model search', _best(points, scores), len(points))
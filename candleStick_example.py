@@ -1,11 +1,11 @@
 import pandas as pd
-import yfinance as yf
+import bar_cache
 import pandas_ta as ta
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
 # Download data from Yahoo Finance
-df = yf.download('NVDA', start='2020-01-01', end='2024-03-10', interval='1d')
+df = bar_cache.download('NVDA', start='2020-01-01', end='2024-03-10', interval='1d')
 df = df[df["Volume"] != 0]
 
 # Add technical analysis
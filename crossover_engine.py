@@ -0,0 +1,239 @@
+import sys
+from collections import namedtuple
+from math import copysign
+
+import numpy as np
+import pandas as pd
+
+# Strategy.buy()/sell() default size: (almost) all of the available equity
+FULL_EQUITY = 1-sys.float_info.epsilon
+
+# built once: creating the string indexes costs more than a whole backtest
+_STAT_KEYS = pd.Index(['Equity Final [$]', 'Return [%]', 'Return (Ann.) [%]', 'Volatility (Ann.) [%]',
+                       'Sharpe Ratio', 'Max. Drawdown [%]', '# Trades', '_equity_curve', '_trades'], dtype=object)
+_TRADE_COLUMNS = pd.Index(['Size', 'EntryBar', 'ExitBar', 'EntryPrice', 'ExitPrice'], dtype=object)
+
+
+def crossings(fast, slow):
+    """Bars where `fast` crosses above / below `slow`, as two boolean arrays.
+
+    up[i] is backtesting.lib.crossover(fast, slow) evaluated in next() on bar
+    i: fast[i-1] < slow[i-1] and fast[i] > slow[i]. Comparisons with NaN are
+    False, so the warm-up bars never cross. 2-D inputs are handled row by
+    row (one parameter set per row).
+    """
+    fast = np.asarray(fast, dtype=np.float64)
+    slow = np.asarray(slow, dtype=np.float64)
+    up = np.zeros(fast.shape, dtype=bool)
+    down = np.zeros(fast.shape, dtype=bool)
+    with np.errstate(invalid='ignore'):
+        up[..., 1:] = (fast[..., :-1] < slow[..., :-1]) & (fast[..., 1:] > slow[..., 1:])
+        down[..., 1:] = (slow[..., :-1] < fast[..., :-1]) & (slow[..., 1:] > fast[..., 1:])
+    return up, down
+
+
+def warmup_bars(*indicators):
+    """Leading bars where any indicator is still NaN; Backtest.run starts calling next() one bar later."""
+    return max((int(np.isnan(np.asarray(x, dtype=np.float64)).argmin()) for x in indicators), default=0)
+
+
+def _geometric_mean(returns):
+    returns = returns+1
+    if np.any(returns <= 0):
+        return 0
+    return np.exp(np.log(returns).sum()/(len(returns) or np.nan))-1
+
+
+def _calendar(index):
+    # (periods per year, resample rule, one bar per day?) of a DatetimeIndex, as in
+    # backtesting.py's stats, from the raw datetime64 values
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    values = index.values.astype('datetime64[ns]')
+    freq_days = pd.Timedelta(np.median(np.diff(values[-100:]).astype(np.int64))).days
+    days = values.astype('datetime64[D]').astype(np.int64)
+    weekday = (days+3) % 7  # 1970-01-01 was a Thursday
+    have_weekends = (weekday >= 5).mean() > 2/7*.6
+    annual = {7: 52, 31: 12, 365: 1}.get(freq_days, 365 if have_weekends else 252)
+    freq = {7: 'W', 31: 'ME', 365: 'YE'}.get(freq_days, 'D')
+    return annual, freq, freq == 'D' and bool(np.all(days[1:] > days[:-1]))
+
+
+Bars = namedtuple('Bars', ['opens', 'lows', 'closes', 'index', 'calendar'])
+
+
+def prepare_bars(data):
+    """Price arrays and calendar of an OHLC DataFrame, extracted once for many run_crossover calls."""
+    index = data.index
+    calendar = _calendar(index) if isinstance(index, pd.DatetimeIndex) and len(index) > 1 else None
+    return Bars(*(np.asarray(data[c], dtype=np.float64) for c in ('Open', 'Low', 'Close')), index, calendar)
+
+
+def _period_returns(equity, bars):
+    # equity returns per day (week, month, year for coarser bars) and periods per year
+    if bars.calendar is None:
+        return np.array([np.nan]), np.nan
+    annual, freq, daily = bars.calendar
+    if daily:
+        # one bar per day already: resampling would only reproduce the curve
+        period_equity = equity
+    else:
+        period_equity = pd.Series(equity, index=bars.index).resample(freq).last().dropna().values
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = period_equity[1:]/period_equity[:-1]-1
+    return returns[~np.isnan(returns)], annual
+
+
+def crossover_stats(equity, bars, trades):
+    """Main backtest statistics of an equity curve, computed like Backtest.run() does.
+
+    `bars` is the prepare_bars() of the data and `trades` the list of closed
+    (size, entry_bar, exit_bar, entry_price, exit_price) tuples. Returns
+    Equity Final, Return, annualized return and volatility, Sharpe Ratio,
+    Max. Drawdown and # Trades, plus the equity curve and the trades under
+    '_equity_curve' and '_trades'.
+    """
+    returns, annual = _period_returns(equity, bars)
+    gmean = _geometric_mean(returns)
+    annual_return = (1+gmean)**annual-1
+    variance = returns.var(ddof=1) if len(returns) > 1 else np.nan
+    volatility = np.sqrt((variance+(1+gmean)**2)**annual-(1+gmean)**(2*annual))*100
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drawdown = 1-equity/np.maximum.accumulate(equity)
+
+    return pd.Series([equity[-1],
+                      (equity[-1]-equity[0])/equity[0]*100,
+                      annual_return*100,
+                      volatility,
+                      annual_return*100/(volatility or np.nan),
+                      -np.nan_to_num(drawdown.max())*100,
+                      len(trades),
+                      equity,
+                      pd.DataFrame(np.array(trades, dtype=np.float64).reshape(-1, 5), columns=_TRADE_COLUMNS)],
+                     index=_STAT_KEYS, dtype=object)
+
+
+def run_crossover(data, fast, slow, cash=10_000, commission=.0, spread=.0,
+                  long_only=False, sl_percentage=None, start=None):
+    """Backtest of a moving-average crossover strategy without a per-bar callback.
+
+    Default: every crossover closes the open trade and opens one in its direction
+    (SmaCross, MovingAverageCrossoverStrategy). long_only: a cross above buys when
+    flat, a cross below closes, with an optional `sl_percentage` stop-loss
+    (PercentageBasedSLStrategy). Fills, sizing, commission and `start` follow
+    Backtest.run(); `data` is an OHLC DataFrame or its prepare_bars(). Returns the
+    crossover_stats Series.
+    """
+    bars = data if isinstance(data, Bars) else prepare_bars(data)
+    opens, lows, closes = bars.opens, bars.lows, bars.closes
+    n = len(closes)
+    if start is None:
+        start = 1+warmup_bars(fast, slow)
+
+    up, down = crossings(fast, slow)
+    up[:start] = down[:start] = False
+    equity = np.full(n, float(cash))
+    trades = []
+    state = {'cash': float(cash), 'units': 0, 'entry': 0.0, 'entry_bar': 0, 'bar': start}
+
+    def fill(stop):
+        # equity over [bar, stop) with the current position; False if the account went broke
+        bar = state['bar']
+        if state['units']:
+            segment = state['cash']+(closes[bar:stop]*state['units']-state['units']*state['entry'])
+            broke = np.flatnonzero(segment <= 0)
+            if len(broke):
+                bar_out = bar+broke[0]
+                equity[bar:bar_out] = segment[:broke[0]]
+                close_trade(bar_out, closes[bar_out])
+                equity[bar_out:] = 0
+                return False
+            equity[bar:stop] = segment
+        elif state['cash'] <= 0:
+            equity[bar:] = 0
+            return False
+        else:
+            equity[bar:stop] = state['cash']
+        state['bar'] = stop
+        return True
+
+    def close_trade(bar, price):
+        units = state['units']
+        state['cash'] += units*(price-state['entry'])-abs(units)*price*commission
+        trades.append((units, state['entry_bar'], bar, state['entry'], price))
+        state['units'] = 0
+
+    def open_trade(bar, direction):
+        price = opens[bar]
+        adjusted = price*(1+copysign(spread, direction))
+        adjusted_plus_commission = adjusted+FULL_EQUITY*price*commission/FULL_EQUITY
+        units = int((max(0, state['cash'])*FULL_EQUITY)//adjusted_plus_commission)
+        if units:  # else the broker cancels the order
+            state['units'] = int(copysign(units, direction))
+            state['entry'] = adjusted
+            state['entry_bar'] = bar
+            state['cash'] -= units*adjusted*commission
+
+    if not long_only:
+        for i in np.flatnonzero(up | down):
+            if i+1 >= n:
+                break
+            if not fill(i+1):
+                return crossover_stats(equity, bars, trades)
+            if state['units']:
+                close_trade(i+1, opens[i+1])
+            open_trade(i+1, 1 if up[i] else -1)
+        if state['bar'] < n:
+            fill(n)
+        return crossover_stats(equity, bars, trades)
+
+    ups = np.flatnonzero(up)
+    downs = np.flatnonzero(down)
+    decide = start  # first bar whose next() sees a flat position
+    while True:
+        k = np.searchsorted(ups, decide)
+        if k == len(ups) or ups[k]+1 >= n:
+            break
+        entry_bar = ups[k]+1
+        if not fill(entry_bar):
+            return crossover_stats(equity, bars, trades)
+        open_trade(entry_bar, 1)
+        if not state['units']:
+            decide = entry_bar
+            continue
+
+        k = np.searchsorted(downs, entry_bar)
+        exit_bar = downs[k]+1 if k < len(downs) else n
+        price = opens[exit_bar] if exit_bar < n else np.nan
+        if sl_percentage is not None:
+            stop = state['entry']*(1-sl_percentage)
+            hit = np.flatnonzero(lows[entry_bar+1:min(exit_bar, n-1)+1] <= stop)
+            if len(hit):
+                # stop orders are processed before the close order of the same bar
+                exit_bar = entry_bar+1+hit[0]
+                price = min(opens[exit_bar], stop)
+        if exit_bar >= n:
+            break
+        if not fill(exit_bar):
+            return crossover_stats(equity, bars, trades)
+        close_trade(exit_bar, price)
+        decide = exit_bar
+    fill(n)
+    return crossover_stats(equity, bars, trades)
+
+
+def sma_cross(data, n1, n2, **kwargs):
+    """run_crossover for SmaCross / MovingAverageCrossoverStrategy: rolling(n).mean() of Close."""
+    data = data if isinstance(data, Bars) else prepare_bars(data)
+    close = pd.Series(data.closes)
+    return run_crossover(data, close.rolling(n1).mean().values, close.rolling(n2).mean().values, **kwargs)
+
+
+def sma_cross_sl(data, n1, n2, sl_percentage, **kwargs):
+    """run_crossover for PercentageBasedSLStrategy: long only, SMAs with min_periods=1 and a stop-loss."""
+    data = data if isinstance(data, Bars) else prepare_bars(data)
+    close = pd.Series(data.closes)
+    return run_crossover(data, close.rolling(n1, min_periods=1).mean().values,
+                         close.rolling(n2, min_periods=1).mean().values,
+                         long_only=True, sl_percentage=sl_percentage, **kwargs)
+
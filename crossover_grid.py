@@ -0,0 +1,258 @@
+from itertools import product
+
+import numpy as np
+import pandas as pd
+
+from budget_optimizer import Params
+from crossover_engine import FULL_EQUITY, crossings, prepare_bars, run_crossover
+from ma_bank import sma_matrix
+
+# stats computed for every parameter set, i.e. what `maximize` can be
+GRID_STATS = ['Equity Final [$]', 'Return [%]', 'Sharpe Ratio', 'Max. Drawdown [%]', '# Trades']
+
+
+def _next_index(mask):
+    """next[r, i]: first j >= i with mask[r, j], else n; one extra column at i = n."""
+    rows, n = mask.shape
+    idx = np.where(mask, np.arange(n), n)
+    nxt = np.full((rows, n+1), n)
+    nxt[:, :n] = np.minimum.accumulate(idx[:, ::-1], axis=1)[:, ::-1]
+    return nxt
+
+
+def _min_table(values):
+    # table[l][i] = min(values[i:i+2**l]), NaN counting as +inf
+    table = [np.where(np.isnan(values), np.inf, values)]
+    while 2**len(table) <= len(values):
+        step = 2**(len(table)-1)
+        table.append(np.minimum(table[-1][:-step], table[-1][step:]))
+    return table
+
+
+def _first_at_or_below(table, start, level):
+    """First bar j >= start with values[j] <= level (per row of start/level), else n."""
+    n = len(table[0])
+    pos = start.copy()
+    for l in range(len(table)-1, -1, -1):
+        step = 2**l
+        mins = table[l]
+        inside = pos <= n-step
+        skip = inside & (mins[np.minimum(pos, len(mins)-1)] > level)
+        pos = np.where(skip, pos+step, pos)
+    found = (pos < n) & (table[0][np.minimum(pos, n-1)] <= level)
+    return np.where(found, pos, n)
+
+
+def _open(cash, price, direction, commission, spread):
+    # whole units bought with FULL_EQUITY of the cash (0: order cancelled), as in run_crossover
+    adjusted = price*(1+np.copysign(spread, direction))
+    adjusted_plus_commission = adjusted+FULL_EQUITY*price*commission/FULL_EQUITY
+    units = np.floor_divide(np.maximum(0, cash)*FULL_EQUITY, adjusted_plus_commission)
+    return units*direction, adjusted, cash-units*adjusted*commission
+
+
+def _simulate(bars, fast, slow, start, long_only, sl, cash, commission, spread):
+    """Equity curves (rows, n) and closed trade counts of a block of parameter sets.
+
+    Every loop iteration advances all rows by one crossover event (or one
+    round trip in long_only mode), so the Python work depends on the number
+    of trades, not on the number of bars or parameter sets.
+    """
+    opens, lows, closes = bars.opens, bars.lows, bars.closes
+    rows, n = fast.shape
+    r = np.arange(rows)
+    up, down = crossings(fast, slow)
+    early = np.arange(n)[None, :] < start[:, None]
+    up[early] = down[early] = False
+    up[:, -1] = down[:, -1] = False  # an order placed on the last bar never fills
+
+    # state after each fill: bar, cash, units, entry price and closed trades so far
+    fill_bar, fill_cash, fill_units, fill_entry, fill_trades = [], [], [], [], []
+    cash_now = np.full(rows, float(cash))
+    units = np.zeros(rows)
+    entry = np.zeros(rows)
+    trades = np.zeros(rows, dtype=np.int64)
+
+    def record(active, bar):
+        fill_bar.append(np.where(active, bar, n))
+        fill_cash.append(cash_now.copy())
+        fill_units.append(units.copy())
+        fill_entry.append(entry.copy())
+        fill_trades.append(trades.copy())
+
+    if not long_only:
+        next_event = _next_index(up | down)
+        at = start.copy()
+        while True:
+            i = next_event[r, np.minimum(at, n)]
+            active = i < n
+            if not active.any():
+                break
+            f = np.minimum(i+1, n-1)
+            price = opens[f]
+            closing = active & (units != 0)
+            cash_now = np.where(closing, cash_now+(units*(price-entry)-np.abs(units)*price*commission), cash_now)
+            trades += closing
+            units = np.where(closing, 0, units)
+            new_units, adjusted, new_cash = _open(cash_now, price, np.where(up[r, np.minimum(i, n-1)], 1.0, -1.0),
+                                                  commission, spread)
+            opening = active & (new_units != 0)
+            units = np.where(opening, new_units, units)
+            entry = np.where(opening, adjusted, entry)
+            cash_now = np.where(opening, new_cash, cash_now)
+            record(active, f)
+            at = np.where(active, i+1, n)
+    else:
+        next_up = _next_index(up)
+        next_down = _next_index(down)
+        table = _min_table(lows) if sl is not None else None
+        decide = start.copy()
+        active = np.ones(rows, dtype=bool)
+        while True:
+            i = next_up[r, np.minimum(decide, n)]
+            active &= i < n
+            if not active.any():
+                break
+            e = np.minimum(i+1, n-1)
+            new_units, adjusted, new_cash = _open(cash_now, opens[e], 1.0, commission, spread)
+            opened = active & (new_units != 0)
+            units = np.where(opened, new_units, units)
+            entry = np.where(opened, adjusted, entry)
+            cash_now = np.where(opened, new_cash, cash_now)
+            record(opened, e)
+
+            exit_bar = next_down[r, e]+1
+            price = opens[np.minimum(exit_bar, n-1)]
+            if sl is not None:
+                stop = entry*(1-sl)
+                hit = _first_at_or_below(table, e+1, stop)
+                stopped = hit <= np.minimum(exit_bar, n-1)
+                exit_bar = np.where(stopped, hit, exit_bar)
+                price = np.where(stopped, np.minimum(opens[np.minimum(hit, n-1)], stop), price)
+            closing = opened & (exit_bar < n)
+            cash_now = np.where(closing, cash_now+(units*(price-entry)-np.abs(units)*price*commission), cash_now)
+            trades += closing
+            units = np.where(closing, 0, units)
+            record(closing, exit_bar)
+
+            # rows whose trade stays open to the end are done
+            active &= ~(opened & ~closing)
+            decide = np.where(opened, exit_bar, e)
+
+    # equity of every bar from the state after the last fill at or before it; a
+    # row's fills have increasing bars, skipped steps were recorded at bar n
+    filled = np.zeros((rows, n+1), dtype=np.int64)
+    for bar in fill_bar:
+        filled[r, bar] += 1
+    state = np.cumsum(filled[:, :n], axis=1)
+    order = np.argsort(np.column_stack(fill_bar), axis=1, kind='stable') if fill_bar else None
+
+    def take(history, initial):
+        columns = np.full((rows, 1), initial)
+        if history:
+            columns = np.column_stack([columns, np.take_along_axis(np.column_stack(history), order, axis=1)])
+        return np.take_along_axis(columns, state, axis=1)
+
+    cash_at = take(fill_cash, float(cash))
+    units_at = take(fill_units, 0.0)
+    equity = cash_at+(closes*units_at-units_at*take(fill_entry, 0.0))
+    trades_at = take(fill_trades, 0)
+
+    # like the broker, stop at the first bar the account is broke
+    broke = equity <= 0
+    first = np.where(broke.any(axis=1), broke.argmax(axis=1), n)
+    final_trades = trades_at[:, -1]
+    for row in np.flatnonzero(first < n):
+        bar = first[row]
+        final_trades[row] = trades_at[row, bar]+(units_at[row, bar] != 0)
+        equity[row, bar:] = 0
+    return equity, final_trades
+
+
+def _grid_stats(equity, trades, bars):
+    """GRID_STATS for every row of an equity matrix, as crossover_stats computes them."""
+    result = {'Equity Final [$]': equity[:, -1],
+              'Return [%]': (equity[:, -1]-equity[:, 0])/equity[:, 0]*100,
+              '# Trades': trades}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drawdown = 1-equity/np.maximum.accumulate(equity, axis=1)
+    result['Max. Drawdown [%]'] = -np.nan_to_num(drawdown.max(axis=1))*100
+
+    if bars.calendar is None:
+        result['Sharpe Ratio'] = np.full(len(equity), np.nan)
+        return result
+    annual, freq, daily = bars.calendar
+    if daily:
+        period_equity = equity
+    else:
+        last = pd.Series(np.arange(len(bars.index)), index=bars.index).resample(freq).last().dropna()
+        period_equity = equity[:, last.values.astype(np.int64)]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = period_equity[:, 1:]/period_equity[:, :-1]-1
+        valid = ~np.isnan(returns)
+        count = valid.sum(axis=1)
+        growth = np.where(valid, returns+1, 1)
+        gmean = np.exp(np.log(growth).sum(axis=1)/np.where(count > 0, count, np.nan))-1
+        gmean[(growth <= 0).any(axis=1)] = 0
+        mean = np.where(valid, returns, 0).sum(axis=1)/count
+        variance = np.where(valid, (returns-mean[:, None])**2, 0).sum(axis=1)/(count-1)
+        variance[count < 2] = np.nan
+        annual_return = (1+gmean)**annual-1
+        volatility = np.sqrt((variance+(1+gmean)**2)**annual-(1+gmean)**(2*annual))*100
+        result['Sharpe Ratio'] = annual_return*100/np.where(volatility == 0, np.nan, volatility)
+    return result
+
+
+def optimize_crossover(data, n1, n2, sl_percentage=None, long_only=False, min_periods=None,
+                       maximize='Sharpe Ratio', constraint=None, cash=10_000, commission=.0, spread=.0,
+                       max_bytes=256 * 2**20, return_heatmap=False):
+    """Grid search of an SMA crossover strategy with all parameter sets simulated together.
+
+    Batched bt.optimize(n1=..., n2=..., [sl_percentage=...]) for the strategies
+    run_crossover models, in blocks of at most `max_bytes` of working memory.
+    Returns the best run_crossover stats (parameters under '_params') and, with
+    return_heatmap=True, the heatmap as bt.optimize returns it.
+    """
+    if maximize not in GRID_STATS:
+        raise ValueError(f"maximize must be one of {GRID_STATS}")
+    grid = {'n1': list(n1), 'n2': list(n2)}
+    if sl_percentage is not None:
+        grid['sl_percentage'] = list(np.atleast_1d(sl_percentage))
+    combos = [Params(zip(grid, values)) for values in product(*grid.values())]
+    combos = [p for p in combos if constraint is None or constraint(p)]
+    if not combos:
+        raise ValueError('No admissible parameter combinations to test')
+
+    bars = prepare_bars(data)
+    n = len(bars.closes)
+    windows = sorted(set(grid['n1']) | set(grid['n2']))
+    bank = sma_matrix(bars.closes, windows, min_periods)
+    row_of = {w: i for i, w in enumerate(windows)}
+    first_valid = np.isnan(bank).argmin(axis=1)
+
+    fast_rows = np.array([row_of[p['n1']] for p in combos])
+    slow_rows = np.array([row_of[p['n2']] for p in combos])
+    sl = np.array([p['sl_percentage'] for p in combos]) if sl_percentage is not None else None
+    start = 1+np.maximum(first_valid[fast_rows], first_valid[slow_rows])
+
+    # about a dozen (block, n) arrays of 8 bytes are alive at once
+    block = max(1, int(max_bytes // (12*8*max(n, 1))))
+    values = np.empty(len(combos))
+    for lo in range(0, len(combos), block):
+        part = slice(lo, lo+block)
+        equity, trades = _simulate(bars, bank[fast_rows[part]], bank[slow_rows[part]], start[part],
+                                   long_only, None if sl is None else sl[part], cash, commission, spread)
+        stat = _grid_stats(equity, trades, bars)[maximize]
+        values[part] = np.where(trades > 0, stat, np.nan)
+
+    heatmap = pd.Series(values, name=maximize,
+                        index=pd.MultiIndex.from_tuples([tuple(p.values()) for p in combos], names=list(grid)))
+    best = combos[0] if heatmap.isna().all() else Params(zip(grid, pd.Index([heatmap.idxmax()]).tolist()[0]))
+    best_fast = bank[row_of[best['n1']]]
+    best_slow = bank[row_of[best['n2']]]
+    stats = run_crossover(bars, best_fast, best_slow, cash=cash, commission=commission, spread=spread,
+                          long_only=long_only, sl_percentage=best.get('sl_percentage'))
+    stats['_params'] = dict(best)
+    if return_heatmap:
+        return stats, heatmap
+    return stats
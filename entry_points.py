@@ -1,10 +1,12 @@
-import yfinance as yf
+import bar_cache
 import pandas as pd
 import pandas_ta as ta
 import plotly.graph_objects as go
+from rejection import identify_rejection
+from trend_filters import candle_categories
 
 def get_data(symbol: str):
-    data = yf.download(tickers=symbol, period='300d', interval='1d')
+    data = bar_cache.download(tickers=symbol, period='300d', interval='1d')
     data.reset_index(inplace=True, drop=True)
     return data
 # Get the data
@@ -28,15 +30,9 @@ data.dropna(inplace=True)
 print(data)
 
 def check_candles(data, backcandles, ma_column):
-    categories = [0 for _ in range(backcandles)]
-    for i in range(backcandles, len(data)):
-        if all(data['Close'][i-backcandles:i] > data[ma_column][i-backcandles:i]):
-            categories.append(2)  # Uptrend
-        elif all(data['Close'][i-backcandles:i] < data[ma_column][i-backcandles:i]):
-            categories.append(1)  # Downtrend
-        else:
-            categories.append(0)  # No trend
-    return categories
+    # 2 (1) where the `backcandles` closes before a bar were all above (below) the MA:
+    # rolling counts of the comparisons, O(n) whatever the window
+    return candle_categories(data['Close'], data[ma_column], backcandles)
 
 # Apply the function to the DataFrame
 data['Trend'] = check_candles(data, 7, 'SMA')
@@ -110,24 +106,7 @@ data.loc[sell_entry_condition, 'entry'] = 1
 print(data[data['entry']!=0])
 
 # Entry based on Rejection Candle next to Bollinger Bands
-def identify_shooting_star(data):
-    # Create a new column for shooting star
-    data['shooting_star'] = data.apply(lambda row: 2 if (
-        ( (min(row['Open'], row['Close']) - row['Low']) > (1.5 * abs(row['Close'] - row['Open']))) and 
-        (row['High'] - max(row['Close'], row['Open'])) < (0.8 * abs(row['Close'] - row['Open'])) and 
-        # (abs(row['Open'] - row['Close']) > row['Open'] * 0.01)
-        (abs(row['Open'] - row['Close']) > row['Open'] * 0.005)
-
-    ) else 1 if (
-        (row['High'] - max(row['Open'], row['Close'])) > (1.5 * abs(row['Open'] - row['Close'])) and 
-        (min(row['Close'], row['Open']) - row['Low']) < (0.8 * abs(row['Open'] - row['Close'])) and 
-        # (abs(row['Open'] - row['Close']) > row['Open'] * 0.01)
-        (abs(row['Open'] - row['Close']) > row['Open'] * 0.005)
-    ) else 0, axis=1)
-
-    return data
-
-data = identify_shooting_star(data)
+data = identify_rejection(data, column='shooting_star', body_threshold=0.005)
 print('Shooting Star')
 print(data[data['shooting_star']!=0])
 
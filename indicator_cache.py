@@ -0,0 +1,139 @@
+import functools
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+def fingerprint(values):
+    """Content hash of an array (dtype, shape and bytes), used to key cached indicators."""
+    values = np.ascontiguousarray(values)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f'{values.dtype.str}{values.shape}'.encode())
+    digest.update(values.view(np.uint8).reshape(-1))
+    return digest.hexdigest()
+
+
+def _key_part(value):
+    # arrays are keyed by content, everything else by value
+    if isinstance(value, (np.ndarray, pd.Series)):
+        return ('array', fingerprint(np.asarray(value)))
+    if isinstance(value, (list, tuple)):
+        return tuple(_key_part(v) for v in value)
+    return value
+
+
+class IndicatorCache:
+    """LRU store of read-only indicator arrays, keyed by (indicator, data fingerprints, params).
+
+    Least recently used entries are evicted once the total passes `max_bytes`.
+    After set_history(), a call on a window of the history columns is computed
+    on the full columns and sliced (for indicators that only look back).
+    """
+
+    def __init__(self, max_bytes=256 * 2**20):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._history = []
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def clear(self):
+        self._entries.clear()
+        self.nbytes = 0
+        self.hits = self.misses = 0
+
+    def get(self, key, default=None):
+        value = self._entries.get(key)
+        if value is None:
+            return default
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        value = np.array(value)  # own copy, so the caller cannot change the entry
+        value.setflags(write=False)
+        if key in self._entries:
+            self.nbytes -= self._entries.pop(key).nbytes
+        if value.nbytes > self.max_bytes:
+            return value
+        self._entries[key] = value
+        self.nbytes += value.nbytes
+        while self.nbytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+        return value
+
+    def set_history(self, *columns):
+        """Full-history float columns that later calls may pass windows of (none to stop)."""
+        self._history = [np.asarray(c) for c in columns if np.asarray(c).dtype.kind == 'f']
+
+    def _window(self, values):
+        # (column, start) of the first history column holding `values` as a contiguous window
+        for column in self._history:
+            if len(values) > len(column) or not len(values):
+                continue
+            heads = column[:len(column)-len(values)+1]
+            starts = np.flatnonzero(np.isnan(heads) if np.isnan(values[0]) else heads == values[0])
+            for start in starts:
+                if np.array_equal(column[start:start+len(values)], values, equal_nan=True):
+                    return column, start
+        return None
+
+    def _full_history(self, args):
+        # (full-history args, start, length) of a call whose float array arguments
+        # are all the same proper window of the history, else None
+        full, start, length = list(args), None, None
+        for i, arg in enumerate(args):
+            if not isinstance(arg, np.ndarray) or arg.ndim != 1 or arg.dtype.kind != 'f':
+                continue
+            window = self._window(arg)
+            if window is None or (start is not None and (window[1], len(arg)) != (start, length)):
+                return None
+            full[i], start, length = window[0], window[1], len(arg)
+            if start == 0 and length == len(full[i]):
+                return None
+        return None if start is None else (full, start, length)
+
+    def compute(self, func, *args, **kwargs):
+        """func(*args, **kwargs), computed only if no equal call is cached."""
+        if self._history:
+            window = self._full_history(args)
+            if window is not None:
+                full, start, length = window
+                return self.compute(func, *full, **kwargs)[..., start:start+length]
+        key = (f'{func.__module__}.{func.__qualname__}', _key_part(args),
+               tuple(sorted((name, _key_part(v)) for name, v in kwargs.items())))
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        return self.put(key, func(*args, **kwargs))
+
+
+# one cache per process: backtests in the same process share entries, and each
+# bt.optimize worker process fills a cache of its own
+default_cache = IndicatorCache()
+
+
+def cached(func=None, cache=None):
+    """Decorator memoizing an indicator function passed to Strategy.I, e.g. self.I(SMA, self.data.Close, self.n1).
+
+    Every parameter must be an argument, not a closure variable, since the arguments form the key.
+    """
+    if func is None:
+        return functools.partial(cached, cache=cache)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return (default_cache if cache is None else cache).compute(func, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,111 @@
+import bisect
+from collections import deque
+
+from pivots import pivot_lows, pivot_highs
+
+
+def merge_levels(levels, tolerance=0.001):
+    """Drops every level that is within `tolerance` (relative) of the one before it.
+
+    `levels` must already be sorted in the order the first of two close levels
+    should be kept in. This is the same single pop pass the scripts used, so a
+    level that slides into the popped position is not compared again.
+    """
+    levels = list(levels)
+    for i in range(1, len(levels)):
+        if i >= len(levels):
+            break
+        if abs(levels[i]-levels[i-1])/levels[i] <= tolerance:
+            levels.pop(i)
+    return levels
+
+
+def joined_levels(ss, rr, tolerance=0.001):
+    """Merges supports and resistances into the single sorted `rrss` list."""
+    ss = merge_levels(sorted(ss), tolerance)  # keep lowest support when popping a level
+    rr = merge_levels(sorted(rr, reverse=True), tolerance)  # keep highest resistance
+    return merge_levels(sorted(rr+ss), tolerance)
+
+
+class LevelBook:
+    """Support/resistance levels of a sliding lookback window, kept up to date bar by bar.
+
+    For bar l the book holds the pivots of candles l-levelbackCandles ... l-n2,
+    exactly the candles check_candle_signal scans. Moving from bar l-1 to l only
+    confirms candle l-n2 and drops candle l-levelbackCandles-1, so instead of
+    rescanning the window the book inserts/removes those with bisect into sorted
+    level lists. The merged list is rebuilt from the few live levels only when
+    one of them changed.
+    """
+
+    def __init__(self, n1, n2, levelbackCandles, tolerance=0.001):
+        self.n1 = n1
+        self.n2 = n2
+        self.levelbackCandles = levelbackCandles
+        self.tolerance = tolerance
+        self.reset()
+
+    def reset(self):
+        self.last = None
+        self.pivots = deque()  # (candle index, 'support'/'resistance', price)
+        self.supports = []     # sorted ascending
+        self.resistances = []  # sorted ascending
+        self._levels = []
+        self._dirty = False
+
+    def _is_pivot(self, c, low, high):
+        # pivot test of candle c using only its n1/n2 neighbours, with the
+        # same edge rules as pivots.pivot_lows/pivot_highs
+        start = max(c-self.n1, 0)
+        stop = c+self.n2+1
+        seg_low = low[start:stop]
+        seg_high = high[start:stop]
+        return (pivot_lows(seg_low, self.n1, self.n2)[c-start],
+                pivot_highs(seg_high, self.n1, self.n2)[c-start])
+
+    def _add(self, c, low, high):
+        is_support, is_resistance = self._is_pivot(c, low, high)
+        if is_support:
+            price = float(low[c])
+            self.pivots.append((c, 'support', price))
+            bisect.insort(self.supports, price)
+            self._dirty = True
+        if is_resistance:
+            price = float(high[c])
+            self.pivots.append((c, 'resistance', price))
+            bisect.insort(self.resistances, price)
+            self._dirty = True
+
+    def _evict(self, first):
+        while self.pivots and self.pivots[0][0] < first:
+            _, kind, price = self.pivots.popleft()
+            levels = self.supports if kind == 'support' else self.resistances
+            del levels[bisect.bisect_left(levels, price)]
+            self._dirty = True
+
+    def update(self, l, low, high):
+        """Moves the book to bar l and returns the merged levels (`rrss`).
+
+        `low` and `high` are positional arrays holding at least candles 0..l.
+        Consecutive bars are handled incrementally; any other jump rebuilds
+        the window from scratch.
+        """
+        first = l-self.levelbackCandles
+        if self.last is not None and l == self.last+1:
+            c = l-self.n2
+            if c >= first:
+                self._add(c, low, high)
+            self._evict(first)
+        elif l != self.last:
+            self.reset()
+            for c in range(first, l-self.n2+1):
+                self._add(c, low, high)
+        self.last = l
+        return self.levels()
+
+    def levels(self):
+        """Merged support/resistance levels, sorted ascending."""
+        if self._dirty:
+            self._levels = joined_levels(self.supports, self.resistances, self.tolerance)
+            self._dirty = False
+        return self._levels
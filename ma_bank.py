@@ -0,0 +1,64 @@
+import numpy as np
+
+from indicator_cache import default_cache
+
+
+def sma_matrix(values, windows, min_periods=None):
+    """Simple moving averages of `values` for every window, as one (len(windows), n) array.
+
+    Same NaN handling as pd.Series(values).rolling(w, min_periods).mean(); all
+    rows are differences of a single cumulative sum.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    windows = np.asarray(windows, dtype=np.int64)
+    n = len(values)
+
+    missing = np.isnan(values)
+    finite = values[~missing]
+    shift = finite[0] if len(finite) else 0.0
+    # summing values minus the first finite one keeps the cumulative sum small, so
+    # differences of it round about as well as the rolling mean
+    csum = np.zeros(n+1)
+    np.cumsum(np.where(missing, 0.0, values-shift), out=csum[1:])
+    nan_count = np.zeros(n+1, dtype=np.int64)
+    np.cumsum(missing, out=nan_count[1:])
+
+    end = np.arange(1, n+1)
+    start = np.maximum(end[None, :]-windows[:, None], 0)
+    count = end[None, :]-start-(nan_count[end][None, :]-nan_count[start])
+    needed = windows[:, None] if min_periods is None else max(min_periods, 1)
+    sums = csum[end][None, :]-csum[start]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        bank = np.where(count >= needed, sums/count+shift, np.nan)
+    return bank
+
+
+class MABank:
+    """Every requested SMA of one price column, read by window length: bank.sma(20).
+
+    The matrix goes through the indicator cache, so runs over the same data and windows share it.
+    """
+
+    def __init__(self, values, windows, min_periods=None):
+        self.values = np.asarray(values, dtype=np.float64)
+        self.windows = tuple(sorted(set(int(w) for w in windows)))
+        self.min_periods = min_periods
+        self.matrix = default_cache.compute(sma_matrix, self.values, self.windows, min_periods=min_periods)
+        self._rows = {w: i for i, w in enumerate(self.windows)}
+
+    def __contains__(self, window):
+        return window in self._rows
+
+    def __getitem__(self, window):
+        return self.sma(window)
+
+    def sma(self, n):
+        """Simple moving average over `n` bars."""
+        if n in self._rows:
+            return self.matrix[self._rows[n]]
+        return sma_matrix(self.values, [n], self.min_periods)[0]
+
+
+def grid_windows(*ranges):
+    """Sorted distinct window lengths of several parameter ranges, e.g. the n1 and n2 of a grid."""
+    return tuple(sorted(set().union(*(set(r) for r in ranges))))
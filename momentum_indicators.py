@@ -1,11 +1,11 @@
-import yfinance as yf
+import bar_cache
 import pandas_ta as ta
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
 # Download the data
 # data = yf.download(tickers='NVDA', period='max', interval='1d')
-data = yf.download(tickers='NVDA', start='2020-01-01', end='2024-03-17', interval='1d')
+data = bar_cache.download(tickers='NVDA', start='2020-01-01', end='2024-03-17', interval='1d')
 
 data['RSI_10'] = ta.rsi(data.Close, length=10)
 
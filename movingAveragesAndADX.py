@@ -1,7 +1,7 @@
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-import yfinance as yf
+import bar_cache
 import pandas_ta as ta
 import plotly.graph_objects as go
 
@@ -26,7 +26,7 @@ plt.legend()
 plt.grid(True)
 plt.show()
 
-data = yf.download(tickers='NVDA', period='max', interval='1d')
+data = bar_cache.download(tickers='NVDA', period='max', interval='1d')
 print(data.head())
 
 # Add ADX
@@ -0,0 +1,109 @@
+import bisect
+
+import numpy as np
+
+
+def nearest_level(levels, price):
+    """Level closest to `price` in the ascending `levels` list, or None if empty.
+
+    One bisect finds the two neighbours of `price`; on a tie the lower level
+    wins, the same one `min(levels, key=lambda x: abs(x - price))` returns.
+    """
+    if len(levels) == 0:
+        return None
+    i = bisect.bisect_left(levels, price)
+    if i == 0:
+        return levels[0]
+    if i == len(levels):
+        return levels[-1]
+    below, above = levels[i-1], levels[i]
+    return above if abs(above - price) < abs(below - price) else below
+
+
+def close_resistance(levels, high, low, open_, close, lim):
+    """Resistance level the candle tests with its high, or 0.
+
+    Same rules as closeResistance in the scripts, for a single candle whose
+    prices are passed in directly so they are read only once.
+    """
+    level = nearest_level(levels, high)
+    if level is None:
+        return 0
+    c1 = abs(high - level) <= lim
+    c2 = abs(max(open_, close) - level) <= lim
+    c3 = min(open_, close) < level
+    c4 = low < level
+    if (c1 or c2) and c3 and c4:
+        return level
+    return 0
+
+
+def close_support(levels, high, low, open_, close, lim):
+    """Support level the candle tests with its low, or 0 (see closeSupport)."""
+    level = nearest_level(levels, low)
+    if level is None:
+        return 0
+    c1 = abs(low - level) <= lim
+    c2 = abs(min(open_, close) - level) <= lim
+    c3 = max(open_, close) > level
+    c4 = high > level
+    if (c1 or c2) and c3 and c4:
+        return level
+    return 0
+
+
+def nearest_levels(levels, offsets, prices):
+    """Batch form of nearest_level for every bar at once.
+
+    Bar i owns the ascending level set levels[offsets[i]:offsets[i+1]]
+    (offsets has one more entry than prices). Levels and prices are replaced
+    by their exact rank among all values, shifted by bar number, so a single
+    np.searchsorted over the flat array finds every bar's bisect position
+    without crossing into a neighbour's levels. Bars without levels get NaN.
+    """
+    levels = np.asarray(levels, dtype=np.float64)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    prices = np.asarray(prices, dtype=np.float64)
+    n = len(prices)
+
+    _, ranks = np.unique(np.concatenate([levels, prices]), return_inverse=True)
+    stride = len(ranks)+1
+    rows = np.repeat(np.arange(n, dtype=np.int64), np.diff(offsets))
+    level_keys = rows*stride + ranks[:len(levels)]
+    price_keys = np.arange(n, dtype=np.int64)*stride + ranks[len(levels):]
+    pos = np.searchsorted(level_keys, price_keys, side='left')
+
+    start, stop = offsets[:-1], offsets[1:]
+    has_below = pos > start
+    has_above = pos < stop
+    below = np.where(has_below, levels[np.maximum(pos-1, 0)], np.nan) if len(levels) else np.full(n, np.nan)
+    above = np.where(has_above, levels[np.minimum(pos, len(levels)-1)], np.nan) if len(levels) else np.full(n, np.nan)
+
+    take_above = has_above & (~has_below | (np.abs(above - prices) < np.abs(below - prices)))
+    nearest = np.where(take_above, above, below)
+    # a NaN price is nearest to nothing; min() then returns the first level
+    missing = np.isnan(prices) & (stop > start)
+    nearest[missing] = levels[start[missing]]
+    return nearest
+
+
+def close_resistance_batch(levels, offsets, high, low, open_, close, lim):
+    """close_resistance for every bar; returns the level per bar, 0 where none."""
+    high, low, open_, close, lim = (np.asarray(a, dtype=np.float64) for a in (high, low, open_, close, lim))
+    level = nearest_levels(levels, offsets, high)
+    c1 = np.abs(high - level) <= lim
+    c2 = np.abs(np.maximum(open_, close) - level) <= lim
+    c3 = np.minimum(open_, close) < level
+    c4 = low < level
+    return np.where((c1 | c2) & c3 & c4, level, 0.)
+
+
+def close_support_batch(levels, offsets, high, low, open_, close, lim):
+    """close_support for every bar; returns the level per bar, 0 where none."""
+    high, low, open_, close, lim = (np.asarray(a, dtype=np.float64) for a in (high, low, open_, close, lim))
+    level = nearest_levels(levels, offsets, low)
+    c1 = np.abs(low - level) <= lim
+    c2 = np.abs(np.minimum(open_, close) - level) <= lim
+    c3 = np.maximum(open_, close) > level
+    c4 = high > level
+    return np.where((c1 | c2) & c3 & c4, level, 0.)
@@ -0,0 +1,303 @@
+from collections import deque, namedtuple
+from math import isnan, nan, sqrt
+from sys import float_info
+
+import pandas as pd
+
+Bands = namedtuple('Bands', ['lower', 'mid', 'upper', 'bandwidth', 'percent'])
+DirectionalIndex = namedtuple('DirectionalIndex', ['adx', 'dmp', 'dmn'])
+
+
+class _Window:
+    # the last `length` values in a ring, with a running sum that is re-added
+    # exactly once per pass over the ring (O(1) amortized), so rounding errors
+    # do not build up over a long session
+    def __init__(self, length):
+        if length < 1:
+            raise ValueError('A window needs at least 1 bar')
+        self.length = length
+        self.values = [0.0]*length
+        self.count = 0
+        self.sum = 0.0
+
+    @property
+    def full(self):
+        return self.count >= self.length
+
+    def push(self, x):
+        """Adds x; returns the value that left the window (NaN while filling)."""
+        slot = self.count % self.length
+        old = self.values[slot] if self.full else nan
+        self.values[slot] = x
+        self.count += 1
+        if slot == self.length-1:
+            self.sum = sum(self.values)
+        else:
+            self.sum += x-(old if self.count > self.length else 0.0)
+        return old
+
+
+class SMA:
+    """Simple moving average, as ta.sma / rolling(length).mean(): NaN for the first length-1 bars."""
+
+    def __init__(self, length=10):
+        self._window = _Window(length)
+        self.value = nan
+
+    def update(self, x):
+        self._window.push(x)
+        self.value = self._window.sum/self._window.length if self._window.full else nan
+        return self.value
+
+
+class EMA:
+    """Exponential moving average as ta.ema: seeded with the SMA of the first `length` bars,
+    then alpha = 2/(length+1) without adjustment."""
+
+    def __init__(self, length=10):
+        self.length = length
+        self.alpha = 2/(length+1)
+        self._seed = SMA(length)
+        self.value = nan
+
+    def update(self, x):
+        if isnan(self.value):
+            self.value = self._seed.update(x)
+        else:
+            self.value += self.alpha*(x-self.value)
+        return self.value
+
+
+class RMA:
+    """Wilder's moving average as ta.rma: ewm(alpha=1/length, min_periods=length).mean().
+
+    Like the pandas ewm it mirrors (adjust=True), the average is the ratio of
+    a decaying weighted sum and the decaying sum of the weights, so the
+    first bars are not biased towards a seed. NaN inputs (e.g. the first
+    difference) add nothing but still age the older values.
+    """
+
+    def __init__(self, length=10):
+        self.length = length
+        self.decay = 1-1/length
+        self._numerator = 0.0
+        self._weights = 0.0
+        self.count = 0
+        self.value = nan
+
+    def update(self, x):
+        self._numerator *= self.decay
+        self._weights *= self.decay
+        if not isnan(x):
+            self._numerator += x
+            self._weights += 1
+            self.count += 1
+        self.value = self._numerator/self._weights if self.count >= self.length else nan
+        return self.value
+
+
+class RollingMax:
+    """Maximum of the last `length` values (NaN until there are `length`), amortized O(1) with a monotonic deque."""
+
+    def __init__(self, length=14):
+        self.length = length
+        self._queue = deque()  # (bar, value), values decreasing
+        self.count = 0
+        self.value = nan
+
+    def _better(self, x, y):
+        return x >= y
+
+    def update(self, x):
+        queue = self._queue
+        while queue and self._better(x, queue[-1][1]):
+            queue.pop()
+        queue.append((self.count, x))
+        if queue[0][0] <= self.count-self.length:
+            queue.popleft()
+        self.count += 1
+        self.value = queue[0][1] if self.count >= self.length else nan
+        return self.value
+
+
+class RollingMin(RollingMax):
+    """Minimum of the last `length` values (NaN until there are `length`)."""
+
+    def _better(self, x, y):
+        return x <= y
+
+
+class RSI:
+    """Relative strength index as ta.rsi: Wilder (RMA) averages of the gains and losses."""
+
+    def __init__(self, length=14):
+        self._gains = RMA(length)
+        self._losses = RMA(length)
+        self._close = nan
+        self.value = nan
+
+    def update(self, close):
+        change = close-self._close
+        self._close = close
+        gain = self._gains.update(max(change, 0.0) if not isnan(change) else nan)
+        loss = self._losses.update(max(-change, 0.0) if not isnan(change) else nan)
+        self.value = 100*gain/(gain+loss) if gain+loss else nan
+        return self.value
+
+
+class ATR:
+    """Average true range as ta.atr: RMA of the true range, which starts on the second bar."""
+
+    def __init__(self, length=14):
+        self._average = RMA(length)
+        self._close = nan
+        self.value = nan
+
+    def update(self, high, low, close):
+        previous, self._close = self._close, close
+        true_range = nan if isnan(previous) else max(high-low, abs(high-previous), abs(low-previous))
+        self.value = self._average.update(true_range)
+        return self.value
+
+
+class WilliamsR:
+    """Williams %R as ta.willr: 100*((close-lowest low)/(highest high-lowest low) - 1) over `length` bars."""
+
+    def __init__(self, length=14):
+        self._highest = RollingMax(length)
+        self._lowest = RollingMin(length)
+        self.value = nan
+
+    def update(self, high, low, close):
+        highest = self._highest.update(high)
+        lowest = self._lowest.update(low)
+        self.value = 100*((close-lowest)/(highest-lowest)-1) if highest != lowest else nan
+        return self.value
+
+
+class ADX:
+    """Average directional index as ta.adx: update() returns DirectionalIndex(adx, dmp, dmn).
+
+    DMP/DMN are the RMAs of the +DM/-DM moves over the ATR, and ADX the
+    `lensig`-bar RMA of DX = 100*|DMP-DMN|/(DMP+DMN).
+    """
+
+    def __init__(self, length=14, lensig=None):
+        self._atr = ATR(length)
+        self._plus = RMA(length)
+        self._minus = RMA(length)
+        self._adx = RMA(lensig or length)
+        self._high = self._low = nan
+        self.value = DirectionalIndex(nan, nan, nan)
+
+    def update(self, high, low, close):
+        up, down = high-self._high, self._low-low
+        self._high, self._low = high, low
+        if isnan(up):
+            plus = minus = nan
+        else:
+            plus = up if up > down and up > 0 else 0.0
+            minus = down if down > up and down > 0 else 0.0
+        atr = self._atr.update(high, low, close)
+        plus, minus = self._plus.update(plus), self._minus.update(minus)
+        dmp, dmn = (100*plus/atr, 100*minus/atr) if atr else (nan, nan)  # no range at all: undefined
+        dx = 100*abs(dmp-dmn)/(dmp+dmn) if dmp+dmn else nan
+        self.value = DirectionalIndex(self._adx.update(dx), dmp, dmn)
+        return self.value
+
+
+class Bollinger:
+    """Bollinger bands as ta.bbands: SMA middle band +- `std` population standard deviations.
+
+    update() returns Bands(lower, mid, upper, bandwidth, percent), with the
+    bandwidth in percent of the middle band and percent the position of the
+    close between the bands. The variance is kept with a sliding Welford
+    update, stable for prices far from zero, and recomputed exactly once per
+    pass over the window.
+    """
+
+    def __init__(self, length=5, std=2.0, ddof=0):
+        self.std = std
+        self.ddof = ddof
+        self._window = _Window(length)
+        self._mean = 0.0
+        self._m2 = 0.0  # sum of squared deviations from the mean
+        self.value = Bands(nan, nan, nan, nan, nan)
+
+    def update(self, close):
+        window = self._window
+        old = window.push(close)
+        n = min(window.count, window.length)
+        if window.count % window.length == 0:
+            self._mean = window.sum/n
+            self._m2 = sum((x-self._mean)**2 for x in window.values)
+        elif window.count > window.length:
+            mean = self._mean+(close-old)/n
+            self._m2 += (close-old)*(close-mean+old-self._mean)
+            self._mean = mean
+        else:
+            mean = self._mean+(close-self._mean)/n
+            self._m2 += (close-self._mean)*(close-mean)
+            self._mean = mean
+        if not window.full:
+            return self.value
+        deviation = sqrt(max(self._m2, 0.0)/(n-self.ddof))
+        mid = self._mean
+        lower, upper = mid-self.std*deviation, mid+self.std*deviation
+        self.value = Bands(lower, mid, upper, 100*(upper-lower)/mid if mid else nan,
+                           (close-lower)/(upper-lower) if upper != lower else nan)
+        return self.value
+
+
+class VWAP:
+    """Volume-weighted average typical price as ta.vwap, restarted every `anchor` period ('D': daily)."""
+
+    def __init__(self, anchor='D'):
+        self.anchor = anchor
+        self._period = None
+        self._weighted = 0.0
+        self._volume = 0.0
+        self.value = nan
+
+    def update(self, time, high, low, close, volume):
+        period = pd.Timestamp(time).to_period(self.anchor)
+        if period != self._period:
+            self._period = period
+            self._weighted = self._volume = 0.0
+        self._weighted += (high+low+close)/3*volume
+        self._volume += volume
+        self.value = self._weighted/self._volume if self._volume else nan
+        return self.value
+
+
+class OBV:
+    """On-balance volume as ta.obv: the first bar's volume counts as up."""
+
+    def __init__(self):
+        self._close = nan
+        self.value = 0.0
+
+    def update(self, close, volume):
+        previous, self._close = self._close, close
+        if isnan(previous) or close > previous:
+            self.value += volume
+        elif close < previous:
+            self.value -= volume
+        return self.value
+
+
+class CMF:
+    """Chaikin money flow as ta.cmf: `length`-bar sum of the money flow volume over that of the volume."""
+
+    def __init__(self, length=20):
+        self._flow = _Window(length)
+        self._volume = _Window(length)
+        self.value = nan
+
+    def update(self, high, low, close, volume):
+        span = high-low or float_info.epsilon
+        self._flow.push((2*close-high-low)/span*volume)
+        self._volume.push(volume)
+        self.value = self._flow.sum/self._volume.sum if self._flow.full and self._volume.sum else nan
+        return self.value
+
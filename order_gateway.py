@@ -0,0 +1,295 @@
+import asyncio
+import http.client
+import json
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import numpy as np
+
+ENVIRONMENTS = {
+    'practice': 'https://api-fxpractice.oanda.com',
+    'live': 'https://api-fxtrade.oanda.com',
+}
+
+
+class OrderError(Exception):
+    """An order the v20 API rejected: `code` is the HTTP status, the message its body."""
+
+    def __init__(self, code, msg):
+        super().__init__(msg)
+        self.code = code
+        self.msg = msg
+
+
+def order_body(order, precision=5):
+    """v20 JSON body of a trading_loop.Order: market order with take-profit and stop-loss on fill.
+
+    The same data oandapyV20's MarketOrderRequest with TakeProfitDetails
+    and StopLossDetails sends; prices are rounded to `precision` decimals.
+    """
+    return {'order': {
+        'type': 'MARKET',
+        'instrument': order.instrument,
+        'units': str(int(order.units)),
+        'timeInForce': 'FOK',
+        'positionFill': 'DEFAULT',
+        'takeProfitOnFill': {'price': f'{order.take_profit:.{precision}f}', 'timeInForce': 'GTC'},
+        'stopLossOnFill': {'price': f'{order.stop_loss:.{precision}f}', 'timeInForce': 'GTC'},
+    }}
+
+
+class ConnectionPool:
+    """Keep-alive HTTP(S) connections to one host, shared by threads.
+
+    Each request borrows an open connection (or opens one if all `size` are
+    in use) and puts it back afterwards, so consecutive orders skip the TCP
+    and TLS handshakes. A reused connection the server has closed in the
+    meantime is reopened once. `opened` counts the connections made.
+    """
+
+    def __init__(self, base_url, size=8, timeout=10.):
+        url = urlsplit(base_url)
+        self._connection = http.client.HTTPSConnection if url.scheme == 'https' else http.client.HTTPConnection
+        self.host = url.netloc
+        self.prefix = url.path.rstrip('/')
+        self.timeout = timeout
+        self._idle = queue.LifoQueue(size)
+        self._lock = threading.Lock()
+        self.opened = 0
+
+    def _get(self):
+        try:
+            return self._idle.get_nowait(), True
+        except queue.Empty:
+            with self._lock:
+                self.opened += 1
+            return self._connection(self.host, timeout=self.timeout), False
+
+    def _put(self, connection):
+        try:
+            self._idle.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def request(self, method, path, body=None, headers=None):
+        """(status, decoded JSON body) of one request."""
+        connection, reused = self._get()
+        payload = None if body is None else json.dumps(body).encode()
+        try:
+            try:
+                connection.request(method, self.prefix+path, payload, headers or {})
+                response = connection.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                if not reused:
+                    raise
+                # the server dropped the idle connection: one fresh attempt
+                connection.close()
+                connection = self._connection(self.host, timeout=self.timeout)
+                with self._lock:
+                    self.opened += 1
+                connection.request(method, self.prefix+path, payload, headers or {})
+                response = connection.getresponse()
+            data = response.read()
+        except Exception:
+            connection.close()
+            raise
+        if response.will_close:
+            connection.close()
+        else:
+            self._put(connection)
+        return response.status, json.loads(data) if data else {}
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class LatencyHistogram:
+    """Request latencies in log-spaced millisecond buckets, thread-safe.
+
+    The bucket edges run from `low` to `high` ms with `per_decade` buckets
+    per factor of ten; quantile() interpolates inside a bucket, so it is
+    accurate to the bucket width (about 12% with 20 per decade).
+    """
+
+    def __init__(self, low=.1, high=60_000., per_decade=20):
+        decades = np.log10(high/low)
+        self.edges = low*10**(np.arange(int(np.ceil(decades*per_decade))+1)/per_decade)
+        self.counts = np.zeros(len(self.edges)+1, dtype=np.int64)  # plus under- and overflow
+        self.total = 0.
+        self.max = 0.
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return int(self.counts.sum())
+
+    def record(self, seconds):
+        ms = seconds*1000
+        with self._lock:
+            self.counts[np.searchsorted(self.edges, ms, side='right')] += 1
+            self.total += ms
+            self.max = max(self.max, ms)
+
+    def quantile(self, q):
+        """Approximate q-quantile in ms (NaN if empty)."""
+        n = len(self)
+        if not n:
+            return np.nan
+        cumulative = np.cumsum(self.counts)
+        b = int(np.searchsorted(cumulative, q*n))
+        if b == 0:
+            return self.edges[0]
+        if b == len(self.edges):
+            return self.max
+        below = cumulative[b-1]
+        return min(self.edges[b-1]+(self.edges[b]-self.edges[b-1])*(q*n-below)/self.counts[b], self.max)
+
+    def summary(self):
+        n = len(self)
+        if not n:
+            return 'no requests'
+        return (f'{n} requests, mean {self.total/n:.1f} ms, p50 {self.quantile(.5):.1f} ms, '
+                f'p90 {self.quantile(.9):.1f} ms, p99 {self.quantile(.99):.1f} ms, max {self.max:.1f} ms')
+
+
+class OrderGateway:
+    """Bracket orders to the v20 REST API over a pool of keep-alive connections.
+
+    One gateway (and its connections) lasts for the whole session, instead
+    of a new API client per order. send() places one order and
+    returns the v20 response, raising OrderError if it is rejected;
+    send_all() places many orders at once from a thread pool, and submit()
+    is the coroutine TradingLoop awaits. `latency` holds a LatencyHistogram
+    per instrument and one over all orders ('all'). `base_url` overrides the
+    environment, e.g. with V20Stub's url.
+    """
+
+    def __init__(self, access_token, account_id, environment='practice', base_url=None, connections=8,
+                 timeout=10.):
+        self.account_id = str(account_id)
+        self.pool = ConnectionPool(base_url or ENVIRONMENTS[environment], connections, timeout)
+        self.headers = {'Authorization': f'Bearer {access_token}', 'Content-Type': 'application/json',
+                        'Accept-Datetime-Format': 'RFC3339'}
+        self._workers = ThreadPoolExecutor(connections)
+        self._lock = threading.Lock()
+        self.latency = {'all': LatencyHistogram()}
+
+    def close(self):
+        self._workers.shutdown()
+        self.pool.close()
+
+    def _histogram(self, instrument):
+        with self._lock:
+            return self.latency.setdefault(instrument, LatencyHistogram())
+
+    def send(self, order):
+        """Places `order` (a trading_loop.Order) and returns the v20 response."""
+        started = time.perf_counter()
+        status, response = self.pool.request('POST', f'/v3/accounts/{self.account_id}/orders',
+                                             order_body(order), self.headers)
+        elapsed = time.perf_counter()-started
+        self.latency['all'].record(elapsed)
+        self._histogram(order.instrument).record(elapsed)
+        if status >= 400:
+            raise OrderError(status, response.get('errorMessage', json.dumps(response)))
+        return response
+
+    def send_all(self, orders):
+        """Places the orders concurrently; returns the responses (or the OrderError / exception) in order."""
+        futures = [self._workers.submit(self.send, order) for order in orders]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+        return results
+
+    async def submit(self, order):
+        return await asyncio.get_running_loop().run_in_executor(self._workers, self.send, order)
+
+
+class V20Stub:
+    """Local HTTP server answering v20 order requests, to run the gateway without an account.
+
+    POST /v3/accounts/<account>/orders with the expected bearer token is
+    answered after `latency` seconds with 201 and order create / fill
+    transactions; a wrong token gets 401 and a body without an order 400.
+    Keep-alive (HTTP/1.1) like the real API; `connections` counts the TCP
+    connections accepted and `orders` the order bodies received.
+    """
+
+    def __init__(self, access_token, latency=0., port=0):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True  # headers and body are two writes
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                time.sleep(stub.latency)
+                if not re.fullmatch(r'/v3/accounts/[^/]+/orders', self.path):
+                    return self._reply(404, {'errorMessage': 'The requested resource was not found'})
+                if self.headers.get('Authorization') != f'Bearer {stub.access_token}':
+                    return self._reply(401, {'errorMessage': 'Insufficient authorization to perform request.'})
+                order = body.get('order')
+                if not order or order.get('type') != 'MARKET':
+                    return self._reply(400, {'errorMessage': 'Invalid value specified for \'order\''})
+                with stub._lock:
+                    stub.orders.append(order)
+                    id_ = 2*len(stub.orders)
+                transaction = {'instrument': order['instrument'], 'units': order['units'],
+                               'time': time.strftime('%Y-%m-%dT%H:%M:%S.000000000Z', time.gmtime())}
+                self._reply(201, {'orderCreateTransaction': {'id': str(id_-1), 'type': 'MARKET_ORDER',
+                                                             **transaction},
+                                  'orderFillTransaction': {'id': str(id_), 'type': 'ORDER_FILL',
+                                                           'orderID': str(id_-1), **transaction},
+                                  'lastTransactionID': str(id_)})
+
+        self.access_token = access_token
+        self.latency = latency
+        self.connections = 0
+        self.orders = []
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
@@ -0,0 +1,88 @@
+import numpy as np
+
+
+def _sliding_extreme(values, window, extreme):
+    """van Herk/Gil-Werman sliding extreme over trailing windows.
+
+    The series is cut into blocks of `window` values; a prefix and a suffix
+    running extreme are taken inside every block, and each window is then
+    covered by the suffix of one block and the prefix of the next. That makes
+    the whole pass O(n) regardless of the window length.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    out = np.full(n, np.nan)
+    if window < 1 or window > n:
+        return out
+
+    # NaN padding is ignored by fmin/fmax, just like pandas skips NaN
+    padded = np.full(-(-n // window) * window, np.nan)
+    padded[:n] = values
+    blocks = padded.reshape(-1, window)
+    prefix = extreme.accumulate(blocks, axis=1).ravel()
+    suffix = extreme.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    out[window - 1:] = extreme(suffix[:n - window + 1], prefix[window - 1:n])
+    return out
+
+
+def rolling_min(values, window):
+    """Minimum of the last `window` values at each step (NaN until filled)."""
+    return _sliding_extreme(values, window, np.fmin)
+
+
+def rolling_max(values, window):
+    """Maximum of the last `window` values at each step (NaN until filled)."""
+    return _sliding_extreme(values, window, np.fmax)
+
+
+def _is_pivot(values, n1, n2, extreme, beats):
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    idx = np.arange(n)
+    pivot = np.ones(n, dtype=bool)
+
+    # n1 candles before l; like df.Low[l-n1:l], there is nothing to compare
+    # against while l < n1
+    if n1 > 0:
+        before = np.full(n, np.nan)
+        before[1:] = _sliding_extreme(values, n1, extreme)[:-1]
+        checked = idx >= n1
+        pivot[checked] &= ~beats(before[checked], values[checked])
+
+    # n2 candles after l, truncated at the end of the series like
+    # df.Low[l+1:l+n2+1]
+    if n2 > 0:
+        after = np.full(n, np.nan)
+        full = idx + n2 < n
+        after[full] = _sliding_extreme(values, n2, extreme)[idx[full] + n2]
+        tail = extreme.accumulate(values[::-1])[::-1]
+        partial = ~full & (idx + 1 < n)
+        after[partial] = tail[idx[partial] + 1]
+        pivot &= ~beats(after, values)
+
+    return pivot
+
+
+def pivot_lows(low, n1, n2):
+    """Boolean array marking every candle that `support(df, l, n1, n2)` accepts.
+
+    A candle is a pivot low when none of the n1 candles before it and none of
+    the n2 candles after it has a lower Low.
+    """
+    return _is_pivot(low, n1, n2, np.fmin, np.less)
+
+
+def pivot_highs(high, n1, n2):
+    """Boolean array marking every candle that `resistance(df, l, n1, n2)` accepts.
+
+    A candle is a pivot high when none of the n1 candles before it and none of
+    the n2 candles after it has a higher High.
+    """
+    return _is_pivot(high, n1, n2, np.fmax, np.greater)
+
+
+def identify_pivots(data, n1, n2):
+    """Adds the 'pivot_low' and 'pivot_high' boolean columns to the dataframe."""
+    data['pivot_low'] = pivot_lows(data['Low'].values, n1, n2)
+    data['pivot_high'] = pivot_highs(data['High'].values, n1, n2)
+    return data
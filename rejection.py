@@ -0,0 +1,36 @@
+import numpy as np
+
+
+def rejection_signal(open_, high, low, close, body_threshold=0.001):
+    """Column-wise rejection candle classifier.
+
+    Returns an int8 array with 2 for a bullish rejection (long lower wick),
+    1 for a bearish rejection (long upper wick) and 0 otherwise. The rules are
+    the same as the row-wise lambda used in the scripts, evaluated once over
+    whole columns instead of once per row.
+    """
+    open_ = np.asarray(open_, dtype=np.float64)
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+
+    body = np.abs(close - open_)
+    upper_wick = high - np.maximum(open_, close)
+    lower_wick = np.minimum(open_, close) - low
+    big_body = body > open_ * body_threshold
+
+    bullish = (lower_wick > 1.5 * body) & (upper_wick < 0.8 * body) & big_body
+    bearish = (upper_wick > 1.5 * body) & (lower_wick < 0.8 * body) & big_body
+
+    signal = np.zeros(len(open_), dtype=np.int8)
+    signal[bearish] = 1
+    signal[bullish] = 2  # bullish wins when both match, like the if/else chain
+    return signal
+
+
+def identify_rejection(data, column='rejection', body_threshold=0.001):
+    """Adds the rejection signal column to the dataframe and returns it."""
+    data[column] = rejection_signal(data['Open'].values, data['High'].values,
+                                    data['Low'].values, data['Close'].values,
+                                    body_threshold=body_threshold)
+    return data
@@ -1,4 +1,4 @@
-import yfinance as yf
+import bar_cache
 import pandas as pd
 import plotly.graph_objects as go
 
@@ -7,7 +7,7 @@ start= input("Enter the start date in the format YYYY-MM-DD: ")
 end= input("Enter the end date in the format YYYY-MM-DD: ")
 ticker= input("Enter the ticker: ")
 
-dataF = yf.download(ticker, start, end, interval='1d')
+dataF = bar_cache.download(ticker, start, end, interval='1d')
 print(dataF.head())
 
 # Remove rows with 0 volume - weekends, holidays etc.
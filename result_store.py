@@ -0,0 +1,171 @@
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from backtesting import Backtest
+
+from budget_optimizer import grid_points, score
+from indicator_cache import fingerprint
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.optimize_results.sqlite')
+
+# set in every worker by _init
+_backtest = None
+
+
+def code_hash(strategy):
+    """Hash of the source of the modules defining the strategy class and its bases.
+
+    Editing the strategy or an indicator function next to it changes the
+    hash, so results of the old code are not reused. backtesting.py's own
+    classes are left out.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    modules = []
+    for cls in strategy.__mro__:
+        module = inspect.getmodule(cls)
+        if module is None or module in modules or module.__name__.split('.')[0] in ('backtesting', 'builtins'):
+            continue
+        modules.append(module)
+        try:
+            source = inspect.getsource(module)
+        except (OSError, TypeError):  # e.g. defined in an interactive session
+            source = cls.__qualname__
+        digest.update(source.encode())
+    return digest.hexdigest()
+
+
+def data_fingerprint(data):
+    """Content hash of a DataFrame: its index, column names and values."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(fingerprint(data.index.values.astype('datetime64[ns]').view(np.int64)
+                              if isinstance(data.index, pd.DatetimeIndex) else np.asarray(data.index)).encode())
+    for name in data.columns:
+        digest.update(str(name).encode())
+        digest.update(fingerprint(data[name].to_numpy()).encode())
+    return digest.hexdigest()
+
+
+def _plain(value):
+    # JSON-friendly version of a stats value or parameter
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (pd.Timestamp, pd.Timedelta)):
+        return str(value)
+    return value
+
+
+def _dumps(mapping):
+    return json.dumps({str(k): _plain(v) for k, v in mapping.items()}, sort_keys=True, default=str)
+
+
+class ResultStore:
+    """SQLite file of backtest stats, keyed by (strategy, code hash, data fingerprint, settings, params).
+
+    `settings` are the Backtest keyword arguments (cash, commission, ...),
+    since they change the results as much as the parameters do. Only the
+    scalar stats are kept (no equity curve or trades); get() returns them as
+    a Series, so they can be ranked like Backtest.run() stats. Every put() is
+    committed at once, so an interrupted sweep loses at most the runs in
+    flight.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('CREATE TABLE IF NOT EXISTS results ('
+                         'strategy TEXT, code TEXT, data TEXT, settings TEXT, params TEXT, stats TEXT, '
+                         'PRIMARY KEY (strategy, code, data, settings, params))')
+        self._codes = {}
+
+    def close(self):
+        self._db.close()
+
+    def run_key(self, strategy, data, backtest_kwargs):
+        """(strategy, code hash, data fingerprint, settings) shared by all runs of one sweep."""
+        if strategy not in self._codes:
+            self._codes[strategy] = code_hash(strategy)
+        return (f'{strategy.__module__}.{strategy.__qualname__}', self._codes[strategy],
+                data_fingerprint(data), _dumps(backtest_kwargs))
+
+    def get(self, run, params):
+        """Stored stats of `params` in the sweep `run`, or None."""
+        row = self._db.execute('SELECT stats FROM results WHERE strategy=? AND code=? AND data=? AND settings=? '
+                               'AND params=?', (*run, _dumps(params))).fetchone()
+        return None if row is None else pd.Series(json.loads(row[0]), dtype=object)
+
+    def put(self, run, params, stats):
+        """Saves the scalar stats of one run (committed immediately)."""
+        scalars = {key: value for key, value in stats.items() if not key.startswith('_')}
+        with self._db:
+            self._db.execute('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)',
+                             (*run, _dumps(params), _dumps(scalars)))
+
+    def known(self, run):
+        """{params JSON: stats} of every stored run of the sweep."""
+        rows = self._db.execute('SELECT params, stats FROM results WHERE strategy=? AND code=? AND data=? '
+                                'AND settings=?', run)
+        return {params: pd.Series(json.loads(stats), dtype=object) for params, stats in rows}
+
+    def results(self, strategy, data, **backtest_kwargs):
+        """Stored runs of the strategy on `data` as a DataFrame, one row per parameter set."""
+        known = self.known(self.run_key(strategy, data, backtest_kwargs))
+        return pd.DataFrame([{**json.loads(params), **stats} for params, stats in known.items()])
+
+
+def _init(data, strategy, backtest_kwargs):
+    global _backtest
+    _backtest = Backtest(data, strategy, **backtest_kwargs)
+
+
+def _run_one(params):
+    stats = _backtest.run(**params)
+    return params, {key: value for key, value in stats.items() if not key.startswith('_')}
+
+
+def optimize(data, strategy, param_grid, maximize='SQN', constraint=None, store=None, processes=None,
+             return_heatmap=False, **backtest_kwargs):
+    """bt.optimize over the whole grid that keeps every result on disk.
+
+    Combinations already in the `store` for the same strategy code, data and
+    Backtest settings are reused; the others run in a process pool and are saved
+    as they finish, so an interrupted sweep resumes. Returns the best stats like
+    bt.optimize (with '_params' and a '_search' report), and the heatmap if
+    `return_heatmap`.
+    """
+    store = ResultStore() if store is None else store
+    points = grid_points(param_grid, constraint)
+    run = store.run_key(strategy, data, backtest_kwargs)
+    known = store.known(run)
+    missing = [p for p in points if _dumps(p) not in known]
+
+    if missing:
+        with ProcessPoolExecutor(max_workers=min(processes or os.cpu_count(), len(missing)),
+                                 initializer=_init, initargs=(data, strategy, backtest_kwargs)) as pool:
+            for future in as_completed([pool.submit(_run_one, dict(p)) for p in missing]):
+                params, stats = future.result()
+                store.put(run, params, stats)
+                known[_dumps(params)] = pd.Series(stats, dtype=object)
+
+    scores = np.array([score(known[_dumps(p)], maximize) for p in points], dtype=np.float64)
+    best = points[int(np.nanargmax(scores))] if not np.isnan(scores).all() else points[0]
+    stats = Backtest(data, strategy, **backtest_kwargs).run(**best)
+    stats['_params'] = {name: _plain(value) for name, value in best.items()}
+    stats['_search'] = {
+        'method': 'stored grid search',
+        'grid size': len(points),
+        'evaluations': len(missing),
+        'reused': len(points)-len(missing),
+    }
+    if not return_heatmap:
+        return stats
+    heatmap = pd.Series(scores, index=pd.MultiIndex.from_tuples([tuple(p.values()) for p in points],
+                                                                names=list(param_grid)),
+                        name=maximize if isinstance(maximize, str) else 'Score')
+    return stats, heatmap
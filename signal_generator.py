@@ -0,0 +1,150 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from rejection import rejection_signal
+from pivots import pivot_lows, pivot_highs, rolling_min, rolling_max
+from nearest_level import close_resistance_batch, close_support_batch
+
+
+def _merge_rows(levels, tolerance):
+    """Row-wise merge_levels over a 2-D array of sorted levels (NaN padded at the end).
+
+    merge_levels compares each level with its original left neighbour and,
+    after popping one, never compares the level that slid into its place. So
+    inside every run of consecutive "too close" pairs the 1st, 3rd, 5th...
+    levels are popped, which only needs the position inside the run.
+    """
+    close = np.abs(levels[:, 1:]-levels[:, :-1])/levels[:, 1:] <= tolerance
+    idx = np.arange(close.shape[1])
+    last_far = np.maximum.accumulate(np.where(close, -1, idx), axis=1)
+    drop = close & ((idx-last_far-1) % 2 == 0)
+    merged = levels.copy()
+    merged[:, 1:][drop] = np.nan
+    return merged
+
+
+def _window_levels(ss, rr, tolerance):
+    """Merged `rrss` level sets from per-bar support/resistance rows (NaN where no pivot)."""
+    ss = _merge_rows(np.sort(ss, axis=1), tolerance)  # keep lowest support
+    rr = _merge_rows(-np.sort(-rr, axis=1), tolerance)  # keep highest resistance
+    return _merge_rows(np.sort(np.concatenate([rr, ss], axis=1), axis=1), tolerance)
+
+
+def _prior_extremes(highs, lows, windowbackCandles):
+    """Highest High / lowest Low of the windowbackCandles bars before each bar.
+
+    Like df.loc[l-windowbackCandles:l-1], the window is clipped at the first bar.
+    """
+    n = len(highs)
+    prior_high = np.full(n, np.nan)
+    prior_low = np.full(n, np.nan)
+    prior_high[1:] = rolling_max(highs, windowbackCandles)[:-1]
+    prior_low[1:] = rolling_min(lows, windowbackCandles)[:-1]
+    short = np.arange(1, n) < windowbackCandles
+    prior_high[1:][short] = np.fmax.accumulate(highs)[:-1][short]
+    prior_low[1:][short] = np.fmin.accumulate(lows)[:-1][short]
+    return prior_high, prior_low
+
+
+def _scan(rows, window_flags, opens, highs, lows, closes, rejection, prior_high, prior_low,
+          levelbackCandles, n2, tolerance, chunk_size):
+    """Signals of `rows`; window_flags(l) gives the support/resistance pivot
+    flags of candles l-levelbackCandles ... l-n2 for a chunk of bars."""
+    signal = np.zeros(len(opens), dtype=np.int8)
+    window = levelbackCandles-n2+1
+    low_view = sliding_window_view(lows, window)
+    high_view = sliding_window_view(highs, window)
+
+    for chunk in range(0, len(rows), chunk_size):
+        l = rows[chunk:chunk+chunk_size]
+        is_low, is_high = window_flags(l)
+        start = l-levelbackCandles
+        levels = _window_levels(np.where(is_low, low_view[start], np.nan),
+                                np.where(is_high, high_view[start], np.nan), tolerance)
+        present = ~np.isnan(levels)
+        flat = levels[present]
+        offsets = np.concatenate([[0], np.cumsum(present.sum(axis=1))])
+
+        lim = closes[l]*0.003
+        cR = close_resistance_batch(flat, offsets, highs[l], lows[l], opens[l], closes[l], lim)
+        cS = close_support_batch(flat, offsets, highs[l], lows[l], opens[l], closes[l], lim)
+
+        sell = (rejection[l] == 1) & (cR != 0) & (prior_high[l] < cR)
+        buy = (rejection[l] == 2) & (cS != 0) & (prior_low[l] > cS)
+        signal[l[sell]] = 1
+        signal[l[buy]] = 2
+
+    return signal
+
+
+def _ohlc(df):
+    # works for a DataFrame or any mapping of column name -> array
+    return tuple(np.asarray(df[c], dtype=np.float64) for c in ('Open', 'High', 'Low', 'Close'))
+
+
+def generate_signals(df, n1, n2, levelbackCandles, windowbackCandles, tolerance=0.001, chunk_size=100_000):
+    """Support/resistance rejection signal for every bar, computed with array operations.
+
+    Gives the same 0/1/2 column as calling check_candle_signal for every row in
+    range(levelbackCandles+n1, len(df)-n2), but with pivots, level sets,
+    proximity tests and the window max/min done for all bars at once. Only bars
+    with a rejection candle can signal, and those are processed in chunks of
+    `chunk_size` so the per-bar level matrix stays small.
+    """
+    opens, highs, lows, closes = _ohlc(df)
+    n = len(opens)
+
+    rejection = rejection_signal(opens, highs, lows, closes)
+    rows = np.arange(levelbackCandles+n1, n-n2)
+    rows = rows[rejection[rows] != 0]
+    if len(rows) == 0 or levelbackCandles < n2 or windowbackCandles < 1:
+        return np.zeros(n, dtype=np.int8)
+
+    is_low = sliding_window_view(pivot_lows(lows, n1, n2), levelbackCandles-n2+1)
+    is_high = sliding_window_view(pivot_highs(highs, n1, n2), levelbackCandles-n2+1)
+    prior_high, prior_low = _prior_extremes(highs, lows, windowbackCandles)
+
+    def window_flags(l):
+        return is_low[l-levelbackCandles], is_high[l-levelbackCandles]
+
+    return _scan(rows, window_flags, opens, highs, lows, closes, rejection, prior_high, prior_low,
+                 levelbackCandles, n2, tolerance, chunk_size)
+
+
+def generate_window_signals(df, n1, n2, levelbackCandles, windowbackCandles, tolerance=0.001, chunk_size=100_000):
+    """Zero-copy version of a rolling-window signal loop.
+
+    That loop (formerly in TradingBot.py) copies data[i+n1+1 : i+levelbackCandles+n1+2] for every bar,
+    re-indexes it and runs check_candle_signal on its last row. Here every
+    window is an offset into sliding views of the full columns and rejection
+    flags are computed once. Candles too close to the start of their window
+    to have n1 predecessors in it only get the right-hand pivot test, exactly
+    like the copied frame, so the result is the same signal column.
+    """
+    opens, highs, lows, closes = _ohlc(df)
+    n = len(opens)
+
+    rejection = rejection_signal(opens, highs, lows, closes)
+    rows = np.arange(levelbackCandles+n1+1, n)
+    rows = rows[rejection[rows] != 0]
+    if len(rows) == 0 or levelbackCandles < n2 or windowbackCandles < 1:
+        return np.zeros(n, dtype=np.int8)
+
+    window = levelbackCandles-n2+1
+    both_low = sliding_window_view(pivot_lows(lows, n1, n2), window)
+    both_high = sliding_window_view(pivot_highs(highs, n1, n2), window)
+    right_low = sliding_window_view(pivot_lows(lows, 0, n2), window)
+    right_high = sliding_window_view(pivot_highs(highs, 0, n2), window)
+    # the copied window is only levelbackCandles+1 bars long
+    prior_high, prior_low = _prior_extremes(highs, lows, min(windowbackCandles, levelbackCandles))
+
+    def window_flags(l):
+        start = l-levelbackCandles
+        is_low = both_low[start]
+        is_high = both_high[start]
+        is_low[:, :n1] = right_low[start, :n1]
+        is_high[:, :n1] = right_high[start, :n1]
+        return is_low, is_high
+
+    return _scan(rows, window_flags, opens, highs, lows, closes, rejection, prior_high, prior_low,
+                 levelbackCandles, n2, tolerance, chunk_size)
@@ -0,0 +1,155 @@
+import numpy as np
+
+from signal_generator import generate_signals
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; generate_signals is the pure-NumPy fallback
+    njit = None
+
+
+def _merge_sorted(levels, k, tolerance):
+    # in-place merge_levels over levels[:k]; returns the new length
+    out = 1 if k > 0 else 0
+    j = 1
+    while j < k:
+        if abs(levels[j]-levels[j-1])/levels[j] <= tolerance:
+            # popped; the next level is kept without being compared
+            if j+1 < k:
+                levels[out] = levels[j+1]
+                out += 1
+            j += 2
+        else:
+            levels[out] = levels[j]
+            out += 1
+            j += 1
+    return out
+
+
+def _nearest(levels, k, price):
+    # first level with the smallest distance, like min(levels, key=...)
+    best = levels[0]
+    best_dist = abs(levels[0]-price)
+    for i in range(1, k):
+        dist = abs(levels[i]-price)
+        if dist < best_dist:
+            best = levels[i]
+            best_dist = dist
+    return best
+
+
+def _sr_kernel(opens, highs, lows, closes, n1, n2, levelbackCandles, windowbackCandles, tolerance):
+    n = len(opens)
+    signal = np.zeros(n, dtype=np.int8)
+    if levelbackCandles < n2:
+        return signal
+
+    # rejection candles
+    rejection = np.zeros(n, dtype=np.int8)
+    for i in range(n):
+        body = abs(closes[i]-opens[i])
+        upper = highs[i]-max(opens[i], closes[i])
+        lower = min(opens[i], closes[i])-lows[i]
+        big_body = body > opens[i]*0.001
+        if lower > 1.5*body and upper < 0.8*body and big_body:
+            rejection[i] = 2
+        elif upper > 1.5*body and lower < 0.8*body and big_body:
+            rejection[i] = 1
+
+    # pivot lows/highs
+    is_low = np.ones(n, dtype=np.bool_)
+    is_high = np.ones(n, dtype=np.bool_)
+    for g in range(n):
+        first = g-n1 if g >= n1 else g
+        last = min(g+n2, n-1)
+        for j in range(first, last+1):
+            if j == g:
+                continue
+            if lows[j] < lows[g]:
+                is_low[g] = False
+            if highs[j] > highs[g]:
+                is_high[g] = False
+
+    window = levelbackCandles-n2+1
+    ss = np.empty(window)
+    rr = np.empty(window)
+    rrss = np.empty(2*window)
+    for l in range(levelbackCandles+n1, n-n2):
+        if rejection[l] == 0:
+            continue
+
+        ks = 0
+        kr = 0
+        for g in range(l-levelbackCandles, l-n2+1):
+            if is_low[g]:
+                ss[ks] = lows[g]
+                ks += 1
+            if is_high[g]:
+                rr[kr] = highs[g]
+                kr += 1
+        ss[:ks] = np.sort(ss[:ks])  # keep lowest support
+        ks = _merge_sorted(ss, ks, tolerance)
+        rr[:kr] = np.sort(rr[:kr])[::-1]  # keep highest resistance
+        kr = _merge_sorted(rr, kr, tolerance)
+        k = ks+kr
+        if k == 0:
+            continue
+        rrss[:kr] = rr[:kr]
+        rrss[kr:k] = ss[:ks]
+        rrss[:k] = np.sort(rrss[:k])
+        k = _merge_sorted(rrss, k, tolerance)
+
+        lim = closes[l]*0.003
+        first = max(l-windowbackCandles, 0)
+        if rejection[l] == 1:
+            level = _nearest(rrss, k, highs[l])
+            near = abs(highs[l]-level) <= lim or abs(max(opens[l], closes[l])-level) <= lim
+            if near and min(opens[l], closes[l]) < level and lows[l] < level:
+                prior = np.nan
+                for j in range(first, l):
+                    if highs[j] > prior or np.isnan(prior):
+                        prior = highs[j]
+                if prior < level:
+                    signal[l] = 1
+        else:
+            level = _nearest(rrss, k, lows[l])
+            near = abs(lows[l]-level) <= lim or abs(min(opens[l], closes[l])-level) <= lim
+            if near and max(opens[l], closes[l]) > level and highs[l] > level:
+                prior = np.nan
+                for j in range(first, l):
+                    if lows[j] < prior or np.isnan(prior):
+                        prior = lows[j]
+                if prior > level:
+                    signal[l] = 2
+
+    return signal
+
+
+if njit is not None:
+    _merge_sorted = njit(cache=True)(_merge_sorted)
+    _nearest = njit(cache=True)(_nearest)
+    _sr_kernel = njit(cache=True)(_sr_kernel)
+
+
+def compute_signals(df, n1, n2, levelbackCandles, windowbackCandles, tolerance=0.001):
+    """Same signal column as generate_signals, from one fused compiled loop.
+
+    Pivot detection, level merging, proximity and window tests run in a single
+    numba kernel over contiguous float64 columns, without the intermediate
+    arrays of the NumPy version. Without numba this falls back to
+    generate_signals. `df` only needs Open/High/Low/Close columns, so a dict
+    of arrays works too.
+    """
+    if njit is None:
+        return generate_signals(df, n1, n2, levelbackCandles, windowbackCandles, tolerance)
+    columns = [np.ascontiguousarray(df[c], dtype=np.float64) for c in ('Open', 'High', 'Low', 'Close')]
+    return _sr_kernel(*columns, n1, n2, levelbackCandles, windowbackCandles, tolerance)
+
+
+def sweep_signals(df, param_grid, tolerance=0.001):
+    """Signal column for every (n1, n2, levelbackCandles, windowbackCandles) in param_grid.
+
+    The OHLC columns are converted once and shared by all runs.
+    """
+    columns = {c: np.ascontiguousarray(df[c], dtype=np.float64) for c in ('Open', 'High', 'Low', 'Close')}
+    return {params: compute_signals(columns, *params, tolerance=tolerance) for params in param_grid}
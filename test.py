@@ -2,12 +2,18 @@
 import pandas as pd
 
 # Fetching financial market data
-import yfinance as yf
+import bar_cache
 
 # Backtesting library
 from backtesting import Backtest, Strategy
 from backtesting.lib import crossover
 
+# Indicators shared across optimization runs
+from indicator_cache import cached
+
+# Batched grid search for SMA crossover strategies
+from crossover_grid import optimize_crossover
+
 # Visualization
 import matplotlib.pyplot as plt
 import seaborn as sns
@@ -16,6 +22,11 @@ import seaborn as sns
 import warnings
 warnings.filterwarnings("ignore")
 
+@cached
+def SMA(values, n):
+    """Simple moving average, computed once per (data, n) across optimization runs."""
+    return pd.Series(values).rolling(n).mean()
+
 class MovingAverageCrossoverStrategy(Strategy):
     # The strategy now uses hardcoded best parameters from optimization results
     # These should be updated manually based on optimization output
@@ -23,8 +34,8 @@ class MovingAverageCrossoverStrategy(Strategy):
     n2 = 110  # To be updated manually after optimization
 
     def init(self):
-        self.sma1 = self.I(lambda x: pd.Series(x).rolling(self.n1).mean(), self.data.Close)
-        self.sma2 = self.I(lambda x: pd.Series(x).rolling(self.n2).mean(), self.data.Close)
+        self.sma1 = self.I(SMA, self.data.Close, self.n1)
+        self.sma2 = self.I(SMA, self.data.Close, self.n2)
 
     def next(self):
         if crossover(self.sma1, self.sma2):
@@ -37,7 +48,7 @@ class MovingAverageCrossoverStrategy(Strategy):
 if __name__ == "__main__":
     # Fetch historical data from Yahoo Finance
     ticker = input("Enter the ticker symbol: ")
-    data = yf.download(ticker, start="2020-01-01", end="2024-03-27")
+    data = bar_cache.download(ticker, start="2020-01-01", end="2024-03-27")
 
     # Initialize the Backtest object
     bt = Backtest(data, MovingAverageCrossoverStrategy, cash=10_000, commission=.002)
@@ -47,10 +58,13 @@ if __name__ == "__main__":
         'n1': range(10, 51, 5),  # Short moving average window
         'n2': range(50, 251, 5)  # Long moving average window
     }
-    optimization_results = bt.optimize(**param_grid, maximize='Sharpe Ratio', return_heatmap=False)
+    # All combinations are simulated together; same results as
+    # bt.optimize(**param_grid, maximize='Sharpe Ratio')
+    optimization_results = optimize_crossover(data, **param_grid, maximize='Sharpe Ratio',
+                                              cash=10_000, commission=.002)
 
     # Print the best parameters and their corresponding performance metric
-    print("Best Parameters:", optimization_results._strategy)
+    print("Best Parameters:", optimization_results['_params'])
     print("Sharpe Ratio:", optimization_results['Sharpe Ratio'])
 
     # Manually input the optimized parameters after reading them from the output
@@ -1,43 +1,24 @@
-import yfinance as yf
+import bar_cache
 import pandas as pd
 import pandas_ta as pa
 import numpy as np
 import plotly.graph_objects as go
 from tqdm import tqdm
 from backtesting import Strategy, Backtest
+from rejection import identify_rejection
+from pivots import identify_pivots
+from level_book import LevelBook, joined_levels
+from nearest_level import close_resistance, close_support
 
 def get_data(symbol: str):
     """Fetches historical market data from Yahoo Finance."""
-    data = yf.download(tickers=symbol, period='1000d', interval='1d')
+    data = bar_cache.download(tickers=symbol, period='1000d', interval='1d')
     # Correctly reset the index and then rename it
     data.reset_index(inplace=True)
     data = data.rename(columns={'Date': 'date'})  # Rename the 'Date' column to 'date'
     return data
 
 
-def identify_rejection(data):
-    """Identifies rejection signals based on specific criteria and adds them to the dataframe."""
-    def rejection_criteria(row):
-        bullish_rejection = (
-            (min(row['Open'], row['Close']) - row['Low']) > (1.5 * abs(row['Close'] - row['Open'])) and 
-            (row['High'] - max(row['Close'], row['Open'])) < (0.8 * abs(row['Close'] - row['Open'])) and 
-            (abs(row['Open'] - row['Close']) > row['Open'] * 0.001)
-        )
-        bearish_rejection = (
-            (row['High'] - max(row['Open'], row['Close'])) > (1.5 * abs(row['Open'] - row['Close'])) and 
-            (min(row['Close'], row['Open']) - row['Low']) < (0.8 * abs(row['Open'] - row['Close'])) and 
-            (abs(row['Open'] - row['Close']) > row['Open'] * 0.001)
-        )
-        if bullish_rejection:
-            return 2
-        elif bearish_rejection:
-            return 1
-        else:
-            return 0
-    
-    data['rejection'] = data.apply(rejection_criteria, axis=1)
-    return data
-
 # Adjusting plot_with_signal to use 'date' column and address SettingWithCopyWarning
 
 def plot_with_signal(df):
@@ -95,28 +76,10 @@ def resistance(df1, l, n1, n2): #n1 n2 before and after candle l
 
 # Close to resistance and support testing
 def closeResistance(l, levels, lim, df):
-    if len(levels) == 0:
-        return 0
-    c1 = abs(df['High'][l] - min(levels, key=lambda x: abs(x - df['High'][l]))) <= lim
-    c2 = abs(max(df['Open'][l], df['Close'][l]) - min(levels, key=lambda x: abs(x - df['High'][l]))) <= lim
-    c3 = min(df['Open'][l], df['Close'][l]) < min(levels, key=lambda x: abs(x - df['High'][l]))
-    c4 = df['Low'][l] < min(levels, key=lambda x: abs(x - df['High'][l]))
-    if (c1 or c2) and c3 and c4:
-        return min(levels, key=lambda x: abs(x - df['High'][l]))
-    else:
-        return 0
+    return close_resistance(levels, df['High'][l], df['Low'][l], df['Open'][l], df['Close'][l], lim)
 
 def closeSupport(l, levels, lim, df):
-    if len(levels) == 0:
-        return 0
-    c1 = abs(df['Low'][l] - min(levels, key=lambda x: abs(x - df['Low'][l]))) <= lim
-    c2 = abs(min(df['Open'][l], df['Close'][l]) - min(levels, key=lambda x: abs(x - df['Low'][l]))) <= lim
-    c3 = max(df['Open'][l], df['Close'][l]) > min(levels, key=lambda x: abs(x - df['Low'][l]))
-    c4 = df['High'][l] > min(levels, key=lambda x: abs(x - df['Low'][l]))
-    if (c1 or c2) and c3 and c4:
-        return min(levels, key=lambda x: abs(x - df['Low'][l]))
-    else:
-        return 0
+    return close_support(levels, df['High'][l], df['Low'][l], df['Open'][l], df['Close'][l], lim)
 
 def is_below_resistance(l, level_backCandles, level, df):
     return df.loc[l-level_backCandles:l-1, 'High'].max() < level
@@ -124,38 +87,19 @@ def is_below_resistance(l, level_backCandles, level, df):
 def is_above_support(l, level_backCandles, level, df):
     return df.loc[l-level_backCandles:l-1, 'Low'].min() > level
 
-def check_candle_signal(l, n1, n2, levelbackCandles, windowbackCandles, df):
-    ss = []
-    rr = []
-    for subrow in range(l-levelbackCandles, l-n2+1):
-        if support(df, subrow, n1, n2):
-            ss.append(df.Low[subrow])
-        if resistance(df, subrow, n1, n2):
-            rr.append(df.High[subrow])
-
-    ss.sort() #keep lowest support when popping a level
-    for i in range(1,len(ss)):
-        if(i>=len(ss)):
-            break
-        if abs(ss[i]-ss[i-1])/ss[i]<=0.001: # merging close distance levels
-            ss.pop(i)
-
-    rr.sort(reverse=True) # keep highest resistance when popping one
-    for i in range(1,len(rr)):
-        if(i>=len(rr)):
-            break
-        if abs(rr[i]-rr[i-1])/rr[i]<=0.001: # merging close distance levels
-            rr.pop(i)
-
-    #----------------------------------------------------------------------
-    # joined levels
-    rrss = rr+ss
-    rrss.sort()
-    for i in range(1,len(rrss)):
-        if(i>=len(rrss)):
-            break
-        if abs(rrss[i]-rrss[i-1])/rrss[i]<=0.001: # merging close distance levels
-            rrss.pop(i)
+def check_candle_signal(l, n1, n2, levelbackCandles, windowbackCandles, df, book=None):
+    if book is not None:
+        # the level book only adds/evicts the pivots entering/leaving the window
+        rrss = book.update(l, df.Low.values, df.High.values)
+    else:
+        # pivot_low/pivot_high are precomputed for the whole series by identify_pivots
+        window = slice(l-levelbackCandles, l-n2+1)
+        ss = df.Low.values[window][df.pivot_low.values[window]].tolist()
+        rr = df.High.values[window][df.pivot_high.values[window]].tolist()
+
+        #----------------------------------------------------------------------
+        # joined levels, merging close distance levels
+        rrss = joined_levels(ss, rr)
     cR = closeResistance(l, rrss, df.Close[l]*0.003, df)
     cS = closeSupport(l, rrss, df.Close[l]*0.003, df)
     #----------------------------------------------------------------------
@@ -185,10 +129,12 @@ n2 = 8
 levelbackCandles = 60
 windowbackCandles = n2
 
+data = identify_pivots(data, n1, n2)
 signal = [0 for i in range(len(data))]
 
+book = LevelBook(n1, n2, levelbackCandles)
 for row in tqdm(range(levelbackCandles+n1, len(data)-n2)):
-    signal[row] = check_candle_signal(row, n1, n2, levelbackCandles, windowbackCandles, data)
+    signal[row] = check_candle_signal(row, n1, n2, levelbackCandles, windowbackCandles, data, book)
 
 data["signal"] = signal
 
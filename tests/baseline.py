@@ -0,0 +1,159 @@
+"""Row-wise loops of the original scripts, as reference for the array versions.
+
+Copied from CompleteTradingSystem.py / TradingBot.py / trend_detection.py before they were
+vectorized; `df` needs a RangeIndex.
+"""
+
+import pandas as pd
+
+
+def identify_rejection(data):
+    data['rejection'] = data.apply(lambda row: 2 if (
+        ((min(row['Open'], row['Close']) - row['Low']) > (1.5 * abs(row['Close'] - row['Open']))) and
+        (row['High'] - max(row['Close'], row['Open'])) < (0.8 * abs(row['Close'] - row['Open'])) and
+        (abs(row['Open'] - row['Close']) > row['Open'] * 0.001)
+    ) else 1 if (
+        (row['High'] - max(row['Open'], row['Close'])) > (1.5 * abs(row['Open'] - row['Close'])) and
+        (min(row['Close'], row['Open']) - row['Low']) < (0.8 * abs(row['Open'] - row['Close'])) and
+        (abs(row['Open'] - row['Close']) > row['Open'] * 0.001)
+    ) else 0, axis=1)
+    return data
+
+
+def support(df1, l, n1, n2):
+    if (df1.Low[l-n1:l].min() < df1.Low[l] or
+            df1.Low[l+1:l+n2+1].min() < df1.Low[l]):
+        return 0
+    return 1
+
+
+def resistance(df1, l, n1, n2):
+    if (df1.High[l-n1:l].max() > df1.High[l] or
+            df1.High[l+1:l+n2+1].max() > df1.High[l]):
+        return 0
+    return 1
+
+
+def merge(levels):
+    for i in range(1, len(levels)):
+        if i >= len(levels):
+            break
+        if abs(levels[i]-levels[i-1])/levels[i] <= 0.001:
+            levels.pop(i)
+    return levels
+
+
+def levels(df, l, n1, n2, levelbackCandles):
+    ss = []
+    rr = []
+    for subrow in range(l-levelbackCandles, l-n2+1):
+        if support(df, subrow, n1, n2):
+            ss.append(df.Low[subrow])
+        if resistance(df, subrow, n1, n2):
+            rr.append(df.High[subrow])
+    ss = merge(sorted(ss))
+    rr = merge(sorted(rr, reverse=True))
+    return merge(sorted(rr+ss))
+
+
+def closeResistance(l, levels, lim, df):
+    if len(levels) == 0:
+        return 0
+    c1 = abs(df['High'][l] - min(levels, key=lambda x: abs(x - df['High'][l]))) <= lim
+    c2 = abs(max(df['Open'][l], df['Close'][l]) - min(levels, key=lambda x: abs(x - df['High'][l]))) <= lim
+    c3 = min(df['Open'][l], df['Close'][l]) < min(levels, key=lambda x: abs(x - df['High'][l]))
+    c4 = df['Low'][l] < min(levels, key=lambda x: abs(x - df['High'][l]))
+    if (c1 or c2) and c3 and c4:
+        return min(levels, key=lambda x: abs(x - df['High'][l]))
+    else:
+        return 0
+
+
+def closeSupport(l, levels, lim, df):
+    if len(levels) == 0:
+        return 0
+    c1 = abs(df['Low'][l] - min(levels, key=lambda x: abs(x - df['Low'][l]))) <= lim
+    c2 = abs(min(df['Open'][l], df['Close'][l]) - min(levels, key=lambda x: abs(x - df['Low'][l]))) <= lim
+    c3 = max(df['Open'][l], df['Close'][l]) > min(levels, key=lambda x: abs(x - df['Low'][l]))
+    c4 = df['High'][l] > min(levels, key=lambda x: abs(x - df['Low'][l]))
+    if (c1 or c2) and c3 and c4:
+        return min(levels, key=lambda x: abs(x - df['Low'][l]))
+    else:
+        return 0
+
+
+def check_candle_signal(l, n1, n2, levelbackCandles, windowbackCandles, df):
+    rrss = levels(df, l, n1, n2, levelbackCandles)
+    cR = closeResistance(l, rrss, df.Close[l]*0.003, df)
+    cS = closeSupport(l, rrss, df.Close[l]*0.003, df)
+    if df.rejection[l] == 1 and cR and df.loc[l-windowbackCandles:l-1, 'High'].max() < cR:
+        return 1
+    elif df.rejection[l] == 2 and cS and df.loc[l-windowbackCandles:l-1, 'Low'].min() > cS:
+        return 2
+    else:
+        return 0
+
+
+def signal_column(data, n1, n2, levelbackCandles, windowbackCandles):
+    """check_candle_signal for every row in range(levelbackCandles+n1, len(data)-n2), 0 elsewhere."""
+    df = identify_rejection(data.reset_index(drop=True))
+    signal = [0]*len(df)
+    for row in range(levelbackCandles+n1, len(df)-n2):
+        if df.rejection[row]:
+            signal[row] = check_candle_signal(row, n1, n2, levelbackCandles, windowbackCandles, df)
+    return signal
+
+
+def window_signal_column(data, n1, n2, levelbackCandles, windowbackCandles):
+    """The TradingBot.py loop: check_candle_signal on the last row of a copied window per bar."""
+    data = identify_rejection(data.reset_index(drop=True))
+    signal = [0]*(levelbackCandles+n1+1)
+    for i in range(0, len(data)-1-levelbackCandles-n1):
+        df = data[i+n1+1:i+levelbackCandles+n1+1+1].copy()
+        df.reset_index(inplace=True)
+        l = len(df)-1
+        signal.append(check_candle_signal(l, n1, n2, levelbackCandles, windowbackCandles, df)
+                      if df.rejection[l] else 0)
+    return signal
+
+
+def cell_by_cell(candles):
+    """The DataFrame TradingBot.py filled one .loc cell at a time from the bid candles."""
+    dfstream = pd.DataFrame(columns=['Open', 'Close', 'High', 'Low'])
+    for i, candle in enumerate(candles):
+        dfstream.loc[i, ['Open']] = float(str(candle.bid.o))
+        dfstream.loc[i, ['Close']] = float(str(candle.bid.c))
+        dfstream.loc[i, ['High']] = float(str(candle.bid.h))
+        dfstream.loc[i, ['Low']] = float(str(candle.bid.l))
+    return dfstream.astype(float)
+
+
+def check_candles(data, backcandles, ma_column):
+    categories = [0 for _ in range(backcandles)]
+    for i in range(backcandles, len(data)):
+        if all(data['Close'].iloc[i-backcandles:i] > data[ma_column].iloc[i-backcandles:i]):
+            categories.append(2)
+        elif all(data['Close'].iloc[i-backcandles:i] < data[ma_column].iloc[i-backcandles:i]):
+            categories.append(1)
+        else:
+            categories.append(0)
+    return categories
+
+
+def determine_trend(data):
+    if data['SMA_9'] > data['SMA_21'] > data['SMA_50']:
+        return 2
+    elif data['SMA_9'] < data['SMA_21'] < data['SMA_50']:
+        return 1
+    else:
+        return 0
+
+
+def generate_trend_signal(data, threshold=40):
+    trend_signal = []
+    for i in range(len(data)):
+        if data['ADX'].iloc[i] > threshold:
+            trend_signal.append(2 if data['DMP'].iloc[i] > data['DMN'].iloc[i] else 1)
+        else:
+            trend_signal.append(0)
+    return trend_signal
@@ -0,0 +1,27 @@
+"""Times candles_frame against the .loc cell loop TradingBot.py used; run `python tests/bench_bar_stream.py`."""
+import time
+
+from baseline import cell_by_cell
+from conftest import random_bars  # puts the repository root on sys.path first
+from bar_stream import FakeCandleSource, candles_frame
+
+SIZES = (300, 5_000, 50_000)
+
+
+def best_of(func, candles, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(candles)
+        timings.append(time.perf_counter()-started)
+    return min(timings)
+
+
+if __name__ == '__main__':
+    hourly = random_bars(max(SIZES), freq='h')
+    print(f"{'candles':>8} {'cell loop [s]':>14} {'candles_frame [s]':>18} {'speed-up':>9}")
+    for n in SIZES:
+        candles = FakeCandleSource(hourly, cursor=n).grab(n)
+        loop = best_of(cell_by_cell, candles, repeat=3 if n <= 300 else 1)
+        frame = best_of(candles_frame, candles, repeat=5)
+        print(f'{n:>8} {loop:>14.3f} {frame:>18.4f} {loop/frame:>8.0f}x')
@@ -0,0 +1,29 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# the modules live at the top level of the repository
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def random_bars(n=600, seed=0, start='2015-01-01', freq='D'):
+    """Synthetic daily OHLCV bars: a random walk with wicks around each candle body."""
+    rng = np.random.default_rng(seed)
+    close = 100+np.cumsum(rng.normal(0, 1, n))
+    open_ = np.r_[close[0], close[:-1]]+rng.normal(0, .3, n)
+    return pd.DataFrame({
+        'Open': open_,
+        'High': np.maximum(open_, close)+rng.exponential(.8, n),
+        'Low': np.minimum(open_, close)-rng.exponential(.8, n),
+        'Close': close,
+        'Volume': rng.integers(1_000, 100_000, n).astype(float),
+    }, index=pd.date_range(start, periods=n, freq=freq, name='Date'))
+
+
+@pytest.fixture
+def bars():
+    return random_bars()
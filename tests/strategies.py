@@ -0,0 +1,52 @@
+"""Copies of the scripts' strategies: importing the scripts pulls in plotting and data downloads."""
+import pandas as pd
+from backtesting import Strategy
+from backtesting.lib import crossover
+
+from indicator_cache import cached
+
+
+@cached
+def SMA(values, n):
+    return pd.Series(values).rolling(n).mean()
+
+
+class SmaCross(Strategy):
+    # Backtesting_package_GPT.py
+    n1 = 60
+    n2 = 100
+
+    def init(self):
+        self.sma1 = self.I(SMA, self.data.Close, self.n1)
+        self.sma2 = self.I(SMA, self.data.Close, self.n2)
+
+    def next(self):
+        if crossover(self.sma1, self.sma2):
+            self.position.close()
+            self.buy()
+        elif crossover(self.sma2, self.sma1):
+            self.position.close()
+            self.sell()
+
+
+class PercentageBasedSLStrategy(Strategy):
+    # PercentMovingAverageCrossoverOptimization.py
+    n1 = 40
+    n2 = 200
+    sl_percentage = 0.01
+
+    def init(self):
+        self.sma1 = self.I(lambda close: pd.Series(close).rolling(self.n1, min_periods=1).mean(), self.data.Close)
+        self.sma2 = self.I(lambda close: pd.Series(close).rolling(self.n2, min_periods=1).mean(), self.data.Close)
+
+    def next(self):
+        if crossover(self.sma1, self.sma2):
+            if not self.position:
+                self.buy()
+        elif crossover(self.sma2, self.sma1):
+            if self.position:
+                self.position.close()
+
+        for trade in self.trades:
+            sl_price = trade.entry_price * (1 - self.sl_percentage) if trade.is_long else trade.entry_price * (1 + self.sl_percentage)
+            trade.sl = sl_price
@@ -0,0 +1,39 @@
+import pandas as pd
+
+from bar_cache import BarCache
+from conftest import random_bars
+
+
+def max_period_downloader(data, calls):
+    # like yfinance with period='max': without a start, `end` is ignored
+    def download(symbol, start, end, interval):
+        calls.append((start, end))
+        if start is None:
+            return data
+        return data[data.index >= start] if end is None else data[(data.index >= start) & (data.index < end)]
+    return download
+
+
+def test_head_fetch_stops_at_end(tmp_path):
+    data = random_bars()
+    calls = []
+    cache = BarCache(root=str(tmp_path), downloader=max_period_downloader(data, calls))
+
+    bars = cache.get('SYN', end='2015-06-01')
+    stored, _ = cache.load('SYN')
+    assert bars.index.max() < pd.Timestamp('2015-06-01')
+    assert stored.index.max() < pd.Timestamp('2015-06-01')
+    pd.testing.assert_frame_equal(bars, data[data.index < '2015-06-01'], check_freq=False)
+
+
+def test_tail_is_fetched_later(tmp_path):
+    data = random_bars()
+    calls = []
+    cache = BarCache(root=str(tmp_path), downloader=max_period_downloader(data, calls))
+
+    cache.get('SYN', start='2015-03-01', end='2015-06-01')
+    bars = cache.get('SYN', start='2015-03-01', end='2016-01-01')
+    pd.testing.assert_frame_equal(bars, data[(data.index >= '2015-03-01') & (data.index < '2016-01-01')],
+                                  check_freq=False)
+    # the second request only downloads from the last cached bar on
+    assert calls[-1][0] == pd.Timestamp('2015-05-31')
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+from bar_store import BarStore, convert, open_store, write
+
+
+def test_round_trip(tmp_path, bars):
+    path = str(tmp_path / 'SYN.arrow')
+    write(bars.iloc[::-1], path)  # written sorted
+    store = BarStore(path)
+    assert store.columns == list(bars.columns)
+    assert len(store) == len(bars)
+    assert not store['Close'].flags.writeable
+    expected = bars.set_axis(bars.index.as_unit('ns'))  # the store keeps nanoseconds
+    pd.testing.assert_frame_equal(store.frame(), expected, check_freq=False)
+
+
+def test_convert_csv(tmp_path, bars):
+    source = str(tmp_path / 'SYN.csv')
+    bars.to_csv(source)
+    store = BarStore(convert(source))
+    np.testing.assert_allclose(store['Close'], bars['Close'])
+    assert store.index.equals(pd.DatetimeIndex(bars.index, name='Date'))
+
+
+def test_between(tmp_path, bars):
+    path = str(tmp_path / 'SYN.arrow')
+    write(bars, path)
+    view = open_store(path, columns=['Close'], start='2015-03-01', end='2015-04-01')
+    expected = bars.loc['2015-03-01':'2015-03-31', 'Close']
+    assert view.columns == ['Close']
+    np.testing.assert_array_equal(view['Close'], expected)
+    assert len(view.between(end='2015-03-10')) == 9
+    assert len(view.between(start='2016-01-01')) == 0
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bar_stream import BarBuffer, FakeCandleSource, StreamingSignal, candles_frame, sync
+from baseline import cell_by_cell, check_candle_signal, identify_rejection
+from conftest import random_bars
+
+
+def test_buffer_keeps_the_last_bars_contiguous(bars):
+    buffer = BarBuffer(capacity=50)
+    for time, row in bars.iloc[:137].iterrows():
+        assert buffer.append(time, row['Open'], row['High'], row['Low'], row['Close'])
+    assert not buffer.append(bars.index[100], 1., 1., 1., 1.)  # not newer than the last bar
+    assert (len(buffer), buffer.first, buffer.count) == (50, 87, 137)
+    close = buffer['Close']
+    assert close.base is not None  # a view, not a copy
+    np.testing.assert_array_equal(close, bars['Close'].iloc[87:137])
+    frame = buffer.frame()
+    np.testing.assert_array_equal(frame.to_numpy(), bars.iloc[87:137][['Open', 'High', 'Low', 'Close']])
+    buffer.clear()
+    assert len(buffer) == 0 and buffer.count == 137
+
+
+def test_sync_appends_new_candles_and_refills_after_a_gap(bars):
+    source = FakeCandleSource(bars, cursor=100)
+    buffer = BarBuffer(capacity=60)
+    assert sync(buffer, source.grab) == 60
+    source.advance(3)
+    assert sync(buffer, source.grab) == 3
+    assert sync(buffer, source.grab) == 0
+    source.advance(40)  # more than `refresh` bars missed
+    assert sync(buffer, source.grab) == 60
+    np.testing.assert_array_equal(buffer.times, bars.index[83:143].values.astype('datetime64[ns]'))
+
+
+def test_candles_frame_matches_the_cell_loop(bars):
+    candles = FakeCandleSource(bars, cursor=50).grab(30)
+    frame = candles_frame(candles)
+    expected = cell_by_cell(candles)
+    np.testing.assert_array_equal(frame[expected.columns].to_numpy(), expected.to_numpy())
+    assert frame.index.equals(pd.DatetimeIndex(bars.index[20:50].values.astype('datetime64[ns]'), name='Date'))
+    with pytest.raises(ValueError):
+        candles_frame(candles, side='last')
+
+
+@pytest.mark.parametrize('seed, n1, n2, levelbackCandles, windowbackCandles', [(0, 5, 5, 60, 5), (1, 6, 6, 100, 7)])
+def test_streaming_signal_matches_check_candle_signal(seed, n1, n2, levelbackCandles, windowbackCandles):
+    data = random_bars(300, seed)
+    source = FakeCandleSource(data, cursor=levelbackCandles)
+    buffer = BarBuffer(capacity=levelbackCandles+n1+20)
+    engine = StreamingSignal(n1, n2, levelbackCandles, windowbackCandles)
+    signals = []
+    while source.cursor < len(data):
+        source.advance()
+        sync(buffer, source.grab, refresh=3)
+        signal = engine.update(buffer)
+        # check_candle_signal on the last row of a frame of the buffered bars
+        frame = identify_rejection(buffer.frame().reset_index(drop=True))
+        l = len(frame)-1
+        expected = 0
+        if l >= levelbackCandles+n1 and frame.rejection[l]:
+            expected = check_candle_signal(l, n1, n2, levelbackCandles, windowbackCandles, frame)
+        assert signal == expected
+        signals.append(signal)
+    assert np.count_nonzero(signals)
+
+
+def test_streaming_signal_needs_the_history():
+    with pytest.raises(ValueError):
+        StreamingSignal(5, 5, 60, 5).update(BarBuffer(capacity=50))
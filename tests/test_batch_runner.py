@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+from backtesting import Backtest
+
+from batch_runner import pack, run_batch, symbol_frame
+from conftest import random_bars
+from strategies import SmaCross
+
+FRAMES = {'AAA': random_bars(300, seed=1), 'BBB': random_bars(450, seed=2, start='2016-03-01'),
+          'CCC': random_bars(200, seed=3)}
+
+
+def test_pack_keeps_each_symbol():
+    shm, layout = pack(FRAMES)
+    try:
+        block = np.ndarray((6, sum(len(f) for f in FRAMES.values())), dtype=np.float64, buffer=shm.buf)
+        for symbol, data in FRAMES.items():
+            frame = symbol_frame(block, layout, symbol)
+            np.testing.assert_array_equal(frame.to_numpy(), data.to_numpy())
+            assert frame.index.equals(pd.DatetimeIndex(data.index))
+            del frame
+        del block  # views on the block keep its buffer exported
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def test_matches_backtest_per_symbol():
+    stats = run_batch(list(FRAMES)+['EMPTY'], SmaCross, loader=lambda symbol: FRAMES.get(symbol, FRAMES['AAA'][:0]),
+                      processes=2, params=dict(n1=10, n2=30), cash=10_000, commission=.002)
+    assert list(stats.index) == list(FRAMES)
+    for symbol, data in FRAMES.items():
+        expected = Backtest(data, SmaCross, cash=10_000, commission=.002).run(n1=10, n2=30)
+        for key in ('Equity Final [$]', 'Return [%]', '# Trades', 'Max. Drawdown [%]'):
+            assert np.isclose(stats.loc[symbol, key], expected[key]), (symbol, key)
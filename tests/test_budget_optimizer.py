@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+from backtesting import Backtest
+
+from budget_optimizer import grid_points, grid_search, model_search, score, successive_halving
+from conftest import random_bars
+from strategies import SmaCross
+
+GRID = dict(n1=range(5, 30, 5), n2=range(20, 80, 10))
+KWARGS = dict(cash=10_000, commission=.002)
+
+
+def constraint(p):
+    return p.n1 < p.n2
+
+
+@pytest.fixture(scope='module')
+def data():
+    return random_bars(700, seed=8)
+
+
+@pytest.fixture(scope='module')
+def expected(data):
+    return Backtest(data, SmaCross, **KWARGS).optimize(**GRID, maximize='Equity Final [$]', constraint=constraint,
+                                                        return_heatmap=True)
+
+
+def test_grid_points_follow_bt_optimize(expected):
+    _, heatmap = expected
+    points = grid_points(GRID, constraint)
+    assert [tuple(p.values()) for p in points] == list(heatmap.index)
+    with pytest.raises(ValueError):
+        grid_points(GRID, lambda p: False)
+
+
+def test_grid_search_matches_bt_optimize(data, expected):
+    stats = grid_search(data, SmaCross, GRID, maximize='Equity Final [$]', constraint=constraint, **KWARGS)
+    assert stats['_params'] == expected[0]._strategy._params
+    assert stats['Equity Final [$]'] == expected[0]['Equity Final [$]']
+    report = stats['_search']
+    assert report['evaluations'] == report['grid size'] == len(expected[1])
+    assert report['evaluations saved by search'] == 0
+
+
+def test_full_budget_searches_match_grid_search(data, expected):
+    one_rung = successive_halving(data, SmaCross, GRID, maximize='Equity Final [$]', rungs=1,
+                                  constraint=constraint, **KWARGS)
+    everything = model_search(data, SmaCross, GRID, maximize='Equity Final [$]', budget=1_000,
+                              random_state=0, constraint=constraint, **KWARGS)
+    for stats in (one_rung, everything):
+        assert stats['_params'] == expected[0]._strategy._params
+
+
+def test_budgeted_searches_cost_less(data, expected):
+    _, heatmap = expected
+    for stats in (successive_halving(data, SmaCross, GRID, maximize='Equity Final [$]', eta=3, rungs=3,
+                                     min_bars=100, constraint=constraint, **KWARGS),
+                  model_search(data, SmaCross, GRID, maximize='Equity Final [$]', budget=.4, random_state=1,
+                               constraint=constraint, **KWARGS)):
+        report = stats['_search']
+        assert report['full-history evaluations'] < .6*len(heatmap)
+        assert report['evaluations saved by search'] == pytest.approx(len(heatmap)-report['full-history evaluations'])
+        # the winner is a grid point scored as bt.optimize scores it
+        assert tuple(stats['_params'].values()) in heatmap.index
+        assert score(stats, 'Equity Final [$]') == heatmap[tuple(stats['_params'].values())]
+
+
+def test_score_without_trades_is_nan(data):
+    stats = Backtest(data, SmaCross, **KWARGS).run(n1=600, n2=650)
+    assert np.isnan(score(stats, 'Equity Final [$]'))
+    assert score(Backtest(data, SmaCross, **KWARGS).run(n1=5, n2=20), lambda s: 1.5) == 1.5
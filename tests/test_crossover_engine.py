@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from backtesting import Backtest
+
+from conftest import random_bars
+from crossover_engine import crossings, prepare_bars, sma_cross, sma_cross_sl
+from strategies import PercentageBasedSLStrategy, SmaCross
+
+KEYS = ['Equity Final [$]', 'Return [%]', 'Return (Ann.) [%]', 'Volatility (Ann.) [%]', 'Sharpe Ratio',
+        'Max. Drawdown [%]', '# Trades']
+
+
+def assert_same_stats(stats, expected):
+    for key in KEYS:
+        assert np.isclose(stats[key], expected[key], rtol=1e-9, equal_nan=True), key
+    np.testing.assert_allclose(stats['_equity_curve'], expected['_equity_curve']['Equity'], rtol=1e-9)
+
+
+@pytest.mark.parametrize('seed, n1, n2, commission', [(0, 10, 30, .002), (1, 5, 60, 0), (2, 20, 50, .01)])
+def test_sma_cross_matches_backtest(seed, n1, n2, commission):
+    data = random_bars(800, seed)
+    expected = Backtest(data, SmaCross, cash=10_000, commission=commission).run(n1=n1, n2=n2)
+    assert expected['# Trades'] > 5
+    assert_same_stats(sma_cross(data, n1, n2, cash=10_000, commission=commission), expected)
+
+
+@pytest.mark.parametrize('seed, n1, n2, sl_percentage', [(3, 10, 40, .01), (4, 5, 20, .03), (5, 20, 60, .05)])
+def test_sma_cross_sl_matches_backtest(seed, n1, n2, sl_percentage):
+    data = random_bars(800, seed)
+    expected = Backtest(data, PercentageBasedSLStrategy, cash=10_000, commission=.002).run(
+        n1=n1, n2=n2, sl_percentage=sl_percentage)
+    assert expected['# Trades'] > 5
+    stats = sma_cross_sl(prepare_bars(data), n1, n2, sl_percentage, cash=10_000, commission=.002)
+    assert_same_stats(stats, expected)
+
+
+def test_crossings():
+    fast = np.array([1., 3., 2., 2.5, 1., np.nan, 3.])  # touching the slow line is no cross
+    slow = np.full(7, 2.)
+    up, down = crossings(fast, slow)
+    assert list(np.flatnonzero(up)) == [1] and list(np.flatnonzero(down)) == [4]
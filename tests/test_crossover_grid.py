@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from backtesting import Backtest
+
+from conftest import random_bars
+from crossover_grid import optimize_crossover
+from strategies import PercentageBasedSLStrategy, SmaCross
+
+
+def assert_same_search(stats, heatmap, expected, expected_heatmap):
+    expected_heatmap = expected_heatmap.reindex(heatmap.index)
+    np.testing.assert_allclose(heatmap, expected_heatmap, rtol=1e-9)
+    assert stats['_params'] == expected._strategy._params
+    assert np.isclose(stats['Equity Final [$]'], expected['Equity Final [$]'], rtol=1e-9)
+    assert stats['# Trades'] == expected['# Trades']
+
+
+@pytest.mark.parametrize('maximize', ['Equity Final [$]', 'Sharpe Ratio', 'Max. Drawdown [%]'])
+def test_matches_bt_optimize(maximize):
+    data = random_bars(700, seed=6)
+    bt = Backtest(data, SmaCross, cash=10_000, commission=.002)
+    expected, expected_heatmap = bt.optimize(n1=range(5, 30, 5), n2=range(20, 80, 10), maximize=maximize,
+                                             constraint=lambda p: p.n1 < p.n2, return_heatmap=True)
+    stats, heatmap = optimize_crossover(data, range(5, 30, 5), range(20, 80, 10), maximize=maximize,
+                                        constraint=lambda p: p.n1 < p.n2, cash=10_000, commission=.002,
+                                        return_heatmap=True)
+    assert_same_search(stats, heatmap, expected, expected_heatmap)
+
+
+def test_stop_loss_grid_matches_bt_optimize():
+    data = random_bars(600, seed=7)
+    bt = Backtest(data, PercentageBasedSLStrategy, cash=10_000, commission=.002)
+    grid = dict(n1=[5, 10, 20], n2=[30, 60], sl_percentage=[.01, .05])
+    expected, expected_heatmap = bt.optimize(**grid, maximize='Equity Final [$]', return_heatmap=True)
+    stats, heatmap = optimize_crossover(data, **grid, long_only=True, min_periods=1, maximize='Equity Final [$]',
+                                        cash=10_000, commission=.002, return_heatmap=True,
+                                        max_bytes=3*12*8*len(data))  # blocks of three parameter sets
+    assert_same_search(stats, heatmap, expected, expected_heatmap)
+
+
+def test_rejects_other_stats(bars):
+    with pytest.raises(ValueError):
+        optimize_crossover(bars, [5], [20], maximize='Win Rate [%]')
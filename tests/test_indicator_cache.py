@@ -0,0 +1,81 @@
+from multiprocessing.pool import ThreadPool
+
+import backtesting
+import numpy as np
+import pandas as pd
+import pytest
+from backtesting import Backtest
+
+from conftest import random_bars
+from indicator_cache import IndicatorCache, default_cache
+from strategies import SmaCross
+
+
+def rolling_mean(values, n):
+    return pd.Series(values).rolling(n).mean().to_numpy()
+
+
+def test_hits_and_read_only_entries():
+    cache = IndicatorCache()
+    close = random_bars()['Close'].to_numpy()
+    first = cache.compute(rolling_mean, close, 20)
+    again = cache.compute(rolling_mean, close.copy(), 20)  # equal content, same key
+    assert again is first and (cache.hits, cache.misses) == (1, 1)
+    cache.compute(rolling_mean, close, 30)
+    assert cache.misses == 2
+    with pytest.raises(ValueError):
+        first[-1] = 0
+
+
+def test_evicts_least_recently_used():
+    close = random_bars()['Close'].to_numpy()
+    cache = IndicatorCache(max_bytes=2*close.nbytes)
+    for n in (10, 20, 10, 30):
+        cache.compute(rolling_mean, close, n)
+    assert len(cache) == 2 and cache.nbytes == 2*close.nbytes
+    cache.compute(rolling_mean, close, 10)
+    cache.compute(rolling_mean, close, 20)
+    assert (cache.hits, cache.misses) == (2, 4)  # 10 was kept, 20 evicted
+
+
+def test_windows_of_the_history_are_sliced():
+    cache = IndicatorCache()
+    close = random_bars()['Close'].to_numpy()
+    cache.set_history(close)
+    full = rolling_mean(close, 20)
+    for start, stop in ((100, 300), (250, 600)):
+        window = cache.compute(rolling_mean, close[start:stop], 20)
+        np.testing.assert_array_equal(window, full[start:stop])  # warmed up on the bars before
+    assert cache.misses == 1
+    cache.set_history()
+
+
+class PlainSmaCross(SmaCross):
+    def init(self):
+        self.sma1 = self.I(rolling_mean, self.data.Close, self.n1)
+        self.sma2 = self.I(rolling_mean, self.data.Close, self.n2)
+
+
+def test_cached_strategy_matches_plain_backtest(bars):
+    expected = Backtest(bars, PlainSmaCross, cash=10_000, commission=.002).run(n1=10, n2=40)
+    stats = Backtest(bars, SmaCross, cash=10_000, commission=.002).run(n1=10, n2=40)
+    misses = default_cache.misses
+    again = Backtest(bars, SmaCross, cash=10_000, commission=.002).run(n1=10, n2=40)
+    assert default_cache.misses == misses
+    for result in (stats, again):
+        assert result['Equity Final [$]'] == expected['Equity Final [$]']
+        assert result['# Trades'] == expected['# Trades']
+
+
+@pytest.mark.filterwarnings('ignore:Searching for best')
+def test_optimize_computes_each_window_once(monkeypatch):
+    # the test.py grid in one worker thread of this process, so its misses are counted here
+    monkeypatch.setattr(backtesting, 'Pool', lambda *args, **kwargs: ThreadPool(1))
+    grid = dict(n1=range(10, 51, 5), n2=range(50, 251, 5))
+    default_cache.clear()
+    try:
+        Backtest(random_bars(300), SmaCross, cash=10_000, commission=.002).optimize(**grid)
+        # 49 distinct windows instead of one SMA pair for each of the 9*41 runs
+        assert default_cache.misses == len(set(grid['n1']) | set(grid['n2'])) == 49
+    finally:
+        default_cache.clear()
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from baseline import levels
+from conftest import random_bars
+from level_book import LevelBook, joined_levels, merge_levels
+
+
+def test_merge_levels_pops_once_per_position():
+    # 100.05 is popped; 100.1 slides into its place and is not compared with 100 again
+    assert merge_levels([100., 100.05, 100.1, 101.]) == [100., 100.1, 101.]
+    assert merge_levels([]) == []
+
+
+@pytest.mark.parametrize('n1, n2, levelbackCandles', [(5, 5, 60), (8, 3, 40)])
+def test_matches_rescanned_levels(n1, n2, levelbackCandles):
+    df = random_bars(160, seed=4).reset_index(drop=True)
+    low, high = df['Low'].to_numpy(), df['High'].to_numpy()
+    book = LevelBook(n1, n2, levelbackCandles)
+    for l in range(levelbackCandles+n1, len(df)-n2):
+        assert book.update(l, low, high) == levels(df, l, n1, n2, levelbackCandles)
+
+
+def test_jumps_rebuild_the_window():
+    df = random_bars(300, seed=5).reset_index(drop=True)
+    low, high = df['Low'].to_numpy(), df['High'].to_numpy()
+    book = LevelBook(5, 5, 60)
+    for l in (100, 101, 250, 120, 121, 121):
+        assert book.update(l, low, high) == levels(df, l, 5, 5, 60)
+
+
+def test_joined_levels_sorted():
+    merged = joined_levels([99., 98.99, 95.], [101., 105., 104.99])
+    assert merged == sorted(merged)
+    assert np.isclose(merged, [95., 98.99, 101., 105.]).all()
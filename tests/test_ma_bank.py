@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import random_bars
+from ma_bank import MABank, grid_windows, sma_matrix
+
+
+@pytest.mark.parametrize('min_periods', [None, 1, 3])
+def test_matches_rolling_mean(min_periods):
+    close = np.array(random_bars(1_000, seed=4)['Close'])+1_000  # far from zero
+    close[[3, 400, 401]] = np.nan
+    windows = [3, 4, 7, 20, 200, 1_500]
+    matrix = sma_matrix(close, windows, min_periods)
+    for row, w in zip(matrix, windows):
+        expected = pd.Series(close).rolling(w, min_periods=min_periods).mean().to_numpy()
+        assert np.array_equal(np.isnan(row), np.isnan(expected))
+        np.testing.assert_allclose(row, expected, rtol=1e-12)
+
+
+def test_bank_rows_and_on_demand_windows(bars):
+    bank = MABank(bars['Close'], grid_windows(range(10, 30, 10), range(20, 60, 20)))
+    assert bank.windows == (10, 20, 40)
+    assert 20 in bank and 30 not in bank
+    np.testing.assert_allclose(bank[20], bars['Close'].rolling(20).mean(), rtol=1e-12)
+    np.testing.assert_allclose(bank.sma(30), bars['Close'].rolling(30).mean(), rtol=1e-12)
+    assert MABank(bars['Close'], [40, 10, 20]).matrix is bank.matrix  # shared through the indicator cache
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from baseline import closeResistance, closeSupport
+from nearest_level import (close_resistance, close_resistance_batch, close_support, close_support_batch,
+                           nearest_level, nearest_levels)
+
+
+def test_nearest_level_matches_min():
+    rng = np.random.default_rng(6)
+    for _ in range(500):
+        levels = sorted(np.round(rng.uniform(90, 110, rng.integers(0, 8)), 1))
+        price = round(rng.uniform(88, 112), 2)
+        expected = min(levels, key=lambda x: abs(x - price)) if levels else None
+        assert nearest_level(levels, price) == expected
+    assert nearest_level([99., 101.], 100.) == 99.  # a tie keeps the lower level
+
+
+def random_candles(n, seed):
+    rng = np.random.default_rng(seed)
+    open_ = rng.uniform(99, 101, n)
+    close = open_+rng.normal(0, .3, n)
+    return pd.DataFrame({'Open': open_, 'High': np.maximum(open_, close)+rng.exponential(.3, n),
+                         'Low': np.minimum(open_, close)-rng.exponential(.3, n), 'Close': close})
+
+
+def test_close_levels_match_the_scripts():
+    df = random_candles(300, seed=7)
+    rng = np.random.default_rng(8)
+    sets = [sorted(rng.uniform(98, 102, rng.integers(0, 6))) for _ in range(len(df))]
+    offsets = np.r_[0, np.cumsum([len(s) for s in sets])]
+    flat = np.concatenate(sets)
+    columns = [df[c].to_numpy() for c in ('High', 'Low', 'Open', 'Close')]
+    lim = df['Close'].to_numpy()*0.003
+    resistance = close_resistance_batch(flat, offsets, *columns, lim)
+    support = close_support_batch(flat, offsets, *columns, lim)
+    for l, levels in enumerate(sets):
+        candle = [c[l] for c in columns]
+        assert close_resistance(levels, *candle, lim[l]) == closeResistance(l, levels, lim[l], df) == resistance[l]
+        assert close_support(levels, *candle, lim[l]) == closeSupport(l, levels, lim[l], df) == support[l]
+    assert np.count_nonzero(resistance) and np.count_nonzero(support)
+
+
+def test_nearest_levels_stay_in_their_row():
+    levels = [1., 2., 10., 20.]
+    offsets = [0, 2, 2, 4]
+    nearest = nearest_levels(levels, offsets, [15., 15., 15.])
+    assert nearest[0] == 2. and np.isnan(nearest[1]) and nearest[2] == 10.
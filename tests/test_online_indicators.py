@@ -0,0 +1,99 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import ROOT, random_bars
+from online_indicators import (ADX, ATR, CMF, EMA, OBV, RSI, SMA, VWAP, Bollinger, RollingMax, RollingMin,
+                               WilliamsR)
+
+
+def replay(data):
+    """Every indicator fed bar by bar, as {column: array}."""
+    indicators = {'SMA': SMA(20), 'EMA': EMA(20), 'RSI': RSI(14), 'ATR': ATR(14), 'MAX': RollingMax(14),
+                  'MIN': RollingMin(14), 'WILLR': WilliamsR(14), 'ADX': ADX(14), 'BB': Bollinger(20, 2.),
+                  'VWAP': VWAP('W'), 'OBV': OBV(), 'CMF': CMF(20)}
+    columns = {}
+
+    def add(name, value):
+        columns.setdefault(name, []).append(value)
+
+    for t, h, l, c, v in zip(data.index, data.High.to_numpy(), data.Low.to_numpy(), data.Close.to_numpy(),
+                             data.Volume.to_numpy(dtype=float)):
+        add('SMA', indicators['SMA'].update(c))
+        add('EMA', indicators['EMA'].update(c))
+        add('RSI', indicators['RSI'].update(c))
+        add('ATR', indicators['ATR'].update(h, l, c))
+        add('MAX', indicators['MAX'].update(h))
+        add('MIN', indicators['MIN'].update(l))
+        add('WILLR', indicators['WILLR'].update(h, l, c))
+        for name, value in zip(('ADX', 'DMP', 'DMN'), indicators['ADX'].update(h, l, c)):
+            add(name, value)
+        for name, value in zip(('BBL', 'BBM', 'BBU', 'BBB', 'BBP'), indicators['BB'].update(c)):
+            add(name, value)
+        add('VWAP', indicators['VWAP'].update(t, h, l, c, v))
+        add('OBV', indicators['OBV'].update(c, v))
+        add('CMF', indicators['CMF'].update(h, l, c, v))
+    return {name: np.array(values) for name, values in columns.items()}
+
+
+def assert_same(online, batch, rtol=1e-9):
+    for name, expected in batch.items():
+        expected = np.asarray(expected, dtype=np.float64)
+        np.testing.assert_array_equal(np.isnan(online[name]), np.isnan(expected), err_msg=f'{name} NaNs')
+        # relative to the column's scale, so values crossing zero compare sensibly
+        np.testing.assert_allclose(online[name], expected, rtol=0, atol=rtol*np.nanmax(np.abs(expected)),
+                                   equal_nan=True, err_msg=name)
+
+
+def test_matches_pandas_ta_on_nvda():
+    ta = pytest.importorskip('pandas_ta', reason='the batch reference is pandas_ta')
+    data = pd.read_csv(os.path.join(ROOT, 'NVDA.csv'), index_col=0, parse_dates=True)
+    H, L, C, V = data.High, data.Low, data.Close, data.Volume.astype(float)
+    adx, bands = ta.adx(H, L, C, length=14), ta.bbands(C, length=20, std=2)
+    assert_same(replay(data), {
+        'SMA': ta.sma(C, 20), 'EMA': ta.ema(C, 20), 'RSI': ta.rsi(C, 14), 'ATR': ta.atr(H, L, C, 14),
+        'WILLR': ta.willr(H, L, C, 14),
+        'ADX': adx.filter(like='ADX_').iloc[:, 0], 'DMP': adx.filter(like='DMP_').iloc[:, 0],
+        'DMN': adx.filter(like='DMN_').iloc[:, 0],
+        'BBL': bands.filter(like='BBL_').iloc[:, 0], 'BBM': bands.filter(like='BBM_').iloc[:, 0],
+        'BBU': bands.filter(like='BBU_').iloc[:, 0], 'BBB': bands.filter(like='BBB_').iloc[:, 0],
+        'BBP': bands.filter(like='BBP_').iloc[:, 0],
+        'VWAP': ta.vwap(H, L, C, V, anchor='W'), 'OBV': ta.obv(C, V), 'CMF': ta.cmf(H, L, C, V, length=20),
+    })
+
+
+def test_matches_pandas_rolling_windows():
+    # the indicators that are plain pandas rolling / ewm computations
+    data = random_bars(n=2_000)
+    C = data.Close
+    seeded = C.copy()
+    seeded.iloc[:19] = np.nan
+    seeded.iloc[19] = C.iloc[:20].mean()
+    mid, deviation = C.rolling(20).mean(), C.rolling(20).std(ddof=0)
+    assert_same(replay(data), {
+        'SMA': C.rolling(20).mean(), 'EMA': seeded.ewm(span=20, adjust=False).mean(),
+        'MAX': data.High.rolling(14).max(), 'MIN': data.Low.rolling(14).min(),
+        'BBL': mid-2*deviation, 'BBM': mid, 'BBU': mid+2*deviation,
+    })
+
+
+def test_updates_keep_their_accuracy_over_a_long_session():
+    # the running sums are re-added once per window, so error does not build up
+    x = 1e4+np.cumsum(np.random.default_rng(1).normal(0, 1, 200_000))
+    sma, bands = SMA(50), Bollinger(50)
+    for value in x:
+        sma.update(value)
+        bands.update(value)
+    np.testing.assert_allclose(sma.value, x[-50:].mean(), rtol=1e-12)
+    np.testing.assert_allclose(bands.value.upper-bands.value.mid, 2*x[-50:].std(), rtol=1e-9)
+
+
+def test_flat_prices_are_undefined_not_errors():
+    adx, willr, rsi = ADX(3), WilliamsR(3), RSI(3)
+    for _ in range(10):
+        adx.update(5., 5., 5.)
+        willr.update(5., 5., 5.)
+        rsi.update(5.)
+    assert np.isnan(adx.value.adx) and np.isnan(willr.value) and np.isnan(rsi.value)
@@ -0,0 +1,63 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from order_gateway import ConnectionPool, LatencyHistogram, OrderError, OrderGateway, V20Stub, order_body
+from trading_loop import Order
+
+TOKEN, ACCOUNT = 'stub-token', '101-001-0000000-001'
+
+
+def orders(n=40):
+    rng = np.random.default_rng(0)
+    return [Order(instrument, int(rng.choice([-1, 1])), 100+rng.normal(), 100+rng.normal())
+            for _ in range(n//4) for instrument in ('NVDA', 'EUR_USD', 'GBP_USD', 'XAU_USD')]
+
+
+def test_order_body():
+    body = order_body(Order('EUR_USD', -1000, 1.0712345678, 1.0923456789))['order']
+    assert body['type'] == 'MARKET' and body['units'] == '-1000'
+    assert body['takeProfitOnFill']['price'] == '1.07123'
+    assert body['stopLossOnFill']['price'] == '1.09235'
+
+
+def test_gateway_reuses_connections():
+    batch = orders()
+    with V20Stub(TOKEN, latency=.01) as stub:
+        gateway = OrderGateway(TOKEN, ACCOUNT, base_url=stub.url, connections=4)
+        try:
+            responses = gateway.send_all(batch)
+            asyncio.run(gateway.submit(batch[0]))
+        finally:
+            gateway.close()
+    assert all('orderFillTransaction' in r for r in responses)
+    assert sorted(o['units'] for o in stub.orders) == sorted(str(o.units) for o in batch+batch[:1])
+    assert stub.connections == gateway.pool.opened <= 4
+    assert len(gateway.latency['all']) == len(batch)+1 and len(gateway.latency['NVDA']) == len(batch)//4+1
+
+
+def test_rejections_raise_order_errors():
+    with V20Stub(TOKEN) as stub:
+        gateway = OrderGateway('wrong-token', ACCOUNT, base_url=stub.url)
+        try:
+            with pytest.raises(OrderError) as error:
+                gateway.send(orders()[0])
+            assert error.value.code == 401
+            assert isinstance(gateway.send_all(orders(4))[0], OrderError)
+        finally:
+            gateway.close()
+        pool = ConnectionPool(stub.url)
+        status, body = pool.request('POST', f'/v3/accounts/{ACCOUNT}/orders', {}, {'Authorization': f'Bearer {TOKEN}'})
+        pool.close()
+    assert status == 400 and 'order' in body['errorMessage']
+
+
+def test_latency_histogram_quantiles():
+    histogram = LatencyHistogram()
+    assert np.isnan(histogram.quantile(.5))
+    for ms in range(1, 1001):
+        histogram.record(ms/1000)
+    assert len(histogram) == 1000 and histogram.max == 1000
+    for q in (.5, .9, .99):
+        assert histogram.quantile(q) == pytest.approx(1000*q, rel=.13)  # within a bucket's width
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from baseline import resistance, support
+from conftest import random_bars
+from pivots import identify_pivots, pivot_highs, pivot_lows, rolling_max, rolling_min
+
+
+@pytest.mark.parametrize('n1, n2', [(5, 5), (8, 3), (0, 6), (6, 0), (1, 1)])
+def test_matches_support_and_resistance(n1, n2):
+    df = random_bars(400, seed=2).reset_index(drop=True)
+    rows = range(n1, len(df))  # including the last bars, whose right-hand window is cut short
+    lows, highs = pivot_lows(df['Low'], n1, n2), pivot_highs(df['High'], n1, n2)
+    assert [bool(lows[l]) for l in rows] == [bool(support(df, l, n1, n2)) for l in rows]
+    assert [bool(highs[l]) for l in rows] == [bool(resistance(df, l, n1, n2)) for l in rows]
+
+
+@pytest.mark.parametrize('window', [1, 3, 7, 50])
+def test_rolling_extremes_match_pandas(window):
+    values = np.array(random_bars(300, seed=3)['Close'])
+    values[[10, 11, 120]] = np.nan
+    series = pd.Series(values).rolling(window, min_periods=1)
+    expected_min, expected_max = np.array(series.min()), np.array(series.max())
+    expected_min[:window-1] = expected_max[:window-1] = np.nan
+    np.testing.assert_array_equal(rolling_min(values, window), expected_min)
+    np.testing.assert_array_equal(rolling_max(values, window), expected_max)
+
+
+def test_identify_pivots_adds_columns(bars):
+    data = identify_pivots(bars.copy(), 4, 4)
+    assert data['pivot_low'].dtype == bool and data['pivot_low'].any()
+    assert np.array_equal(data['pivot_high'], pivot_highs(bars['High'], 4, 4))
@@ -0,0 +1,26 @@
+import numpy as np
+
+from baseline import identify_rejection as rowwise_rejection
+from conftest import random_bars
+from rejection import identify_rejection, rejection_signal
+
+
+def test_matches_rowwise_rejection():
+    data = random_bars(2_000, seed=1)
+    expected = rowwise_rejection(data.copy())['rejection'].to_numpy()
+    signal = rejection_signal(data['Open'], data['High'], data['Low'], data['Close'])
+    assert signal.dtype == np.int8
+    assert np.array_equal(signal, expected)
+    assert set(np.unique(signal)) == {0, 1, 2}
+
+
+def test_identify_rejection_adds_column(bars):
+    data = identify_rejection(bars.copy())
+    assert np.array_equal(data['rejection'], rowwise_rejection(bars.copy())['rejection'])
+
+
+def test_single_candles():
+    assert rejection_signal([100.], [100.6], [98.], [100.5])[0] == 2  # long lower wick
+    assert rejection_signal([100.5], [102.], [99.9], [100.])[0] == 1  # long upper wick
+    assert rejection_signal([100.], [103.], [97.], [100.5])[0] == 0  # both wicks long
+    assert rejection_signal([100.], [100.2], [99.], [100.05])[0] == 0  # body below 0.1% of the open
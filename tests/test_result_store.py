@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+from backtesting import Backtest
+
+from budget_optimizer import successive_halving
+from conftest import random_bars
+from result_store import ResultStore, optimize
+from strategies import SmaCross
+
+GRID = dict(n1=range(5, 30, 5), n2=range(20, 80, 10))
+KWARGS = dict(cash=10_000, commission=.002)
+
+
+def constraint(p):
+    return p.n1 < p.n2
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultStore(str(tmp_path / 'results.sqlite'))
+    yield store
+    store.close()
+
+
+def test_matches_bt_optimize_and_resumes(store):
+    data = random_bars(600, seed=10)
+    expected, expected_heatmap = Backtest(data, SmaCross, **KWARGS).optimize(
+        **GRID, maximize='Equity Final [$]', constraint=constraint, return_heatmap=True)
+
+    # half the grid first, as an interrupted sweep leaves it
+    optimize(data, SmaCross, dict(GRID, n1=range(5, 15, 5)), maximize='Equity Final [$]', constraint=constraint,
+             store=store, processes=2, **KWARGS)
+    stats, heatmap = optimize(data, SmaCross, GRID, maximize='Equity Final [$]', constraint=constraint,
+                              store=store, processes=2, return_heatmap=True, **KWARGS)
+    np.testing.assert_allclose(heatmap, expected_heatmap.reindex(heatmap.index))
+    assert stats['_params'] == expected._strategy._params
+    assert stats['_search']['reused'] == 12 and stats['_search']['evaluations'] == len(heatmap)-12
+
+
+def test_keys_separate_data_and_settings(store, bars):
+    run = store.run_key(SmaCross, bars, KWARGS)
+    assert run == store.run_key(SmaCross, bars.copy(), dict(KWARGS))
+    assert run != store.run_key(SmaCross, bars.iloc[:-1], KWARGS)
+    assert run != store.run_key(SmaCross, bars, dict(KWARGS, commission=.001))
+    stats = Backtest(bars, SmaCross, **KWARGS).run(n1=10, n2=30)
+    store.put(run, {'n1': 10, 'n2': 30}, stats)
+    stored = store.get(run, {'n1': 10, 'n2': 30})
+    assert stored['Equity Final [$]'] == stats['Equity Final [$]'] and '_trades' not in stored
+    assert store.get(run, {'n1': 10, 'n2': 40}) is None
+    assert list(store.results(SmaCross, bars, **KWARGS)[['n1', 'n2']].iloc[0]) == [10, 30]
+
+
+def test_budgeted_search_reuses_the_store(store):
+    data = random_bars(600, seed=11)
+    optimize(data, SmaCross, GRID, maximize='Equity Final [$]', constraint=constraint, store=store, **KWARGS)
+    stats = successive_halving(data, SmaCross, GRID, maximize='Equity Final [$]', rungs=1,
+                               constraint=constraint, store=store, **KWARGS)
+    report = stats['_search']
+    assert report['evaluations'] == 0 and report['reused'] == report['grid size']
+    assert report['evaluations saved by search'] == 0  # store hits are not savings of the search
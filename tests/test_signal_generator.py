@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from baseline import signal_column, window_signal_column
+from conftest import random_bars
+from signal_generator import generate_signals, generate_window_signals
+
+
+@pytest.mark.parametrize('seed, n1, n2, levelbackCandles, windowbackCandles',
+                         [(0, 5, 5, 60, 5), (1, 8, 8, 60, 8), (2, 3, 6, 40, 10)])
+def test_matches_check_candle_signal(seed, n1, n2, levelbackCandles, windowbackCandles):
+    data = random_bars(400, seed)
+    expected = signal_column(data, n1, n2, levelbackCandles, windowbackCandles)
+    signal = generate_signals(data, n1, n2, levelbackCandles, windowbackCandles)
+    assert signal.dtype == np.int8
+    assert signal.tolist() == expected
+    assert np.count_nonzero(signal)
+
+
+def test_chunks_do_not_change_the_result():
+    data = random_bars(1_000, seed=3)
+    expected = generate_signals(data, 5, 5, 60, 5)
+    assert np.array_equal(generate_signals(data, 5, 5, 60, 5, chunk_size=7), expected)
+
+
+def test_too_little_history():
+    data = random_bars(50)
+    assert not generate_signals(data, 5, 5, 60, 5).any()
+    assert len(generate_signals(data, 5, 5, 60, 5)) == 50
+
+
+@pytest.mark.parametrize('seed, n1, n2, levelbackCandles, windowbackCandles',
+                         [(0, 5, 5, 100, 5), (1, 6, 6, 60, 7), (2, 4, 4, 40, 3)])
+def test_window_signals_match_the_copied_windows(seed, n1, n2, levelbackCandles, windowbackCandles):
+    data = random_bars(400, seed)
+    expected = window_signal_column(data, n1, n2, levelbackCandles, windowbackCandles)
+    signal = generate_window_signals(data, n1, n2, levelbackCandles, windowbackCandles)
+    assert signal.tolist() == expected
+    assert np.count_nonzero(signal)
@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+
+import signal_kernel
+from conftest import random_bars
+from signal_generator import generate_signals
+from signal_kernel import compute_signals, sweep_signals
+
+GRID = [(5, 5, 60, 5), (8, 8, 60, 8), (3, 6, 40, 10)]
+
+
+@pytest.mark.parametrize('params', GRID)
+def test_kernel_matches_generate_signals(params):
+    # the kernel's Python source, compiled or not, must give the NumPy version's column
+    data = random_bars(500, seed=sum(params))
+    columns = [np.ascontiguousarray(data[c], dtype=np.float64) for c in ('Open', 'High', 'Low', 'Close')]
+    expected = generate_signals(data, *params)
+    assert np.count_nonzero(expected)
+    assert np.array_equal(signal_kernel._sr_kernel(*columns, *params, 0.001), expected)
+    assert np.array_equal(compute_signals(data, *params), expected)
+
+
+def test_sweep_signals(bars):
+    signals = sweep_signals(bars, GRID)
+    assert list(signals) == GRID
+    for params, signal in signals.items():
+        assert np.array_equal(signal, generate_signals(bars, *params))
@@ -0,0 +1,73 @@
+import asyncio
+import threading
+
+import numpy as np
+
+from bar_stream import BarBuffer, FakeCandleSource, StreamingSignal, sync
+from conftest import random_bars
+from trading_loop import Instrument, MockBroker, Order, TradingLoop, bracket
+
+
+def test_bracket():
+    bars = {'Close': np.array([100.]), 'High': np.array([101.]), 'Low': np.array([98.])}
+    assert bracket('X', bars, 1) == Order('X', -1, 98., 101.)
+    assert bracket('X', bars, 2, units=5) == Order('X', 5, 104., 98.)
+    assert bracket('X', bars, 0) is None
+
+
+def replay(loop, sources, ticks):
+    async def run():
+        for _ in range(ticks):
+            await loop.tick()
+            for source in sources:
+                source.advance()
+    asyncio.run(run())
+
+
+def test_orders_match_each_instrument_alone():
+    data = {f'SYN{i}': random_bars(450, seed=i) for i in range(4)}
+    sources = {name: FakeCandleSource(frame, cursor=220) for name, frame in data.items()}
+    broker = MockBroker()
+    loop = TradingLoop([Instrument(name, source.grab) for name, source in sources.items()], broker)
+    try:
+        replay(loop, sources.values(), 230)
+    finally:
+        loop.close()
+
+    expected = []
+    for name, frame in data.items():
+        source = FakeCandleSource(frame, cursor=220)
+        bars, engine = BarBuffer(256), StreamingSignal(6, 6, 200, 7)
+        for _ in range(230):
+            if sync(bars, source.grab):
+                order = bracket(name, bars, engine.update(bars))
+                if order is not None:
+                    expected.append(order)
+            source.advance()
+    assert expected
+    assert sorted(broker.orders) == sorted(expected)
+
+
+def test_slow_instrument_is_left_out():
+    fast = FakeCandleSource(random_bars(300, seed=5), cursor=256)
+    slow = FakeCandleSource(random_bars(300, seed=6), cursor=256)
+    release = threading.Event()
+
+    def hanging(n):
+        release.wait(5)
+        return slow.grab(n)
+
+    loop = TradingLoop([Instrument('FAST', fast.grab), Instrument('SLOW', hanging)], MockBroker(), timeout=.1)
+    try:
+        async def ticks():
+            first = await loop.tick()
+            second = await loop.tick()  # SLOW is still busy with the first tick
+            release.set()
+            await asyncio.sleep(.1)
+            return first, second, await loop.tick()
+        first, second, third = asyncio.run(ticks())
+    finally:
+        loop.close()
+    assert set(first) == {'FAST', 'SLOW'} and first['SLOW'] is None
+    assert set(second) == {'FAST'}
+    assert set(third) == {'FAST', 'SLOW'}
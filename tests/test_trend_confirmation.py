@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+from baseline import check_candles, determine_trend, generate_trend_signal
+from trend_confirmation import adx_signal, confirm_trend, confirmed_signal, ma_alignment
+
+
+def symbol_frame(n, seed):
+    # 15m closes with SMAs, a daily VWAP and an ADX that swings around the threshold
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({'Close': 100+np.cumsum(rng.normal(0, .3, n)),
+                          'Volume': rng.integers(1_000, 10_000, n).astype(np.float64)})
+    for length in (9, 21, 50):
+        frame[f'SMA_{length}'] = frame['Close'].rolling(length).mean()
+    day = np.arange(n)//26
+    frame['VWAP_D'] = (frame['Close']*frame['Volume']).groupby(day).cumsum()/frame['Volume'].groupby(day).cumsum()
+    frame['ADX'] = 35+20*np.sin(np.arange(n)/(15+seed))+rng.normal(0, 5, n)
+    frame['DMP'] = rng.uniform(5, 40, n)
+    frame['DMN'] = rng.uniform(5, 40, n)
+    return frame
+
+
+def trend_detection(frame):
+    # the columns trend_detection.py adds row by row
+    frame = frame.copy()
+    frame['Trend'] = frame.apply(determine_trend, axis=1)
+    frame['Category'] = check_candles(frame, 5, 'VWAP_D')
+    frame['Trend Signal'] = generate_trend_signal(frame)
+    frame['Confirmed Signal'] = frame.apply(
+        lambda row: row['Category'] if row['Category'] == row['Trend Signal'] else 0, axis=1)
+    return frame
+
+
+def test_matches_trend_detection():
+    frames = [symbol_frame(400, seed) for seed in range(4)]
+    columns = {name: np.array([f[name] for f in frames])
+               for name in ('Close', 'SMA_9', 'SMA_21', 'SMA_50', 'VWAP_D', 'ADX', 'DMP', 'DMN')}
+    trend = ma_alignment(columns['SMA_9'], columns['SMA_21'], columns['SMA_50'])
+    signal = adx_signal(columns['ADX'], columns['DMP'], columns['DMN'])
+    confirmed = confirm_trend(columns['Close'], columns['VWAP_D'], columns['ADX'], columns['DMP'], columns['DMN'])
+    for k, frame in enumerate(frames):
+        expected = trend_detection(frame)
+        assert trend[k].tolist() == expected['Trend'].tolist()
+        assert signal[k].tolist() == expected['Trend Signal'].tolist()
+        assert confirmed[k].tolist() == expected['Confirmed Signal'].tolist()
+    assert np.count_nonzero(confirmed)
+
+
+def test_averages_must_agree_as_well():
+    frame = symbol_frame(400, seed=5)
+    both = confirm_trend(frame['Close'], frame['VWAP_D'], frame['ADX'], frame['DMP'], frame['DMN'],
+                         averages=(frame['SMA_9'], frame['SMA_21'], frame['SMA_50']))
+    expected = trend_detection(frame)
+    agree = (expected['Confirmed Signal'] == expected['Trend']).to_numpy()
+    assert both.tolist() == np.where(agree, expected['Confirmed Signal'], 0).tolist()
+
+
+def test_confirmed_signal():
+    assert confirmed_signal([2, 1, 0, 2], [2, 2, 0, 2], [2, 1, 1, 0]).tolist() == [2, 0, 0, 0]
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from baseline import check_candles
+from conftest import random_bars
+from trend_filters import candle_categories, rolling_slope, slope_matrix
+
+
+def polyfit_slope(series, period):
+    # calculate_slope of trend_detection.py, per bar
+    slopes = [np.nan]*(period-1)
+    for i in range(period-1, len(series)):
+        y = series[i-period+1:i+1]
+        slopes.append(np.polyfit(np.arange(period), y, 1)[0]/y[0]*100 if not np.isnan(y).any() else np.nan)
+    return np.array(slopes)
+
+
+def test_slopes_match_polyfit():
+    sma = random_bars(500, seed=12)['Close'].rolling(20).mean().to_numpy()
+    periods = [2, 3, 5, 10, 20, 50, 600]
+    matrix = slope_matrix(sma, periods)
+    for row, p in zip(matrix, periods):
+        expected = polyfit_slope(sma, p) if p <= len(sma) else np.full(len(sma), np.nan)
+        assert np.array_equal(np.isnan(row), np.isnan(expected))
+        np.testing.assert_allclose(row, expected, rtol=1e-7, atol=1e-10)
+    with pytest.raises(ValueError):
+        slope_matrix(sma, [1])
+
+
+def test_slopes_stay_accurate_on_long_series():
+    close = 1_000+np.cumsum(np.random.default_rng(0).normal(0, 1, 200_000))
+    slopes = rolling_slope(close, 10)
+    expected = polyfit_slope(close[-1_000:], 10)
+    np.testing.assert_allclose(slopes[-991:], expected[9:], rtol=0, atol=1e-5)  # percentage points
+
+
+def intraday_vwap(n, seed):
+    # 15m bars with a daily-anchored VWAP, NaN for its first bars
+    rng = np.random.default_rng(seed)
+    index = pd.date_range('2024-01-02 09:30', periods=n, freq='15min')
+    close = 100+np.cumsum(rng.normal(0, .2, n))
+    volume = rng.integers(1_000, 10_000, n)
+    day = index.normalize()
+    vwap = (pd.Series(close*volume, index=index).groupby(day).cumsum()
+            / pd.Series(volume, index=index).groupby(day).cumsum())
+    vwap.iloc[:3] = np.nan
+    return pd.DataFrame({'Close': close, 'VWAP_D': vwap}, index=index)
+
+
+@pytest.mark.parametrize('backcandles', [1, 5, 20, 600])
+def test_categories_match_check_candles(backcandles):
+    data = intraday_vwap(600, seed=13)
+    categories = candle_categories(data['Close'], data['VWAP_D'], backcandles)
+    assert categories.dtype == np.int8
+    assert categories.tolist() == check_candles(data, backcandles, 'VWAP_D')
+
+
+def test_categories_row_by_row():
+    frames = [intraday_vwap(300, seed) for seed in range(3)]
+    close = np.array([f['Close'] for f in frames])
+    vwap = np.array([f['VWAP_D'] for f in frames])
+    categories = candle_categories(close, vwap, 5)
+    for row, frame in zip(categories, frames):
+        assert row.tolist() == check_candles(frame, 5, 'VWAP_D')
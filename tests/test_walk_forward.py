@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+from backtesting import Backtest
+
+from conftest import random_bars
+from indicator_cache import default_cache
+from strategies import SMA, SmaCross
+from walk_forward import fold_bounds, walk_forward
+
+GRID = dict(n1=[5, 10, 20], n2=[30, 50])
+KWARGS = dict(cash=10_000, commission=.002)
+
+
+class LambdaSmaCross(SmaCross):
+    # indicators that are not in the indicator cache
+    def init(self):
+        self.sma1 = self.I(lambda close: pd.Series(close).rolling(self.n1).mean(), self.data.Close)
+        self.sma2 = self.I(lambda close: pd.Series(close).rolling(self.n2).mean(), self.data.Close)
+
+
+def test_fold_bounds():
+    assert fold_bounds(10, 4, 3) == [(0, 4, 7), (3, 7, 10)]
+    assert fold_bounds(11, 4, 3, anchored=True) == [(0, 4, 7), (0, 7, 10), (0, 10, 11)]
+    with pytest.raises(ValueError):
+        fold_bounds(10, 10, 3)
+
+
+@pytest.fixture(scope='module')
+def data():
+    return random_bars(700, seed=9)
+
+
+@pytest.fixture(scope='module')
+def serial(data):
+    return walk_forward(data, LambdaSmaCross, GRID, train=300, test=100, maximize='Equity Final [$]',
+                        processes=1, **KWARGS)
+
+
+def test_folds_fit_on_their_training_window(data, serial):
+    assert len(serial.folds) == 4
+    for fold in serial.folds.itertuples():
+        train = data.loc[fold[1]:fold[2]].iloc[:-1]
+        best = Backtest(train, SmaCross, **KWARGS).optimize(**GRID, maximize='Equity Final [$]')
+        assert fold.Params == best._strategy._params
+
+
+def test_test_windows_trade_warmed_up(data, serial):
+    # without warm-up bars the SMAs of each window start with up to 50 NaNs
+    cold = walk_forward(data, LambdaSmaCross, GRID, train=300, test=100, maximize='Equity Final [$]',
+                        warmup=0, processes=1, **KWARGS)
+    assert (serial.folds['# Trades'] > 0).all()
+    assert serial.folds['# Trades'].sum() > cold.folds['# Trades'].sum()
+
+
+def test_equity_chains_the_windows(data, serial):
+    assert serial.equity.index.equals(data.index[300:])
+    returns = serial.folds['Return [%]'].to_numpy()/100+1
+    assert np.isclose(serial.equity.iloc[-1], KWARGS['cash']*returns.prod())
+    ends = [data.index.get_loc(end) for end in serial.folds['Test End']]
+    np.testing.assert_allclose(serial.equity.iloc[np.subtract(ends, 300)], KWARGS['cash']*returns.cumprod())
+
+
+def test_process_pool_gives_the_same_result(data, serial):
+    pooled = walk_forward(data, LambdaSmaCross, GRID, train=300, test=100, maximize='Equity Final [$]',
+                          processes=2, **KWARGS)
+    pd.testing.assert_frame_equal(pooled.folds, serial.folds)
+    pd.testing.assert_series_equal(pooled.equity, serial.equity)
+
+
+def test_serial_run_leaves_no_history(data, serial):
+    # a later backtest on a window of the data gets indicators of its own bars
+    window = data['Close'].to_numpy()[100:200]
+    np.testing.assert_array_equal(SMA(window, 20), pd.Series(window).rolling(20).mean().to_numpy())
+
+
+def test_folds_share_the_cached_indicators(data):
+    # every fold slices its SMAs out of one computation over the full history
+    default_cache.clear()
+    try:
+        walk_forward(data, SmaCross, GRID, train=300, test=100, maximize='Equity Final [$]',
+                     processes=1, **KWARGS)
+        assert default_cache.misses == len(set(GRID['n1']) | set(GRID['n2']))
+    finally:
+        default_cache.clear()
+        default_cache.set_history()
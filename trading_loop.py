@@ -0,0 +1,160 @@
+import asyncio
+import datetime
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from zoneinfo import ZoneInfo
+
+from bar_stream import BarBuffer, StreamingSignal, sync
+
+Order = namedtuple('Order', ['instrument', 'units', 'take_profit', 'stop_loss'])
+
+
+def bracket(instrument, bars, signal, units=1, sltp_ratio=2.):
+    """Bracket market order for `signal` on the last bar, or None.
+
+    Sell (1): stop-loss at the candle's high; buy (2): at its low. The
+    take-profit is `sltp_ratio` times as far from the close on the other side.
+    """
+    close = bars['Close'][-1]
+    if signal == 1:
+        stop_loss = bars['High'][-1]
+        return Order(instrument, -units, close-(stop_loss-close)*sltp_ratio, stop_loss)
+    if signal == 2:
+        stop_loss = bars['Low'][-1]
+        return Order(instrument, units, close+(close-stop_loss)*sltp_ratio, stop_loss)
+    return None
+
+
+class Instrument:
+    """One traded instrument: its candle source, bar buffer and signal engine.
+
+    `grab(n)` returns the last n closed candles (an oanda_candles collector's
+    grab, or FakeCandleSource.grab).
+    """
+
+    def __init__(self, name, grab, units=1, capacity=256, n1=6, n2=6, levelbackCandles=200, windowbackCandles=7):
+        self.name = name
+        self.grab = grab
+        self.units = units
+        self.bars = BarBuffer(capacity)
+        self.engine = StreamingSignal(n1, n2, levelbackCandles, windowbackCandles)
+        self.busy = False  # still working on an earlier tick
+
+
+class MockBroker:
+    """Local stand-in for the OANDA order endpoint.
+
+    Records every order after `latency` seconds and answers with a fill
+    transaction shaped like the v20 response, so the loop can be run and
+    tested without an account.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.orders = []
+
+    async def submit(self, order):
+        await asyncio.sleep(self.latency)
+        self.orders.append(order)
+        return {'orderFillTransaction': {'id': str(len(self.orders)), 'instrument': order.instrument,
+                                         'units': str(order.units)}}
+
+
+class OandaBroker:
+    """Market orders with take-profit and stop-loss through oandapyV20, off the event loop.
+
+    Each client.request runs in `executor`, or the event loop's default
+    thread pool if None, so the submissions of several instruments overlap.
+    """
+
+    def __init__(self, access_token, account_id, executor=None):
+        from oandapyV20 import API
+        self.client = API(access_token)
+        self.account_id = account_id
+        self.executor = executor
+
+    async def submit(self, order):
+        import oandapyV20.endpoints.orders as orders
+        from oandapyV20.contrib.requests import MarketOrderRequest, TakeProfitDetails, StopLossDetails
+
+        mo = MarketOrderRequest(instrument=order.instrument, units=order.units,
+                                takeProfitOnFill=TakeProfitDetails(price=order.take_profit).data,
+                                stopLossOnFill=StopLossDetails(price=order.stop_loss).data)
+        request = orders.OrderCreate(self.account_id, data=mo.data)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self.client.request, request)
+
+
+class TradingLoop:
+    """The daily candle-signal-order job for many instruments at once on an asyncio event loop.
+
+    Fetches run in an I/O thread pool, signal updates in a pool of their own
+    and orders in the broker's; an instrument not done within `timeout`
+    seconds is left out of the tick instead of holding up the others.
+    """
+
+    def __init__(self, instruments, broker, timeout=60., io_workers=None, signal_workers=None):
+        self.instruments = list(instruments)
+        self.broker = broker
+        self.timeout = timeout
+        self.io = ThreadPoolExecutor(io_workers or 2*len(self.instruments))
+        self.signals = ThreadPoolExecutor(signal_workers or os.cpu_count())
+
+    def close(self):
+        self.io.shutdown(wait=False)
+        self.signals.shutdown(wait=False)
+
+    async def _job(self, instrument):
+        loop = asyncio.get_running_loop()
+        instrument.busy = True
+        try:
+            if not await loop.run_in_executor(self.io, sync, instrument.bars, instrument.grab):
+                return None  # no candle closed since the last tick
+            signal = await loop.run_in_executor(self.signals, instrument.engine.update, instrument.bars)
+            order = bracket(instrument.name, instrument.bars, signal, instrument.units)
+            if order is not None:
+                response = await self.broker.submit(order)
+                print(order, response)
+            return order
+        finally:
+            instrument.busy = False
+
+    async def _guarded(self, instrument):
+        task = asyncio.ensure_future(self._job(instrument))
+        try:
+            # shield: on a timeout the job finishes in the background, the tick moves on
+            return await asyncio.wait_for(asyncio.shield(task), self.timeout)
+        except asyncio.TimeoutError:
+            print(f"{instrument.name}: no result within {self.timeout} s, left out of this tick")
+            return None
+
+    async def tick(self):
+        """One round over all instruments; returns {name: submitted Order or None}."""
+        ready = [instrument for instrument in self.instruments if not instrument.busy]
+        for instrument in self.instruments:
+            if instrument.busy:
+                print(f"{instrument.name}: still busy with an earlier tick, skipped")
+        results = await asyncio.gather(*(self._guarded(instrument) for instrument in ready),
+                                       return_exceptions=True)
+        orders = {}
+        for instrument, result in zip(ready, results):
+            if isinstance(result, Exception):
+                print(f"{instrument.name}: {result!r}")
+                result = None
+            orders[instrument.name] = result
+        return orders
+
+    async def run(self, at='23:55', tz='America/New_York', ticks=None):
+        """Runs tick() every day at `at` (local time of `tz`), `ticks` times or forever."""
+        hour, minute = map(int, at.split(':'))
+        zone = ZoneInfo(tz)
+        done = 0
+        while ticks is None or done < ticks:
+            now = datetime.datetime.now(zone)
+            due = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+            if due <= now:
+                due += datetime.timedelta(days=1)
+            await asyncio.sleep((due-now).total_seconds())
+            await self.tick()
+            done += 1
+
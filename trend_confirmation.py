@@ -0,0 +1,45 @@
+import numpy as np
+
+from trend_filters import candle_categories
+
+# trend codes shared by all signals, as in trend_detection.py
+NO_TREND, DOWNTREND, UPTREND = 0, 1, 2
+
+
+def ma_alignment(fast, mid, slow):
+    """determine_trend for every bar: 2 where fast > mid > slow, 1 where fast < mid < slow, else 0 (int8).
+
+    Bars where an average is NaN (still warming up) are 0.
+    """
+    fast, mid, slow = (np.asarray(a, dtype=np.float64) for a in (fast, mid, slow))
+    return np.select([(fast > mid) & (mid > slow), (fast < mid) & (mid < slow)],
+                     [UPTREND, DOWNTREND], NO_TREND).astype(np.int8)
+
+
+def adx_signal(adx, dmp, dmn, threshold=40):
+    """generate_trend_signal for every bar: where ADX > threshold, 2 if DMP > DMN else 1; 0 elsewhere (int8)."""
+    adx, dmp, dmn = (np.asarray(a, dtype=np.float64) for a in (adx, dmp, dmn))
+    strong = adx > threshold
+    return np.select([strong & (dmp > dmn), strong], [UPTREND, DOWNTREND], NO_TREND).astype(np.int8)
+
+
+def confirmed_signal(*signals):
+    """The common value of the signals where they all agree, else 0 (int8): the 'Confirmed Signal'."""
+    first = np.asarray(signals[0])
+    agree = np.ones(first.shape, dtype=bool)
+    for signal in signals[1:]:
+        agree &= np.asarray(signal) == first
+    return np.where(agree, first, NO_TREND).astype(np.int8)
+
+
+def confirm_trend(close, ma, adx, dmp, dmn, backcandles=5, threshold=40, averages=None):
+    """The 'Confirmed Signal' of trend_detection.py: the candle category against `ma` where the
+    ADX signal (and, given `averages` = (fast, mid, slow), the SMA alignment) agrees.
+
+    Inputs may be 1-D (bars) or 2-D (symbols, bars).
+    """
+    signals = [candle_categories(close, ma, backcandles), adx_signal(adx, dmp, dmn, threshold)]
+    if averages is not None:
+        signals.append(ma_alignment(*averages))
+    return confirmed_signal(*signals)
+
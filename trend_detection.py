@@ -1,10 +1,12 @@
-import yfinance as yf
+import bar_cache
 import pandas_ta as ta
 import plotly.graph_objects as go
 import numpy as np
+from trend_confirmation import adx_signal, confirmed_signal, ma_alignment
+from trend_filters import candle_categories, rolling_slope
 
 def get_data(symbol: str):
-    data = yf.download(tickers=symbol, period='100d', interval='1d')
+    data = bar_cache.download(tickers=symbol, period='100d', interval='1d')
     data.reset_index(inplace=True, drop=True)
     return data
 # Get the data
@@ -20,13 +22,10 @@ data.dropna(inplace=True)
 
 #Calculate the slope of the moving average
 def calculate_slope(series, period: int = 5):
-    slopes = [0 for _ in range(period-1)]
-    for i in range(period-1, len(series)):
-        x = np.arange(period)   # Create an array of x values
-        y = series[i-period+1:i+1].values   # Get the values of the moving average for the last n periods
-        slope = np.polyfit(x, y, 1)[0]  # Calculate the slope using linear regression
-        percent_slope = (slope / y[0]) * 100  # Convert the slope to a percentage
-        slopes.append(percent_slope)    # Append the slope to the list
+    # percent slope of the linear regression over the last `period` values, from
+    # cumulative sums instead of a polyfit per bar; NaN where the window holds a NaN
+    slopes = rolling_slope(series.to_numpy(dtype=float), period)
+    slopes[:period-1] = 0
     return slopes
 
 # Calculate the slope
@@ -59,15 +58,11 @@ data['SMA_50'] = calculate_sma(data, 50)
 print(data)
 
 def determine_trend(data):
-    if data['SMA_9'] > data['SMA_21'] > data['SMA_50']:
-        return 2  # Uptrend
-    elif data['SMA_9'] < data['SMA_21'] < data['SMA_50']:
-        return 1  # Downtrend
-    else:
-        return 0  # No trend
+    # 2: SMA_9 > SMA_21 > SMA_50 (uptrend), 1: SMA_9 < SMA_21 < SMA_50 (downtrend), 0: no trend
+    return ma_alignment(data['SMA_9'], data['SMA_21'], data['SMA_50'])
 
 # Determine the trend and add it as a new column to the DataFrame
-data['Trend'] = data.apply(determine_trend, axis=1)
+data['Trend'] = determine_trend(data)
 
 print("Trend added")
 print(data)
@@ -89,15 +84,9 @@ fig.show()
 
 #Candles above or below the MA curve
 def check_candles(data, backcandles, ma_column):
-    categories = [0 for _ in range(backcandles)]
-    for i in range(backcandles, len(data)):
-        if all(data['Close'][i-backcandles:i] > data[ma_column][i-backcandles:i]):
-            categories.append(2)  # Uptrend
-        elif all(data['Close'][i-backcandles:i] < data[ma_column][i-backcandles:i]):
-            categories.append(1)  # Downtrend
-        else:
-            categories.append(0)  # No trend
-    return categories
+    # 2 (1) where the `backcandles` closes before a bar were all above (below) the MA:
+    # rolling counts of the comparisons, O(n) whatever the window
+    return candle_categories(data['Close'], data[ma_column], backcandles)
 
 # Apply the function to the DataFrame
 data['Category'] = check_candles(data, 5, 'SMA_21')
@@ -119,7 +108,7 @@ fig.show()
 
 # Apply trend detection using VWAP
 # Download the BTC-USD 15 min data for the last 7 days
-data = yf.download(ticker, period='14d', interval='15m')
+data = bar_cache.download(ticker, period='14d', interval='15m')
 # Compute the VWAP
 data.ta.vwap(append=True)
 
@@ -151,16 +140,8 @@ print(data)
 
 # Define a function to generate the trend signal based on ADX
 def generate_trend_signal(data, threshold=40):
-    trend_signal = []
-    for i in range(len(data)):
-        if data['ADX'][i] > threshold:
-            if data['DMP'][i] > data['DMN'][i]:
-                trend_signal.append(2)  # Confirmed Uptrend
-            else:
-                trend_signal.append(1)  # Confirmed Downtrend
-        else:
-            trend_signal.append(0)  # No confirmed trend
-    return trend_signal
+    # above the ADX threshold: 2 (confirmed uptrend) if DMP > DMN, else 1 (confirmed downtrend)
+    return adx_signal(data['ADX'], data['DMP'], data['DMN'], threshold)
 
 # Apply the function to generate the trend signal column
 data = data.rename(columns=lambda x: x[:-3] if x.startswith('ADX') else x)
@@ -170,7 +151,7 @@ data['Trend Signal'] = generate_trend_signal(data)
 
 print(data[data['Trend Signal']!=0])
 
-data['Confirmed Signal'] = data.apply(lambda row: row['Category'] if row['Category'] == row['Trend Signal'] else 0, axis=1)
+data['Confirmed Signal'] = confirmed_signal(data['Category'], data['Trend Signal'])
 
 print(data[data['Confirmed Signal']!=0])
 # print(data[(data['Category']!=data['Trend Signal']) & (data['Confirmed Signal']!=0)])
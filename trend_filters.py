@@ -0,0 +1,71 @@
+import numpy as np
+
+
+def slope_matrix(values, periods):
+    """Percent slope of the least-squares line through the last `p` values, for every period.
+
+    Row k is calculate_slope (trend_detection.py) for p = periods[k], from two
+    cumulative sums; windows that are not full or hold a NaN are NaN.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    periods = np.asarray(periods, dtype=np.int64)
+    if (periods < 2).any():
+        raise ValueError('A slope needs periods of at least 2 bars')
+    n = len(values)
+
+    missing = np.isnan(values)
+    finite = values[~missing]
+    shift = finite[0] if len(finite) else 0.0
+    y = np.where(missing, 0.0, values-shift)  # shifted as in ma_bank.sma_matrix; the slope is unchanged
+    index = np.arange(n, dtype=np.float64)
+    csum = np.zeros(n+1)
+    np.cumsum(y, out=csum[1:])
+    isum = np.zeros(n+1)
+    np.cumsum(index*y, out=isum[1:])
+    nan_count = np.zeros(n+1, dtype=np.int64)
+    np.cumsum(missing, out=nan_count[1:])
+
+    slopes = np.full((len(periods), n), np.nan)
+    for row, p in enumerate(periods):
+        if p > n:
+            continue
+        end = np.arange(p, n+1)
+        start = end-p
+        sum_y = csum[end]-csum[start]
+        # sum of x*y with x counted from the window's first bar
+        sum_xy = isum[end]-isum[start]-start*sum_y
+        # OLS slope over x = 0..p-1
+        slope = (p*sum_xy-p*(p-1)/2*sum_y)/(p*p*(p*p-1)/12)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            percent = slope/values[start]*100
+        slopes[row, p-1:] = np.where(nan_count[end] == nan_count[start], percent, np.nan)
+    return slopes
+
+
+def rolling_slope(values, period=5):
+    """Percent slope over the last `period` bars at every bar (see slope_matrix)."""
+    return slope_matrix(values, [period])[0]
+
+
+def candle_categories(close, ma, backcandles):
+    """check_candles as one array pass: 2 where the `backcandles` closes before a bar were all
+    above the MA, 1 where all were below, else 0 (int8).
+
+    NaNs count as neither above nor below; 2-D inputs are (symbols, bars).
+    """
+    close = np.asarray(close, dtype=np.float64)
+    ma = np.asarray(ma, dtype=np.float64)
+    n = close.shape[-1]
+    categories = np.zeros(close.shape, dtype=np.int8)
+    if backcandles >= n:
+        return categories
+    counts = np.zeros(close.shape[:-1]+(n+1,), dtype=np.int64)
+    # window of bar i: bars i-backcandles .. i-1
+    end = np.arange(backcandles, n)
+    np.cumsum(close > ma, axis=-1, out=counts[..., 1:])
+    above = counts[..., end]-counts[..., end-backcandles] == backcandles
+    np.cumsum(close < ma, axis=-1, out=counts[..., 1:])
+    below = counts[..., end]-counts[..., end-backcandles] == backcandles
+    categories[..., backcandles:] = np.select([above, below], [2, 1], 0)
+    return categories
+
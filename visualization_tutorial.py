@@ -1,9 +1,9 @@
-import yfinance as yf
+import bar_cache
 import matplotlib.pyplot as plt
 import plotly.graph_objects as go
 
 # Download data from Yahoo Finance
-data = yf.download(tickers='NVDA', period='max', interval='1d')
+data = bar_cache.download(tickers='NVDA', period='max', interval='1d')
 
 print(data.head())
 print(data.tail())
@@ -1,12 +1,12 @@
 # Volatility Indicators
-import yfinance as yf
+import bar_cache
 import pandas_ta as ta
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import pandas as pd
 
 # Download the data
-data = yf.download(tickers='TSLA', period='max', interval='1d')
+data = bar_cache.download(tickers='TSLA', period='max', interval='1d')
 data = pd.concat([data, ta.bbands(data['Close'], length=14)], axis=1)
 data.columns = data.columns[:6].tolist() + ['BB_UPPER', 'BB_MIDDLE', 'BB_LOWER'] + data.columns[9:].tolist()
 
@@ -1,4 +1,4 @@
-import yfinance as yf
+import bar_cache
 import pandas_ta as ta
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
@@ -6,7 +6,7 @@ import pandas as pd
 
 # Download the data
 # data = yf.download(tickers='NVDA', period='max', interval='1d')
-data = yf.download(tickers='NVDA', start='2020-01-01', end='2024-03-17', interval='1d')
+data = bar_cache.download(tickers='NVDA', start='2020-01-01', end='2024-03-17', interval='1d')
 
 data['CMF'] = ta.cmf(data.High, data.Low, data.Close, data.Volume, length=20)
 
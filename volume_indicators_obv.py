@@ -1,11 +1,11 @@
-import yfinance as yf
+import bar_cache
 import pandas_ta as ta
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import pandas as pd
 
 # Download the data
-data = yf.download(tickers='NVDA', period='max', interval='1d')
+data = bar_cache.download(tickers='NVDA', period='max', interval='1d')
 data['OBV'] = ta.obv(data.Close, data.Volume)
 
 df = data[:500]
@@ -0,0 +1,105 @@
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from backtesting import Backtest
+
+from budget_optimizer import grid_search, score
+from indicator_cache import default_cache
+
+WalkForward = namedtuple('WalkForward', ['equity', 'folds'])
+
+# set in every worker by _init
+_data = None
+
+
+def fold_bounds(n, train, test, anchored=False):
+    """(train_start, test_start, test_stop) bar positions of the walk-forward folds over `n` bars.
+
+    Each fold optimizes on the `train` bars before its test window (all bars
+    before it if `anchored`) and trades the next `test` bars out of sample.
+    The test windows tile the data after the first training window; the
+    last one may be shorter.
+    """
+    if train < 1 or test < 1 or train >= n:
+        raise ValueError(f'Cannot fit folds of {train} train and {test} test bars in {n} bars')
+    return [(0 if anchored else start-train, start, min(start+test, n)) for start in range(train, n, test)]
+
+
+def _init(data):
+    global _data
+    _data = data
+    # cached indicators of every fold are computed once on the full history and sliced
+    default_cache.set_history(*(data[column].to_numpy() for column in data.columns))
+
+
+def _trading_from(strategy, bar):
+    # the strategy with its next() skipped before `bar`: indicators see the
+    # warm-up bars, orders only the test window
+    def next(self):
+        if len(self.data) > bar:
+            strategy.next(self)
+    return type(strategy.__name__, (strategy,), {'next': next})
+
+
+def _run_fold(strategy, param_grid, maximize, constraint, backtest_kwargs, warmup, bounds):
+    train_start, test_start, test_stop = bounds
+    fit = grid_search(_data.iloc[train_start:test_start], strategy, param_grid,
+                      maximize=maximize, constraint=constraint, **backtest_kwargs)
+    start = max(test_start-warmup, 0)
+    test = Backtest(_data.iloc[start:test_stop], _trading_from(strategy, test_start-start),
+                    **dict(backtest_kwargs, finalize_trades=True)).run(**fit['_params'])
+    equity = test['_equity_curve']['Equity'].values[test_start-start:]
+    cash = backtest_kwargs.get('cash', 10_000)
+    return (fit['_params'], score(fit, maximize), equity, (equity[-1]/cash-1)*100, test['# Trades'])
+
+
+def walk_forward(data, strategy, param_grid, train=504, test=126, anchored=False, maximize='SQN',
+                 constraint=None, warmup=None, processes=None, **backtest_kwargs):
+    """Walk-forward optimization: fit on each training window, trade the following test window.
+
+    Each test window is backtested from flat on the `warmup` bars before it
+    (default `train`) plus the window, trading only in the window, so indicators
+    needing at most `warmup` bars start it warmed up. Returns WalkForward(equity,
+    folds): the chained out-of-sample equity and one row per fold. Folds run in a
+    process pool, which needs an importable strategy class; `processes=1` runs
+    them here, for strategies defined in a script.
+    """
+    bounds = fold_bounds(len(data), train, test, anchored)
+    warmup = train if warmup is None else warmup
+    fold_args = (strategy, param_grid, maximize, constraint, backtest_kwargs, warmup)
+    if processes == 1:
+        _init(data)
+        try:
+            results = [_run_fold(*fold_args, b) for b in bounds]
+        finally:
+            # later backtests in this process must not be sliced from this data
+            default_cache.set_history()
+    else:
+        with ProcessPoolExecutor(max_workers=min(processes or os.cpu_count(), len(bounds)),
+                                 initializer=_init, initargs=(data,)) as pool:
+            futures = [pool.submit(_run_fold, *fold_args, b) for b in bounds]
+            results = [future.result() for future in futures]
+
+    # each window starts with the cash; rescale it to where the previous window ended
+    cash = backtest_kwargs.get('cash', 10_000)
+    curves, level = [], 1.0
+    for _, _, curve, _, _ in results:
+        curves.append(curve/cash*level)
+        level = curves[-1][-1]
+    equity = pd.Series(np.concatenate(curves)*cash, index=data.index[bounds[0][1]:], name='Equity')
+
+    index = data.index
+    folds = pd.DataFrame({
+        'Train Start': [index[b[0]] for b in bounds],
+        'Test Start': [index[b[1]] for b in bounds],
+        'Test End': [index[b[2]-1] for b in bounds],
+        'Params': [r[0] for r in results],
+        f'In-Sample {maximize if isinstance(maximize, str) else "Score"}': [r[1] for r in results],
+        'Return [%]': [r[3] for r in results],
+        '# Trades': [r[4] for r in results],
+    })
+    return WalkForward(equity, folds)
+